@@ -56,7 +56,16 @@ def adjust_calibration(*args):
 
 # Convert string timestamp to numeric time ##################################
 def convert_timestamp(a):
-    # strftime("%d-%b-%Y (%H:%M:%S.%f)").encode('ascii')
+    # Newer files store int64 ns since the epoch (UTC). Convert in one go, shifted to local time.
+    if a.dtype.kind in 'iuf':
+        t = np.asarray(a[:], dtype=np.int64)
+        if len(t) > 0:
+            t0 = t[0]*1e-9
+            utcoffset = datetime.fromtimestamp(t0) - datetime.utcfromtimestamp(t0)
+            t = t + int(utcoffset.total_seconds()*1e9)
+        return t.astype('datetime64[ns]')
+
+    # Older files: strftime("%d-%b-%Y (%H:%M:%S.%f)").encode('ascii')
     # b'04-Feb-2022 (23:20:28.868890)'
     times=[]
     #for i in tqdm.tqdm(range(len(a))):
@@ -219,6 +228,8 @@ class variableFinder:
         return
 
     def __call__(self, name, h5obj):
+        # Timestamps and the time index are the horizontal axis, not variables
+        if name.split('/')[-1].startswith('timestamp'): return
         # Must be Group
         if isinstance(h5obj, h5py.Dataset):  # must be dataset
             #if ('units' in h5obj.attrs.keys()): # must have units attribute
@@ -31,6 +31,7 @@
         13/07/2020 - First version.
         18/07/2020 - Bug fixes
         19/07/2020 - allow overwrite, colour text.
+        17/10/2026 - read stacked 'frames' datasets.
 """
     
 import sys, os, shutil
@@ -54,7 +55,8 @@ if __name__=='__main__':
     
     # Find all devices containing image data type
     cprint("Scanning for images in HDF5 file...",'cyan')
-    videoDevices = [ g for g in H.values() if np.any([ 'IMAGE_SUBCLASS' in g.values()[n].attrs.keys() for n in range(len(g.keys()))])  ]
+    # (either one dataset per frame, or all frames stacked in one 'frames' dataset)
+    videoDevices = [ g for g in H.values() if ('frames' in g) or np.any([ 'IMAGE_SUBCLASS' in v.attrs.keys() for v in g.values() ])  ]
     
     # Loop thru all devices
     for Dev in videoDevices:
@@ -70,6 +72,17 @@ if __name__=='__main__':
         # Make dir to save to
         os.mkdir(output_dir)
 
+        # Stacked frames
+        if 'frames' in Dev:
+            Frames = Dev['frames']
+            for i in tqdm.tqdm(range(Frames.shape[0])):
+                frame_name = 'frame_%08i' % Dev['frame_number'][i]
+                output_name = "%s_%s.%s" % (frame_name, Dev['frame_timestamp'][i], IMAGE_EXTN)
+                im = Image.fromarray(np.fliplr(np.flipud(Frames[i])))
+                im.save(output_dir+'/'+output_name)
+            print("")
+            continue
+
         # Loop thru each image
         all_frames = [ fr for fr in Dev.values() if 'IMAGE_SUBCLASS' in fr.attrs.keys() ]
         for i in tqdm.tqdm(range(len(all_frames))):
@@ -98,7 +98,11 @@ def change_param(filenames, dev_name, channel_idx):
         raw_units = read_attr_array(h5py_dev.attrs['raw_units'])
         units = read_attr_array(h5py_dev.attrs['eng_units'])
         offsets = read_attr_array(h5py_dev.attrs['offset'])
-        data = h5py_dev[names[channel_idx]+'/Scaled values'][...]
+        # Files logged with raw_only have no scaled values; compute them from the calibration.
+        if 'Scaled values' in h5py_dev[names[channel_idx]]:
+            data = h5py_dev[names[channel_idx]+'/Scaled values'][...]
+        else:
+            data = h5py_dev[names[channel_idx]+'/Raw values'][...]*scales[channel_idx] + offsets[channel_idx]
         lo = np.nanmin(data)
         me = np.nanmean(data)
         hi = np.nanmax(data)
@@ -154,11 +158,17 @@ def change_param(filenames, dev_name, channel_idx):
                 h5py_dev.attrs['scale'] = str(scales).encode('utf-8')
                 h5py_dev.attrs['offset'] = str(offsets).encode('utf-8')
                 h5py_dev.attrs['eng_units'] = str(units).encode('utf-8')
-                h5py_raw_dset = h5py_dev[names[channel_idx]+'/Raw values']
-                h5py_dev[names[channel_idx]+'/Scaled values'].attrs['units']=new_units
-                # Modify scaled values
-                h5py_scaled_dset = h5py_dev[names[channel_idx]+'/Scaled values']
-                h5py_scaled_dset[...] = h5py_raw_dset[...]*new_scale + new_offset
+                # Modify channel calibration attributes, if present
+                h5py_ch = h5py_dev[names[channel_idx]]
+                if 'scale' in h5py_ch.attrs: h5py_ch.attrs['scale'] = new_scale
+                if 'offset' in h5py_ch.attrs: h5py_ch.attrs['offset'] = new_offset
+                if 'eng_units' in h5py_ch.attrs: h5py_ch.attrs['eng_units'] = units[channel_idx]
+                # Modify scaled values. Files logged with raw_only don't store them.
+                if 'Scaled values' in h5py_ch:
+                    h5py_raw_dset = h5py_dev[names[channel_idx]+'/Raw values']
+                    h5py_dev[names[channel_idx]+'/Scaled values'].attrs['units']=units[channel_idx]
+                    h5py_scaled_dset = h5py_dev[names[channel_idx]+'/Scaled values']
+                    h5py_scaled_dset[...] = h5py_raw_dset[...]*new_scale + new_offset
                 # Close file
                 H1.close()
                 modified_file=True
@@ -160,7 +160,8 @@ if __name__ == '__main__':
     print("Selected device: "+dev)
     
     # Define a list of images
-    images = [ H[dev][k] for k in H[dev].keys() if k != 'timestamp' and k != 'Postprocessed values']
+    # (skip timestamps, timing diagnostics and postprocessed values stored alongside the frames)
+    images = [ H[dev][k] for k in H[dev].keys() if not k.startswith('timestamp') and not k in ('timing','Postprocessed values')]
     
     # Load a sample image to make alignment
     if c is None:
@@ -27,6 +27,7 @@
 
     Version history:
         13/07/2020 - First version.
+        17/10/2026 - read stacked 'frames' datasets.
 """
     
 import sys
@@ -37,11 +38,16 @@ import matplotlib.pyplot as plt
 if __name__=='__main__':
 	H=h5py.File(sys.argv[1],'r')
 	Dev=H['Video capture card (video stream)']
-	Frames=Dev.keys() 
-	LastFrame = [ f for f in Frames if 'frame' in f ][-1]
-	Timestamps = Dev['timestamp']
-	LastTimestamp = Timestamps[-1]
-	ImageData = Dev[LastFrame][...]
+	if 'frames' in Dev: # stacked frames
+		LastFrame = 'frame_%08i' % Dev['frame_number'][-1]
+		LastTimestamp = Dev['frame_timestamp'][-1]
+		ImageData = Dev['frames'][-1]
+	else:
+		Frames=Dev.keys() 
+		LastFrame = [ f for f in Frames if 'frame_' in f ][-1]
+		Timestamps = Dev['timestamp']
+		LastTimestamp = Timestamps[-1]
+		ImageData = Dev[LastFrame][...]
 	ImageData = np.fliplr(np.flipud(ImageData))
 	fig=plt.figure()
 	plt.suptitle(sys.argv[1])
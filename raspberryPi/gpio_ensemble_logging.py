@@ -18,6 +18,7 @@
 
 import RPi.GPIO as GPIO
 from pyLabDataLogger.device import usbDevice, i2cDevice, pyvisaDevice
+from pyLabDataLogger.logger import timing
 import sys,os,time,datetime,subprocess
 import h5py
 import numpy as np
@@ -165,7 +166,9 @@ try:
                 GPIO.output(pin, action)
                 if dt>0: time.sleep(dt)
             
-            # Repeat the data logging several times after a single trigger event.
+            # Repeat the data logging several times after a single trigger event,
+            # every logging_period seconds.
+            timer = timing.periodicTimer(logging_period)
             for ens in range(num_ensembles):
             
                 # Activate 'arm' indicator as we are now going into our datalogging routine
@@ -192,9 +195,8 @@ try:
                 # Update the loop counter in the log file
                 write_loop_counter(loop_counter, trigger_counter)
                 
-                # Wait?
-                if (time.time()-t0 < logging_period):
-                    time.sleep(time.time()-t0+logging_period)
+                # Wait for the next repeat
+                if ens < num_ensembles-1: timer.wait()
                 
                 # Turn off the 'busy' indicator
                 GPIO.output(busy_indicator_pin, busy_indicator_inv)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Benchmark response decoding: compare the per-sample struct format strings and
+    slicing used before against serialDevice's precompiled decoders, on response
+    bytes in the format each instrument sends. No hardware is needed.
+    Usage: benchmark_decoders.py [n_decodes]
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from pyLabDataLogger.device import serialDevice
+from pyLabDataLogger.logger import globalFunctions
+import sys, struct, timeit
+import numpy as np
+from termcolor import cprint
+
+# Omron K3HB CompoWay/F read responses: load, max, min (the last one negative)
+def k3hb_frame(data):
+    s = '\x02' + '01' + '00' + '00' + '0101' + '0000' + data + '\x03' # node, sub-address, end code, MRC/SRC, response code
+    bcc = 0
+    for c in s[1:]: bcc ^= ord(c)
+    return (s + chr(bcc)).encode('latin-1')
+K3HB = [k3hb_frame('000004D2'), k3hb_frame('00001A0B'), k3hb_frame('FFFFFF38')]
+
+# Honeywell HPMA115S0 particle reading
+HPMA = [b'\x40\x05\x04\x00\x19\x00\x23\x7b']
+
+# Omega USB-H stream: 0xAA header frames holding one float each
+USBH = [b'\x00\x01' + b''.join([b'\xaa\x01' + struct.pack('<f', 101.325+0.01*n) for n in range(32)])]
+
+# ASCII numeric replies (default parser)
+ASCII = [b' 1.2345E+00\r\n', b'-0.0021\r\n', b'  297.15\r\n']
+
+# The decoders as they were
+def legacy_k3hb(rawData, decimal_places=2):
+    vals = []
+    for r in rawData:
+        a=r.index(b'\x02')
+        b=r.index(b'\x03')
+        dataframe=r[a+11+4:b]
+        if (dataframe[0] == 'F') or (dataframe[0] == 70):
+            dataframe = int(dataframe,16) ^ 0xffffffff
+            vals.append(-float(dataframe)*10**(-decimal_places))
+        else:
+            vals.append(float(int(dataframe,16))*10**(-decimal_places))
+    return vals
+
+def legacy_hpma(rawData):
+    data=rawData[0][2:]
+    return [struct.unpack('>h',data[1:3])[0], struct.unpack('>h',data[3:5])[0]]
+
+def legacy_usbh(rawData):
+    vals = []
+    for r in rawData:
+        offset = r.index(b'\xaa')
+        r = r.replace(b'\xaa\xaa',b'\xaa')
+        n_frames = int(np.floor(len(r[offset:])/6))
+        vals.append( np.array( struct.unpack('<'+'xxf'*n_frames,r[offset:offset+n_frames*6]) ) )
+    return vals
+
+def legacy_default(rawData):
+    return [ float(s.strip().decode('ascii')) for s in rawData]
+
+# Decodes per second and microseconds per decode.
+def bench(f, n):
+    t = timeit.timeit(f, number=n)
+    return n/t, t/n*1e6
+
+if __name__ == '__main__':
+
+    globalFunctions.banner()
+    n = int(sys.argv[1]) if len(sys.argv)>1 else 20000
+
+    # Call the parsers without opening a device
+    d = serialDevice.serialDevice.__new__(serialDevice.serialDevice)
+    d.quiet = True
+    d.config = {'decimal_places':2}
+    d.params = {'n_channels':3}
+
+    cases = [('K3HB (3 responses)',   lambda: legacy_k3hb(K3HB),      lambda: d.parse_k3hb(K3HB)),
+             ('HPMA',                 lambda: legacy_hpma(HPMA),      lambda: d.parse_hpma(HPMA)),
+             ('USB-H (32 frames)',    lambda: legacy_usbh(list(USBH)), lambda: d.parse_omega_usbh(list(USBH))),
+             ('ASCII floats (3)',     lambda: legacy_default(ASCII),  lambda: d.parse_default(ASCII))]
+
+    cprint("%i decodes per case" % n, 'cyan', attrs=['bold'])
+    for name, legacy, new in cases:
+        before = np.hstack(legacy())
+        assert np.allclose(before, np.hstack(new())[:len(before)]) # same values
+        r0, t0 = bench(legacy, n)
+        r1, t1 = bench(new, n)
+        cprint(name+':', 'magenta')
+        print("\tbefore     %10.1f decodes/s  %8.2f us/decode" % (r0, t0))
+        print("\tprecompiled%10.1f decodes/s  %8.2f us/decode  (x%.2f)" % (r1, t1, t0/t1))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Benchmark HDF5 logging: compare write and read throughput of the old
+    per-sample open/close with fixed maxshape and default chunks against
+    a persistent hdf5Writer with unlimited, auto-tuned chunked datasets.
+
+    Uses dummy devices, so no hardware is needed.
+    Usage: benchmark_hdf5_logging.py [n_samples] [n_devices] [n_channels]
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from pyLabDataLogger.device import dummyDevice
+from pyLabDataLogger.logger import globalFunctions, hdf5Writer
+import sys, os, time, tempfile
+import numpy as np
+import h5py
+from termcolor import cprint
+
+# The logging code as it was before hdf5Writer: open the file, grow each dataset
+# by one sample with h5py's default chunks and a fixed maxshape, then close it.
+def legacy_log_hdf5(d, filename, max_records=352800):
+    with h5py.File(filename, 'a') as fh:
+        if d.name in fh: dg = fh[d.name]
+        else: dg = fh.create_group(d.name)
+        ts = d.lastValueTimestamp.strftime("%d-%b-%Y (%H:%M:%S.%f)").encode('ascii')
+        if 'timestamp' in dg:
+            td = dg['timestamp']
+            td.resize([td.shape[0]+1,])
+            td[-1] = ts
+        else:
+            dg.create_dataset('timestamp',data=[ts],maxshape=(max_records,))
+        for i in range(d.params['n_channels']):
+            chn = d.config['channel_names'][i]
+            if chn in dg: cg = dg[chn]
+            else: cg = dg.create_group(chn)
+            for data, desc in [(d.lastValue, "Raw values"), (d.lastScaled, "Scaled values")]:
+                if desc in cg:
+                    dset = cg[desc]
+                    ds = list(dset.shape)
+                    ds[-1] += 1
+                    dset.resize(ds)
+                    dset[...,ds[-1]-1]=data[i]
+                else:
+                    ds = list(np.array(data[i]).shape)
+                    ms = ds[:]
+                    ds.append(1)
+                    ms.append(max_records)
+                    cg.create_dataset(desc, data=np.array(data[i]).reshape(tuple(ds)), maxshape=ms)
+
+# Log n_samples from every device, return samples per second (per device).
+def bench_write(devices, n_samples, log):
+    t0 = time.time()
+    for n in range(n_samples):
+        for d in devices:
+            d.query()
+            log(d)
+    return n_samples/(time.time()-t0)
+
+# Read every dataset in the file back, return MB/s.
+def bench_read(filename):
+    nbytes = [0]
+    def read(name, obj):
+        if isinstance(obj, h5py.Dataset): nbytes[0] += obj[...].nbytes
+    t0 = time.time()
+    with h5py.File(filename, 'r') as fh: fh.visititems(read)
+    return nbytes[0]/1e6/(time.time()-t0)
+
+if __name__ == '__main__':
+
+    globalFunctions.banner()
+
+    n_samples  = int(sys.argv[1]) if len(sys.argv)>1 else 2000
+    n_devices  = int(sys.argv[2]) if len(sys.argv)>2 else 10
+    n_channels = int(sys.argv[3]) if len(sys.argv)>3 else 4
+
+    devices = []
+    for j in range(n_devices):
+        devices.append(dummyDevice.dummyDevice(params={'period':10., 'n_channels':n_channels}, quiet=True))
+        devices[-1].name = 'Dummy%i' % j
+
+    cprint("%i samples x %i devices x %i channels" % (n_samples, n_devices, n_channels), 'cyan', attrs=['bold'])
+    tmpdir = tempfile.mkdtemp()
+
+    # Old defaults
+    fn_legacy = os.path.join(tmpdir, 'legacy.hdf5')
+    w = bench_write(devices, n_samples, lambda d: legacy_log_hdf5(d, fn_legacy))
+    r = bench_read(fn_legacy)
+    cprint("Per-sample open/close, maxshape=352800, default chunks:", 'magenta')
+    print("\twrite %10.1f samples/s   read %8.1f MB/s   file %8.2f MB" % (w, r, os.path.getsize(fn_legacy)/1e6))
+
+    # Persistent writer, unlimited auto-chunked datasets
+    fn_writer = os.path.join(tmpdir, 'writer.hdf5')
+    writer = hdf5Writer.hdf5Writer(fn_writer)
+    w = bench_write(devices, n_samples, lambda d: d.log(writer))
+    writer.close()
+    r = bench_read(fn_writer)
+    cprint("hdf5Writer, unlimited maxshape, auto-tuned chunks:", 'magenta')
+    print("\twrite %10.1f samples/s   read %8.1f MB/s   file %8.2f MB" % (w, r, os.path.getsize(fn_writer)/1e6))
+
+    os.remove(fn_legacy)
+    os.remove(fn_writer)
+    os.rmdir(tmpdir)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Benchmark serial request/response reads over a pty loopback: compare the old
+    one-byte-at-a-time read loop against serialDevice's buffered reads.
+
+    A responder thread on the master side of a pseudo-terminal answers every
+    request line with a fixed-length response, so no hardware is needed (Linux/MacOS only).
+    Usage: benchmark_serial_reads.py [n_requests] [response_length]
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from pyLabDataLogger.device import serialDevice
+from pyLabDataLogger.logger import globalFunctions
+import sys, os, time, tty, threading
+import serial
+from termcolor import cprint
+
+# The request loop as it was before buffered reads: one read(1) and a check per byte.
+def legacy_blockingSerialRequest(Serial, request, terminationChar=b'\r', maxlen=1024, timeout_total=10.):
+    Serial.write(request)
+    s=b''
+    response=None
+    t_=time.time()
+    while len(s)<maxlen:
+        s+=Serial.read(1)
+        if len(s) == 0: break
+        if s[-1:] == terminationChar:
+            response=s.strip()
+            break
+        if (time.time() - t_) > timeout_total: break
+    return response
+
+# Answer each request line on the master side of the pty with a response of n bytes.
+def responder(fd, response, stop):
+    pending = b''
+    while not stop.is_set():
+        try:
+            pending += os.read(fd, 4096)
+        except OSError:
+            return
+        while b'\r' in pending:
+            pending = pending[pending.index(b'\r')+1:]
+            os.write(fd, response)
+
+# Send n requests, return requests per second and CPU seconds per request.
+def bench(request_function, n):
+    t0 = time.time()
+    c0 = time.process_time()
+    for j in range(n):
+        r = request_function()
+        if r is None: raise RuntimeError("No response")
+    return n/(time.time()-t0), (time.process_time()-c0)/n
+
+if __name__ == '__main__':
+
+    globalFunctions.banner()
+
+    n_requests      = int(sys.argv[1]) if len(sys.argv)>1 else 2000
+    response_length = int(sys.argv[2]) if len(sys.argv)>2 else 64
+
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    response = b'1'*(response_length-1) + b'\r'
+    stop = threading.Event()
+    th = threading.Thread(target=responder, args=(master, response, stop))
+    th.daemon = True
+    th.start()
+
+    port = serial.Serial(os.ttyname(slave), baudrate=460800, timeout=1.)
+    cprint("%i requests, %i byte responses, pty %s" % (n_requests, response_length, os.ttyname(slave)), 'cyan', attrs=['bold'])
+
+    # Byte at a time
+    rate, cpu = bench(lambda: legacy_blockingSerialRequest(port, b'?\r'), n_requests)
+    cprint("read(1) per byte:", 'magenta')
+    print("\t%10.1f requests/s   %8.1f us CPU/request" % (rate, cpu*1e6))
+
+    # Buffered reads through serialDevice, without opening a real device
+    d = serialDevice.serialDevice.__new__(serialDevice.serialDevice)
+    d.Serial = port
+    d.port = os.ttyname(slave)
+    d.quiet = True
+    d.rxBuffer = bytearray()
+    d.params = {'timeout':1., 'timeout_total':10.}
+    rate, cpu = bench(lambda: d.blockingSerialRequest(b'?\r', '\r', sleeptime=0), n_requests)
+    cprint("Buffered reads (in_waiting into a bytearray):", 'magenta')
+    print("\t%10.1f requests/s   %8.1f us CPU/request" % (rate, cpu*1e6))
+
+    stop.set()
+    port.close()
+    os.close(master)
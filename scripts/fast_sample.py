@@ -2,6 +2,14 @@
 # -*- coding: UTF-8 -*-
 """
     Fast-as-possible sampling and write to ASCII.
+
+    The log is written as samples arrive, one line per sample:
+        time since the program started (s) <tab> device name <tab> values
+    Devices are sampled at different rates, so their lines are interleaved.
+    (Earlier versions wrote the file at the end of the run, with a time and
+    value column pair for each device.) When logging stops, '#' comment lines
+    at the end of the file give each device's sample, error and dropped-sample
+    counts and its queue high-water mark.
     
     @author Daniel Duke <daniel.duke@monash.edu>
     @copyright (c) 2018-2026 Monash University
@@ -27,7 +35,7 @@
 """
 
 from pyLabDataLogger.device import usbDevice
-from pyLabDataLogger.logger import globalFunctions
+from pyLabDataLogger.logger import globalFunctions, multiThreadedLogger
 import time, datetime
 import numpy as np
 from termcolor import cprint
@@ -47,53 +55,55 @@ if __name__ == '__main__':
 
     devices = usbDevice.load_usb_devices(usbDevicesFound, **special_args)
    
-    t = []
-    values = {}
-    for d in devices: values[d.name]=[]
-    loop_counter = 0
-    running_average = 0.
+    # Every device is sampled as fast as it can go in its own thread (period 0),
+    # unless it has a config['sample_period'] of its own. Samples are written to the
+    # file as they arrive, so memory use doesn't grow with the length of the run.
+    # If the disk can't keep up, each device's queue drops its oldest samples.
+    samples = {}
+    for d in devices: samples[d.name]=0
     logfilename='logfile_%s.txt' %  datetime.datetime.now().strftime('%d-%m-%y_%Hh%Mm%Ss')
-    t_start_program = time.time()
-    try:
-        while True:
-            t0 = time.time() - t_start_program
-            t.append(t0)
-            for d in devices:
-                # read values
-                d.query()
-                # show values?
-                if loop_counter%display_interval == 0:
-                    cprint( d.name, 'magenta', attrs=['bold'] )
-                    d.pprint()
-                # save data
-                values[d.name].append(d.lastValue)
+    sched = multiThreadedLogger.scheduler(devices, 0., policy='drop')
+    t_start_program = datetime.datetime.now()
+
+    # Write a sample to the file, and show it every display_interval samples
+    def write_sample(F, d):
+        t = (d.lastValueTimestamp-t_start_program).total_seconds()
+        if (len(d.lastValue)==1): F.write('%f\t%s\t%g\n' % (t, d.name, d.lastValue[0]))
+        else: F.write('%f\t%s\t%s\n' % (t, d.name, d.lastValue))
+        samples[d.name] += 1
+        if samples[d.name]%display_interval == 0:
+            cprint( d.name, 'magenta', attrs=['bold'] )
+            d.pprint()
+            cprint("%i samples" % samples[d.name], 'cyan')
+        return
+
+    with open(logfilename,'w') as F:
+        F.write("#TimeSinceProgStart(s)\tDevice\tValues\n")
+        sched.start()
+        try:
+            while True:
+                d = sched.get()
+                if d is None: continue
+                write_sample(F, d)
                 
-            dt = time.time()-t0- t_start_program
-            running_average = ((running_average*float(loop_counter)) + dt)/(float(loop_counter)+1)
-            loop_counter += 1
-            if loop_counter%display_interval == 0: cprint("Polling time = %0.3f sec per read" % dt, 'cyan')
+        except KeyboardInterrupt:
+            cprint("Stopped.",'red',attrs=['bold'])
             
-    except KeyboardInterrupt:
-        cprint("Stopped.",'red',attrs=['bold'])
-        for d in devices: d.deactivate()
-        
-    except: # all other errors
-        raise
-        
-    cprint("Average loop time = %0.3f sec (%i loops)" % (running_average, loop_counter), 'cyan', attrs=['bold'])
-    
-    # Save file
-    with open(logfilename,'w') as F:
-        F.write("#TimeSinceProgStart(s)\t%s\n" % '\t'.join(values.keys()))
+        except: # all other errors
+            raise
+
+        finally:
+            # Stop the acquisition threads, then write out what is still queued before closing the file
+            sched.stop()
+            while not sched.empty():
+                d = sched.get()
+                if d is not None: write_sample(F, d)
+            for d in devices: d.deactivate()
+            # Queue statistics, so the file records any samples dropped by the 'drop' policy
+            for name, st in sched.queue_stats():
+                F.write("#%s: %i samples, %i errors, %i dropped (%s), queue high water %i of %i\n" %\
+                        (name, st['samples'], st['errors'], st['dropped'], st['policy'], st['high_water'], st['length']))
         
-        for i in range(len(t)):
-            F.write('%f' % t[i])
-            for d in values.keys():
-                if len(values[d])<(i+1): F.write('\t')
-                else: 
-                    if (len(values[d][i])==1): F.write('\t%g' % values[d][i][0])
-                    else: F.write('\t%s' % values[d][i])
-            F.write('\n')
-            
+    sched.report()
     cprint("Wrote %s." % logfilename,'white')
     exit()
@@ -28,7 +28,7 @@
 
 from pyLabDataLogger.device import usbDevice
 from pyLabDataLogger.device import lmsensorsDevice
-from pyLabDataLogger.logger import globalFunctions
+from pyLabDataLogger.logger import globalFunctions, hdf5Writer, timing
 import time
 from termcolor import cprint
 
@@ -48,6 +48,10 @@ if __name__ == '__main__':
     devices.append(lmsensorsDevice.lmsensorsDevice(**special_args))
 
     if len(devices) == 0: exit()
+
+    # Keep the log file open for the whole run, shared by all devices.
+    logfile = hdf5Writer.hdf5Writer(logfilename)
+    timer = timing.periodicTimer(INTERVAL_SECONDS) # drift-free loop period
     loop_counter = 0
     running_average = 0.
     try:
@@ -57,19 +61,24 @@ if __name__ == '__main__':
                 cprint('\n'+d.name, 'magenta', attrs=['bold'])
                 d.query()
                 d.pprint()
-                d.log(logfilename)
+                d.log(logfile)
             
             dt = time.time()-t0
             running_average = ((running_average*float(loop_counter)) + dt)/(float(loop_counter)+1)
             loop_counter += 1
             
-            if ((dt<INTERVAL_SECONDS) and (loop_counter>0)): time.sleep(INTERVAL_SECONDS-dt)
             cprint("Polling time = %0.3f sec" % dt, 'cyan')
+            timer.wait()
             
     except KeyboardInterrupt:
         cprint("\nStopped.",'red',attrs=['bold'])
         for d in devices: d.deactivate()
     except: # all other errors
         raise
+
+    finally:
+        timer.log_hdf5(logfile, logfile.fh) # loop lateness and jitter statistics
+        logfile.close()
         
-    cprint("Average loop time = %0.3f sec (%i loops)" % (running_average, loop_counter), 'cyan', attrs=['bold'])    
+    cprint("Average loop time = %0.3f sec (%i loops)" % (running_average, loop_counter), 'cyan', attrs=['bold'])
+    timer.report()    
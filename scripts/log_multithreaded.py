@@ -27,10 +27,12 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-from pyLabDataLogger.device import usbDevice, i2cDevice
-from pyLabDataLogger.logger import globalFunctions
+from pyLabDataLogger.device import usbDevice
+from pyLabDataLogger.device.i2c import i2cDevice
+from pyLabDataLogger.logger import globalFunctions, multiThreadedLogger
 from termcolor import cprint
-import time
+
+INTERVAL_SECONDS = 1.0
 
 if __name__ == '__main__':
     
@@ -43,24 +45,14 @@ if __name__ == '__main__':
     # kwargs to customise setup of devices
     special_args={'debugMode':True, 'init_tc08_config':['K','K','K','T','T','T','X','X'], 'quiet':False, 'init_tc08_chnames':['Cold Junction','K1','K2','K3','T4','T5','T6','420mA_P1','420mA_P2']}
 
-    # BELOW IS THE CURRENT SERIALIZED CODE!
-    
     devices = usbDevice.load_usb_devices(usbDevicesFound, **special_args)
-    devices.extend( i2cDevice.load_i2c_devices(found) )
+    devices.extend( i2cDevice.load_i2c_devices(i2cDevicesFound) )
     
     if len(devices) == 0: exit()
    
+    # Each device is queried in its own thread and a single writer thread logs
+    # the samples, so the loop time is set by the slowest device. Runs until Ctrl-C.
     try:
-        while True:
-            for d in devices:
-                cprint( d.name, 'magenta', attrs=['bold'])
-                d.query()
-                d.pprint()
-                d.log(logfilename)
-            time.sleep(1)
-            print("")
-    except KeyboardInterrupt:
-        cprint( "Stopped.",'red',attrs=['bold'])
+        multiThreadedLogger.start(logfilename, sample_period=INTERVAL_SECONDS, devices=devices)
+    finally:
         for d in devices: d.deactivate()
-    except: # all other errors
-        raise
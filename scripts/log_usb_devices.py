@@ -27,11 +27,11 @@
 """
 
 from pyLabDataLogger.device import usbDevice
-from pyLabDataLogger.logger import globalFunctions
+from pyLabDataLogger.logger import globalFunctions, hdf5Writer, multiThreadedLogger
 import datetime,time
 from termcolor import cprint
 
-INTERVAL_SECONDS = 0.5  # set to zero to go as fast as possible
+INTERVAL_SECONDS = 0.5  # default sample period, set to zero to go as fast as possible
 
 if __name__ == '__main__':
     
@@ -49,29 +49,40 @@ if __name__ == '__main__':
     devices = usbDevice.load_usb_devices(usbDevicesFound, **special_args)
 
     if len(devices) == 0: exit()
-    loop_counter = 0
-    running_average = 0.
+
+    # Each device is polled in its own thread at its own rate. To slow one down or speed
+    # it up, set its period in seconds, e.g. devices[0].config['sample_period'] = 5.
+
+    # Keep the log file open for the whole run, shared by all devices.
+    logfile = hdf5Writer.hdf5Writer(logfilename)
+    # Devices are queried in the scheduler's threads, so live previews are drawn here in the main loop.
+    preview = multiThreadedLogger.previewer(devices)
+    sched = multiThreadedLogger.scheduler(devices, INTERVAL_SECONDS)
+    sched.start()
     try:
         while True:
-            t0 = time.time()
-            for d in devices:
-                cprint('\n'+d.name,'magenta',attrs=['bold'])
-                d.query()
-                d.pprint()
-                d.log(logfilename)
-            
-            dt = time.time()-t0
-            running_average = ((running_average*float(loop_counter)) + dt)/(float(loop_counter)+1)
-            loop_counter += 1
-            
-            if ((dt<INTERVAL_SECONDS) and (loop_counter>0)): time.sleep(INTERVAL_SECONDS-dt)
-            cprint("Polling time = %0.3f sec" % dt, 'cyan')
+            d = sched.get()
+            if d is None: continue
+            cprint('\n'+d.name,'magenta',attrs=['bold'])
+            d.pprint()
+            preview.show(d)
+            d.log(logfile)
+            sched.log_diagnostics(logfile, d)
             
     except KeyboardInterrupt:
         cprint( "Stopped.", 'red', attrs=['bold'])
-        for d in devices: d.deactivate()
         
     except: # all other errors
         raise
 
-    cprint("Average loop time = %0.3f sec (%i loops, %f Hz max possible)" % (running_average, loop_counter, 1.0/running_average), 'cyan', attrs=['bold'])    
+    finally:
+        sched.stop()
+        # Log whatever was still queued
+        while not sched.empty():
+            d = sched.get()
+            if d is not None: d.log(logfile)
+        sched.log_diagnostics(logfile) # final lateness and jitter statistics
+        for d in devices: d.deactivate()
+        logfile.close()
+
+    sched.report()
@@ -27,7 +27,7 @@
 """
 
 from pyLabDataLogger.device import usbDevice
-from pyLabDataLogger.logger import globalFunctions
+from pyLabDataLogger.logger import globalFunctions, hdf5Writer, multiThreadedLogger
 import datetime,time
 import numpy as np
 import matplotlib.pyplot as plt
@@ -61,8 +61,11 @@ if __name__ == '__main__':
         devices[-1].config['scale'][0]=2.0
 
     if len(devices) == 0: exit()
+
+    # Keep the log file open for the whole run, shared by all devices.
+    logfile = hdf5Writer.hdf5Writer(logfilename)
     
-    SAMPLE_PERIOD=0.1 # will attempt to hit this, it is just a *minimum*.
+    SAMPLE_PERIOD=0.1 # default for devices without their own config['sample_period']
     
     # Setup figure
     fig = plt.figure()
@@ -73,7 +76,6 @@ if __name__ == '__main__':
     plt.title(logfilename)
     plt.xlabel("Time [s]")
     plt.ylabel("Process Variables")
-    sampledTimes=[0.]
     
     # Set which channels to plot (default 1 per device for testing)
     for d in devices:
@@ -84,9 +86,10 @@ if __name__ == '__main__':
                 d.plotCh=8 # A0
             
         d.history=[np.nan]
+        d.sampledTimes=[0.]
         shortName=d.name
         if len(shortName)>10: shortName=shortName[:10]
-        d.plotHandle,=ax.plot(sampledTimes,d.history,marker='o',markersize=2,\
+        d.plotHandle,=ax.plot(d.sampledTimes,d.history,marker='o',markersize=2,\
                               lw=1,label='%s %s [%s]' % (shortName,d.config['channel_names'][d.plotCh],\
                               d.config['eng_units'][d.plotCh]))
     plt.legend(loc=1)
@@ -95,54 +98,63 @@ if __name__ == '__main__':
     plt.pause(0.01)
     yrange=[-1e-12,1e-12]
     
-    loop_counter = 0
-    running_average = 0.
+    # Each device is sampled in its own thread at its own rate. The snapshots returned
+    # by the scheduler share history and plotHandle with the devices they were taken from.
+    # Devices are queried in the scheduler's threads, so live previews are drawn here in the main loop.
+    preview = multiThreadedLogger.previewer(devices)
+    sched = multiThreadedLogger.scheduler(devices, SAMPLE_PERIOD)
     loop_starting_time = time.time()
+    sched.start()
+    t_draw = 0.
     try:
         while True:
-            t0 = time.time()
-            sampledTimes.append(t0-loop_starting_time)
-            for d in devices:
-                cprint('\n'+d.name,'magenta',attrs=['bold'])
-                d.query()
-                d.pprint()
-                d.log(logfilename)
-                
-                if (isinstance(d.lastScaled[d.plotCh],np.ndarray) or isinstance(d.lastScaled[d.plotCh],list)):
-                    if len(d.lastScaled[d.plotCh])>5:
-                        d.history.append(np.nanmean(d.lastScaled[d.plotCh][-1])) # plot average of large time series.
-                    else:
-                        d.history.append(d.lastScaled[d.plotCh][0]) # first element in vectors.
+            d = sched.get()
+            if d is None:
+                plt.pause(0.01)
+                continue
+            cprint('\n'+d.name,'magenta',attrs=['bold'])
+            d.pprint()
+            preview.show(d)
+            d.log(logfile)
+            sched.log_diagnostics(logfile, d)
+            
+            d.sampledTimes.append(time.time()-loop_starting_time)
+            if (isinstance(d.lastScaled[d.plotCh],np.ndarray) or isinstance(d.lastScaled[d.plotCh],list)):
+                if len(d.lastScaled[d.plotCh])>5:
+                    d.history.append(np.nanmean(d.lastScaled[d.plotCh][-1])) # plot average of large time series.
                 else:
-                    d.history.append(d.lastScaled[d.plotCh]) # scalar value
-                
-                d.plotHandle.set_xdata(sampledTimes)
-                d.plotHandle.set_ydata(d.history)
-                if np.nanmin(d.history)<yrange[0]: yrange[0]=np.nanmin(d.history)*0.95
-                if np.nanmin(d.history)<yrange[0]: yrange[0]=np.nanmin(d.history)*1.05
-                if np.nanmax(d.history)>yrange[1]: yrange[1]=np.nanmax(d.history)*1.05
-                if np.nanmax(d.history)>yrange[1]: yrange[1]=np.nanmax(d.history)*0.95
-                ax.set_xlim(np.min(sampledTimes),np.max(sampledTimes))
+                    d.history.append(d.lastScaled[d.plotCh][0]) # first element in vectors.
+            else:
+                d.history.append(d.lastScaled[d.plotCh]) # scalar value
+            
+            d.plotHandle.set_xdata(d.sampledTimes)
+            d.plotHandle.set_ydata(d.history)
+            if np.nanmin(d.history)<yrange[0]: yrange[0]=np.nanmin(d.history)*0.95
+            if np.nanmin(d.history)<yrange[0]: yrange[0]=np.nanmin(d.history)*1.05
+            if np.nanmax(d.history)>yrange[1]: yrange[1]=np.nanmax(d.history)*1.05
+            if np.nanmax(d.history)>yrange[1]: yrange[1]=np.nanmax(d.history)*0.95
+
+            # Redraw at most every SAMPLE_PERIOD so fast devices don't hold up the plot
+            if time.time()-t_draw > SAMPLE_PERIOD:
+                ax.set_xlim(0,time.time()-loop_starting_time)
                 ax.set_ylim(*yrange)
                 plt.draw()
                 plt.pause(0.01)
-                
-            
-            while ((time.time()-t0)<SAMPLE_PERIOD):
-                time.sleep(0.01)
-            
-            dt = time.time()-t0
-            running_average = ((running_average*float(loop_counter)) + dt)/(float(loop_counter)+1)
-            
-            loop_counter += 1
-            if (loop_counter%10 == 0):
-                cprint("Loop time = %0.3f sec" % dt, 'cyan')
+                t_draw = time.time()
             
     except KeyboardInterrupt:
         cprint( "Stopped.", 'red', attrs=['bold'])
-        for d in devices: d.deactivate()
         
     except: # all other errors
         raise
 
-    cprint("Average loop time = %0.3f sec (%i loops)" % (running_average, loop_counter), 'cyan', attrs=['bold'])    
+    finally:
+        sched.stop()
+        while not sched.empty():
+            d = sched.get()
+            if d is not None: d.log(logfile)
+        sched.log_diagnostics(logfile) # final lateness and jitter statistics
+        for d in devices: d.deactivate()
+        logfile.close()
+
+    sched.report()
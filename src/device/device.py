@@ -29,17 +29,17 @@
         22/02/2019 - Added logging options
         30/07/2020 - handle mixed array and float types
         04/02/2022 - Truncate really long channel names when printing
+        17/10/2026 - HDF5 logging goes through a persistent hdf5Writer session
+        17/10/2026 - Scaled video frames are computed lazily
+        17/10/2026 - Timestamps from acquisition brackets, with uncertainty
 """
 
-import datetime
+import datetime, time
 import numpy as np
 import sys, os
 from termcolor import cprint
 
-try:
-    import h5py
-except ImportError:
-    cprint( "Install h5py library to enable HDF5 logging support.", 'red', attrs=['bold'])
+from ..logger import hdf5Writer
 
 class pyLabDataLoggerIOError(IOError):
     """ Exception raised when an IO error occurs in a driver.
@@ -58,6 +58,27 @@ class pyLabDataLoggerIOError(IOError):
 
 
 
+class lazyScaledFrames:
+    """ List-like scaled view of a list of video frames. Each frame is scaled
+        (frame * scale + offset) only when it is accessed, so that logging video
+        doesn't make a float64 copy of every frame.
+    """
+    def __init__(self, frames, scale, offset):
+        self.frames = frames
+        self.scale = np.asarray(scale)
+        self.offset = np.asarray(offset)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [ self[j] for j in range(*i.indices(len(self))) ]
+        return np.asarray(self.frames[i]) * self.scale + self.offset
+
+    def __iter__(self):
+        for i in range(len(self)): yield self[i]
+
+
 class device:
     """ Main class defining a device in pyPiDataLogger.
         This class is inherited by more specific sub-categories of devices i.e. USB. """
@@ -104,8 +125,32 @@ class device:
     def query(self):
         return self.lastValue
 
+    # Mark the start of the hardware transaction for the current sample. This always starts a new
+    # bracket, so one left behind by a query that failed before updateTimestamp() is discarded.
+    # A query made of several transactions calls it once, before the first, and acquisitionEnd()
+    # after each; the last end counts.
+    def acquisitionStart(self):
+        self.acquisitionBracket = [time.monotonic_ns(), None]
+
+    # Mark the end of the hardware transaction for the current sample.
+    def acquisitionEnd(self):
+        if getattr(self,'acquisitionBracket',None) is not None: self.acquisitionBracket[1] = time.monotonic_ns()
+
+    # Set lastValueTimestamp. If the driver bracketed the hardware transaction with acquisitionStart()
+    # and acquisitionEnd(), the timestamp is the middle of the bracket and lastTimestampUncertainty
+    # is its width in seconds. Otherwise the timestamp is now, and the uncertainty is unknown (None).
     def updateTimestamp(self):
-        self.lastValueTimestamp = datetime.datetime.now()
+        now = datetime.datetime.now()
+        now_ns = time.monotonic_ns()
+        bracket = getattr(self,'acquisitionBracket',None)
+        self.acquisitionBracket = None
+        if (bracket is None) or (bracket[1] is None):
+            self.lastValueTimestamp = now
+            self.lastTimestampUncertainty = None
+            return
+        t_mid = (bracket[0]+bracket[1])//2
+        self.lastValueTimestamp = now - datetime.timedelta(microseconds=(now_ns-t_mid)/1e3)
+        self.lastTimestampUncertainty = (bracket[1]-bracket[0])/1e9
 
     # Re-establish connection to device.
     def reset(self):
@@ -114,6 +159,25 @@ class device:
         if self.driverConnected: self.activate()
         else: cprint( "Error resetting %s: device is not detected" % self.name, 'red', attrs=['bold'])
 
+    # Expected logging rate in Hz from the sample period, if the device has one (ie to size HDF5 chunks)
+    def expectedSampleRate(self):
+        for d in (self.config, self.params):
+            if ('sample_period' in d) and (d['sample_period'] is not None) and (d['sample_period']>0):
+                return 1./d['sample_period']
+        return None
+
+    # Scaled values for a list of video frames. Returns the frames themselves when the
+    # calibration is the identity, otherwise a lazyScaledFrames view.
+    def scaledFrames(self, frames):
+        if np.all(np.asarray(self.config['scale'])==1.) and np.all(np.asarray(self.config['offset'])==0.):
+            return frames
+        return lazyScaledFrames(frames, self.config['scale'], self.config['offset'])
+
+    # Draw sample (a snapshot of this device taken by multiThreadedLogger, or by default the device itself)
+    # in the live preview window. Video drivers with live_preview override this.
+    def preview(self, sample=None):
+        return
+
     # Check if the device is a video type (ie for animating loops, handling output)
     def isVideo(self):
         if ('opencv' in self.driver) or ('v4l2' in self.driver): return True
@@ -230,20 +294,33 @@ class device:
         return
 
     ################################################################################################################################################################
-    # log data to files
-    def log(self, filename):
+    # log data to files.
+    # filename may also be a pyLabDataLogger.logger.hdf5Writer shared by all devices.
+    # If raw_only is set, scaled values are not written, only raw values and the calibration
+    # (for HDF5 writers, set raw_only on the writer instead).
+    def log(self, filename, raw_only=False):
+        if isinstance(filename, hdf5Writer.hdf5Writer):
+            self.log_hdf5(filename)
+            return
         e = os.path.splitext(filename)[-1]
-        if ('hdf5' in e) or ('h5' in e): self.log_hdf5(filename)
-        elif ('txt' in e) or ('csv' in e) or ('log' in e): self.log_text(filename)
+        if ('hdf5' in e) or ('h5' in e):
+            if raw_only:
+                with hdf5Writer.hdf5Writer(filename, raw_only=True) as writer:
+                    self.log_hdf5(writer)
+            else: self.log_hdf5(filename)
+        elif ('txt' in e) or ('csv' in e) or ('log' in e): self.log_text(filename, raw_only=raw_only)
         else: raise ValueError("Unknown/unsupported logging format %s" % e)
 
     # log to HDF5 file
-    # max_records specifies the largest size an array can get.
-    def log_hdf5(self, filename, max_records=352800):
-        try:
-            assert(h5py)
-        except AssertionError:
-            cprint( "Install h5py library to enable HDF5 logging support.", 'red', attrs=['bold'])
+    # filename can be a path (file is opened and closed for this sample only)
+    # or an open hdf5Writer session that keeps the file open for the whole run.
+    # max_records specifies the largest size an array can get (None for unlimited).
+    def log_hdf5(self, filename, max_records=None):
+        if not isinstance(filename, hdf5Writer.hdf5Writer):
+            with hdf5Writer.hdf5Writer(filename, max_records=max_records) as writer:
+                self.log_hdf5(writer)
+            return
+        writer = filename
         
         # Check that no channel has a reserved name 'timestamp'.
         # Substitute a different name if it does.
@@ -251,75 +328,53 @@ class device:
         if 'timestamp' in chn:
             chn[chn.index('timestamp')]='time_stamp'
 
-        # Open file
-        with h5py.File(filename, 'a') as fh:
-
-            # Load group for this device.
-            if 'name' in self.config: devname = self.config['name']
-            elif 'name' in self.params: devname = self.params['name']
-            else: devname = self.name
-            if devname in fh: dg = fh[devname]
-            else: 
-                dg = fh.create_group(devname)
-                # On creation, add attributes from config and params
-                for attr in self.params.keys(): 
-                    dg.attrs[attr] = repr(self.params[attr])
-                for attr in self.config.keys():
-                    dg.attrs[attr] = repr(self.config[attr])
-
-            # Create/update timestamp dataset
-            # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
-            if 'timestamp' in dg:
-                td = dg['timestamp']
-                td.resize([td.shape[0]+1,])
-                td[-1] = self.lastValueTimestamp.strftime("%d-%b-%Y (%H:%M:%S.%f)").encode('ascii')
-            else:
-                dg.create_dataset('timestamp',data=[self.lastValueTimestamp.strftime("%d-%b-%Y (%H:%M:%S.%f)").encode('ascii')],maxshape=(max_records,))
-
-
-            # Loop all channels of device
-            for i in range(self.params['n_channels']):
+        # Load group for this device.
+        dg = writer.device_group(self)
+        rate = self.expectedSampleRate()
 
-                # Make/open group for channel
-                if chn[i] in dg: 
-                    cg = dg[chn[i]]
-                else: 
-                    cg = dg.create_group(chn[i])
-                    if self.config['channel_names'][i] == 'timestamp': cprint("Warning: changed `timestamp' to `time_stamp' to avoid confict",'yellow',attrs=['bold'])
-                
-                # Loop over raw values and scaled values
-                for data, desc, units in [(self.lastValue, "Raw values", self.params['raw_units'][i]),\
-                                          (self.lastScaled, "Scaled values", self.config['eng_units'][i])]:
-
-                    # h5py doesn't like unicode strings and nonetypes
-                    if isinstance(data[i],str): data[i] = data[i].encode('ascii')
-                    if data[i] is None: data[i]="None".encode('ascii')
-
-                    if desc in cg:  # Add more
-                        dset = cg[desc]
-                        ds = list(dset.shape)
-                        ds[-1] += 1
-                        #if isinstance(data[i],list) or isinstance(data[i],np.ndarray):
-                        #    if len(data[i]) > ds[0]: ds[0] = len(data[i])
-                        dset.resize(ds)
-                        dset[...,ds[-1]-1]=data[i]
-
-                    else: # Make new array
-                        ds = list(np.array(data[i]).shape) #;print("new hdf5 array size will be",ds)
-                        ms=ds[:]
-                        ds.append(1)
-                        ms.append(max_records)
-                        thedata=np.array(data[i]).reshape(tuple(ds))
-                        dset = cg.create_dataset(desc, data=thedata, maxshape=ms)
-                        dset.attrs['units']=units
-
-                # Debugging output.
-                #print '\n', self.name, self.config['channel_names'][i], 'logfile size:', dset.shape
+        # Create/update timestamp dataset
+        # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
+        writer.append_timestamp(dg, self.lastValueTimestamp, sample_rate=rate)
+        self.log_timestamp_uncertainty(writer, dg, sample_rate=rate)
 
-            fh.close()
+        # Loop all channels of device
+        for i in range(self.params['n_channels']):
+
+            # Make/open group for channel
+            if (self.config['channel_names'][i] == 'timestamp') and not (chn[i] in dg):
+                cprint("Warning: changed `timestamp' to `time_stamp' to avoid confict",'yellow',attrs=['bold'])
+            cg = writer.channel_group(dg, chn[i], calibration=self.channelCalibration(i))
+            
+            # Loop over raw values and scaled values
+            # Scaled values can be computed later from the calibration if the writer is raw_only.
+            for data, desc, units in [(self.lastValue, "Raw values", self.params['raw_units'][i]),\
+                                      (self.lastScaled, "Scaled values", self.config['eng_units'][i])]:
+                if writer.raw_only and (desc == "Scaled values"): continue
+                writer.append(cg, desc, data[i], units=units, sample_rate=rate)
+
+        writer.end_sample()
+        return
+
+    # Linear calibration of channel i (scaled = raw * scale + offset), for storing with the raw data.
+    def channelCalibration(self, i):
+        cal = {}
+        if ('scale' in self.config) and ('offset' in self.config):
+            cal['scale'] = self.config['scale'][i]
+            cal['offset'] = self.config['offset'][i]
+        if 'eng_units' in self.config: cal['eng_units'] = self.config['eng_units'][i]
+        return cal
+
+    # Log the width of the acquisition bracket for this sample. It is NaN when the query wasn't bracketed,
+    # so 'timestamp_uncertainty' always has one row per timestamp.
+    def log_timestamp_uncertainty(self, writer, dg, sample_rate=None):
+        uncertainty = getattr(self,'lastTimestampUncertainty',None)
+        if uncertainty is None: uncertainty = np.nan
+        writer.append(dg, 'timestamp_uncertainty', np.float64(uncertainty), units='s', sample_rate=sample_rate)
+        return
 
     # log to text file
-    def log_text(self, filename):
+    # If raw_only is set, scaled values are left out (the scale and offset are in the header).
+    def log_text(self, filename, raw_only=False):
         
         # Write header
         if not os.path.exists(filename):            
@@ -348,6 +403,7 @@ class device:
             # Loop over raw values and scaled values
             for data, desc, units in [(self.lastValue, "Raw values", self.params['raw_units'][i]),\
                                       (self.lastScaled, "Scaled values", self.config['eng_units'][i])]:
+                if raw_only and (desc == "Scaled values"): continue
                 fh.write('# %s, units = %s\n' % (desc,units))
                 if isinstance(data[i],np.ndarray): np.savetxt(fh, data[i].T, delimiter=',')
                 else: fh.write(str(data[i])+'\n')
@@ -29,6 +29,7 @@
 
     Version history:
         30/07/2020 - First version.
+        17/10/2026 - Modbus CRC and framing from modbusRTU instead of libscrc.
 """
 
 '''
@@ -39,17 +40,15 @@
     accel units are revolutions/s^2
     intermission units are milliseconds
 '''
+from . import modbusRTU
 import struct
 import binascii
-import libscrc
 import numpy as np
 import serial, time
 from termcolor import cprint
 
 def checkCrc(data):
-    crc1 = data[-2:]
-    crc2 = libscrc.modbus(data[:-2])
-    return crc1 == crc2
+    return modbusRTU.check_crc(data)
 #################################################################################
 # Build motion commands (MODBUS packets) to send to driver.
 # These are the default settings in the Leadshine test software.
@@ -127,15 +126,8 @@ def motionCommand(revolutions = 1.0, velocity = 120, acceleration = 200, intermi
     cleanup = struct.pack('>ccxcx?', ESD508_ID, ESD508_WRITE, ESD508_MODE, False) # end RS232 control program
     
     # add checksums.
-    setup_commands = []
-    for c in commands:
-        crc = libscrc.modbus(c)
-        setup_commands.append(c + struct.pack('H',crc))
-        
-    loop_commands = []
-    for c in [ enquire_loop, enquire_wait, enquire_ready, enquire_send, cleanup ]:
-        crc = libscrc.modbus(c)
-        loop_commands.append( c + struct.pack('H',crc))
+    setup_commands = [ modbusRTU.append_crc(c) for c in commands ]
+    loop_commands = [ modbusRTU.append_crc(c) for c in [ enquire_loop, enquire_wait, enquire_ready, enquire_send, cleanup ] ]
     
     return setup_commands, loop_commands
                   
@@ -150,12 +142,7 @@ def writeAndVerify(serialPort, cmd, sleeptime, debugMode=True):
     readback = serialPort.read(len(cmd))
     if debugMode: print("\twrote %s / read %s" % (binascii.hexlify(cmd),binascii.hexlify(readback)))
     # Confirm checksum ok
-    data = readback[:-2]
-    crc1 = readback[-2:]
-    crc2 = struct.pack('H',libscrc.modbus(data))
-    #if debugMode: print("\t\tCRC = %s / %s" % (binascii.hexlify(crc1),binascii.hexlify(crc2)))
-    
-    return crc1==crc2
+    return modbusRTU.check_crc(readback)
 
 
 #################################################################################
@@ -210,22 +197,20 @@ def move_servomotor(S, verbose=True, debugMode=False, sleeptime=0.001, maxlen=65
                 time.sleep(sleeptime)
                 S.write(enquire_send)
                 if debugMode: print("\t%s RTS" % binascii.hexlify(enquire_send))
-                data = ''
                 time.sleep(sleeptime)
-                data = ''
+                data = b''
                 crc_ok = False
                 # Keep reading until crc is satisfied and length is within bounds
                 while (not crc_ok) and (len(data)<maxlen):
-                    data += S.read(1)
-                    if len(data)>=4:
-                        crc1 = data[-2:]
-                        crc2 = struct.pack('H',libscrc.modbus(data[:-2]))
-                        if crc1 == crc2: crc_ok = True
+                    chunk = S.read(1)
+                    if len(chunk) == 0: break
+                    data += chunk
+                    crc_ok = modbusRTU.check_crc(data)
                     
                 
                 if debugMode: print("\tread %i bytes" % (len(data)))
                 #if debugMode: print(binascii.hexlify(data[3:-2]), len(data[3:-2]))
-                n = len(data[3:-2])/2
+                n = len(data[3:-2])//2
                 shorts = struct.unpack('%ih' % n,data[3:3+2*n])
                 enc_data.extend(list(shorts))
                 
@@ -28,6 +28,7 @@
 
 from ..device import device
 from ..device import pyLabDataLoggerIOError
+from .. import serialPorts
 import datetime, time, os
 import numpy as np
 from termcolor import cprint
@@ -40,81 +41,12 @@ except ImportError:
     cprint( "Please install pySerial and i2cdriver", 'red', attrs=['bold'])
     raise
 
-""" Find the serial port of the bridge. 
-    This code varies depending on OS, so has some branching logic. """
-
-def locationMatch(serialport,params):
-    if ('port_numbers' in params) and ('bus' in params) and ('location' in dir(serialport)):
-        search_location = '%i-%s' % (params['bus'],'.'.join(['%i'% nn for nn in params['port_numbers']]))
-        if search_location == serialport.location: return True
-        elif ((':' not in search_location) and (':' in serialport.location)): # if '2-1' doesn't match '2-1:1.0' for example.
-            if search_location in serialport.location: return True
-        else:        
-            return False
-    else:
-        # If the feature is unsupported, assume first device is the real one! We can't check.
-        return True
-    
-def findBridgeSerialPort(params):
-    from serial.tools import list_ports
-    for serialport in list_ports.comports():
-                
-        # Not all versions of pyserial have the list_ports_common module!		
-        if 'list_ports_common' in dir(serial.tools):
-            objtype=serial.tools.list_ports_common.ListPortInfo
-        else:
-            objtype=None
-
-        # if serialport returns a ListPortInfo object
-        if objtype is not None and isinstance(serialport,objtype):
-
-            thevid = serialport.vid
-            thepid = serialport.pid
-            if thevid==params['vid'] and thepid==params['pid'] and locationMatch(serialport,params):
-                params['tty']=serialport.device
-                port=serialport.device
-
-        # if the returned device is a list, tuple or dictionary
-        elif len(serialport)>1:
-
-            # Some versions return a dictionary, some return a tuple with the VID:PID in the last string.
-            if 'VID:PID' in serialport[-1]: # tuple or list
-                thename = serialport[0]
-                # Sometimes serialport[-1] will contain "USB VID:PID=0x0000:0x0000" and
-                # sometimes extra data will follow after, i.e. "USB VID:PID=1234:5678 SERIAL=90ab".
-                vididx = serialport[-1].upper().index('PID')
-                if vididx <= 0: raise IndexError("Can't interpret USB VID:PID information!")
-                vidpid = serialport[-1][vididx+4:vididx+13] # take fixed set of chars after 'PID='
-                thevid,thepid = [ int(val,16) for val in vidpid.split(':')]
-                if thevid==params['vid'] and thepid==params['pid'] and locationMatch(serialport,params):
-
-                    if thename is not None:
-                        port = thename # Linux
-                    else:
-                        port = serialport.device # MacOS
-                    if not tty_prefix in port: port = tty_prefix + port
-                    params['tty']=port
-
-            elif 'vid' in dir(serialport): # dictionary
-                if serialport.vid==params['vid'] and serialport.pid==params['pid'] and locationMatch(serialport,params):
-                    # Vid/Pid matching
-                    if not quiet: print( '\t'+str(serialport.hwid)+' '+str(serialport.name))
-                    if serialport.name is not None:
-                        port = serialport.name # Linux
-                    else:
-                        port = serialport.device # MacOS
-                    if not tty_prefix in port: port = tty_prefix + port
-                    params['tty']=port
-
-        # List or dict with only one entry.
-        elif len(list_ports.comports())==1: # only one found, use as default
-            port = serialport[0]
-            if not tty_prefix in port: port = tty_prefix + port
-            params['tty']=port
-
-        if 'tty' in params:
-            if os.path.exists(params['tty']): break
+""" Find the serial port of the bridge in the inventory of serial ports
+    (see serialPorts), and put it in params['tty']. """
 
+def findBridgeSerialPort(params):
+    port = serialPorts.find_port(params)
+    if port is not None: params['tty']=port
     return params 
 
 
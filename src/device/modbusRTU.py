@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Modbus RTU client for serial devices.
+
+    Table-driven CRC-16, request building and response checking, and a client
+    that batches register reads: reads from the same slave and function code
+    that are adjacent (or close) are coalesced into single function 3/4 requests,
+    so polling N channels takes one transaction per slave instead of N.
+    Several slaves can share one port; each read names its slave address.
+
+        client = modbusRTU.modbusClient(serial.Serial('/dev/ttyUSB0', 9600, timeout=0.1))
+        t, p = client.read([(1, 3, 0x100, 2), (1, 3, 0x102, 2)])  # one request for 4 registers
+        modbusRTU.decode(t, 'float32')
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from .device import pyLabDataLoggerIOError
+import struct, time
+
+# CRC-16/MODBUS lookup table (reflected polynomial 0xA001), built once on import.
+CRC16_TABLE = []
+for n in range(256):
+    crc = n
+    for j in range(8):
+        if crc & 1: crc = (crc >> 1) ^ 0xA001
+        else: crc >>= 1
+    CRC16_TABLE.append(crc)
+CRC16_TABLE = tuple(CRC16_TABLE)
+
+MAX_READ_REGISTERS = 125          # largest function 3/4 read
+REQUEST = struct.Struct('>BBHH')  # slave, function, register, count (or value for function 6)
+CRC = struct.Struct('<H')         # CRC is sent low byte first
+
+# Register types: number of registers and decoder. Multi-register values are big-endian, high word first.
+TYPES = { 'uint16' : (1, struct.Struct('>H')),
+          'int16'  : (1, struct.Struct('>h')),
+          'uint32' : (2, struct.Struct('>I')),
+          'int32'  : (2, struct.Struct('>i')),
+          'float32': (2, struct.Struct('>f')) }
+
+EXCEPTIONS = { 1:'illegal function', 2:'illegal data address', 3:'illegal data value',\
+               4:'slave device failure', 5:'acknowledge', 6:'slave device busy' }
+
+# CRC-16 of data.
+def crc16(data):
+    crc = 0xFFFF
+    for c in data: crc = (crc >> 8) ^ CRC16_TABLE[(crc ^ c) & 0xFF]
+    return crc
+
+# Append the CRC to a frame.
+def append_crc(frame):
+    return bytes(frame) + CRC.pack(crc16(frame))
+
+# True if the last two bytes of frame are its CRC.
+def check_crc(frame):
+    return (len(frame) >= 4) and (crc16(frame[:-2]) == CRC.unpack_from(frame, len(frame)-2)[0])
+
+# Decode a value of a TYPES type from a sequence of 16-bit registers.
+def decode(words, regtype='uint16'):
+    count, decoder = TYPES[regtype]
+    return decoder.unpack(struct.pack('>%iH' % count, *words[:count]))[0]
+
+# Plan the requests for a list of (slave, function, first register, count) blocks. Blocks on the same
+# slave and function that overlap or are within max_gap registers of each other are merged, up to
+# max_count registers per request. Returns [slave, function, first, count, [indices of blocks]] per request.
+def coalesce(blocks, max_gap=0, max_count=MAX_READ_REGISTERS):
+    plan = []
+    for i in sorted(range(len(blocks)), key=lambda i: blocks[i]):
+        slave, function, first, count = blocks[i]
+        if len(plan) > 0:
+            p = plan[-1]
+            end = max(p[2]+p[3], first+count)
+            if (p[0] == slave) and (p[1] == function) and (first <= p[2]+p[3]+max_gap) and (end-p[2] <= max_count):
+                p[3] = end-p[2]
+                p[4].append(i)
+                continue
+        plan.append([slave, function, first, count, [i]])
+    return plan
+
+
+class modbusClient:
+    """ Modbus RTU master on an open pySerial port.
+
+        timeout    - seconds to wait for a complete response.
+        max_gap    - unrequested registers that may be read to merge two blocks into one request.
+        turnaround - seconds to wait after a response before the next request, for slaves that
+                     need time to switch an RS-485 transceiver back to receive.
+
+        Errors (timeouts, CRC failures, exception responses) raise pyLabDataLoggerIOError.
+    """
+
+    def __init__(self, Serial, timeout=1., max_gap=8, turnaround=0.):
+        self.Serial = Serial
+        self.timeout = timeout
+        self.max_gap = max_gap
+        self.turnaround = turnaround
+        self.transactions = 0
+        self.errors = 0
+        return
+
+    # Read exactly n bytes, or raise pyLabDataLoggerIOError after timeout.
+    def read_exactly(self, n):
+        data = bytearray()
+        t_end = time.time() + self.timeout
+        while len(data) < n:
+            data += self.Serial.read(n-len(data))
+            if (len(data) < n) and (time.time() > t_end):
+                self.errors += 1
+                raise pyLabDataLoggerIOError("Modbus response timeout (%i of %i bytes)" % (len(data), n))
+        return bytes(data)
+
+    # Send a request (slave address and PDU, without CRC) and return the response without its CRC.
+    def transaction(self, request):
+        self.Serial.write(append_crc(request))
+        self.transactions += 1
+        header = self.read_exactly(3)
+        if header[1] & 0x80: n = 5                 # exception response
+        elif header[1] in (1, 2, 3, 4): n = 5 + header[2] # reads: byte count follows the function code
+        else: n = 8                                # writes are echoed
+        response = header + self.read_exactly(n-3)
+        if self.turnaround > 0: time.sleep(self.turnaround)
+
+        if not check_crc(response):
+            self.errors += 1
+            raise pyLabDataLoggerIOError("Modbus CRC error in response %s" % repr(response))
+        if response[0] != request[0]:
+            self.errors += 1
+            raise pyLabDataLoggerIOError("Modbus response from slave %i, expected %i" % (response[0], request[0]))
+        if response[1] & 0x80:
+            self.errors += 1
+            raise pyLabDataLoggerIOError("Modbus exception from slave %i: %s" % (response[0],\
+                                         EXCEPTIONS.get(response[2], 'code %i' % response[2])))
+        return response[:-2]
+
+    # Read count registers from first, with function 3 (holding) or 4 (input). Returns a tuple of 16-bit ints.
+    def read_registers(self, slave, first, count, function=3):
+        response = self.transaction(REQUEST.pack(slave, function, first, count))
+        if response[2] != 2*count:
+            self.errors += 1
+            raise pyLabDataLoggerIOError("Modbus read of %i registers returned %i bytes" % (count, response[2]))
+        return struct.unpack_from('>%iH' % count, response, 3)
+
+    # Write value to a single register (function 6).
+    def write_register(self, slave, register, value):
+        request = REQUEST.pack(slave, 6, register, value)
+        if self.transaction(request) != request:
+            self.errors += 1
+            raise pyLabDataLoggerIOError("Modbus write to register %i of slave %i was not echoed" % (register, slave))
+        return
+
+    # Read a list of (slave, function, first register, count) blocks with as few requests as possible
+    # (see coalesce). Returns a tuple of registers for each block, in the order given.
+    def read(self, blocks):
+        results = [None]*len(blocks)
+        for slave, function, first, count, members in coalesce(blocks, self.max_gap):
+            words = self.read_registers(slave, first, count, function)
+            for i in members:
+                offset = blocks[i][2]-first
+                results[i] = words[offset:offset+blocks[i][3]]
+        return results
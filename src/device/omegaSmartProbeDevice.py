@@ -29,6 +29,7 @@
 
 from .device import device
 from .device import pyLabDataLoggerIOError
+from . import serialPorts
 import numpy as np
 import datetime, time, serial, os
 from termcolor import cprint
@@ -88,103 +89,18 @@ class omegaSmartProbeDevice(device):
             self.port = self.params['port']
         elif 'pid' in self.params.keys() and 'vid' in self.params.keys(): # USB serial
             
-            # This will find all serial ports available to pySerial.
+            # Look up the port in the inventory of serial ports available to pySerial (see serialPorts).
             # We hope the USB device scanned in usbDevice.py can be found here.
-            # We need to find an exact match - there may be multiple generic devices.
-            from serial.tools import list_ports
-            
-            # This subroutine will check for matching bus-address locations
-            # to identify a particular device even if VID and PID are generic.
-            def locationMatch(serialport):
-                # Check for bus and port match (for multiple generic serial adapters...)
-                if ('port_numbers' in self.params) and ('bus' in self.params) and ('location' in dir(serialport)):
-                    search_location = '%i-%s' % (self.params['bus'],'.'.join(['%i'% nn for nn in self.params['port_numbers']]))
-                    if (search_location == serialport.location):
-                        if not self.quiet: cprint( '\tVID:PID match- location %s == %s' % (search_location,\
-                                                  serialport.location) , 'green')
-                        return True
-                    elif ((':' not in search_location) and (':' in serialport.location)): # if '2-1' doesn't match '2-1:1.0' for example.
-                        if search_location in serialport.location:
-                            if not self.quiet: cprint( '\tVID:PID match- location %s == %s' % (search_location,\
-                                                  serialport.location) , 'green')
-                            return True
-                    else:
-                        if not self.quiet: cprint( '\tVID:PID match but location %s does not match %s' % (repr(search_location),\
-                                                repr(serialport.location)), 'yellow' )
-                        return False
-                else:
-                    # If the feature is unsupported, assume first device is the real one! We can't check.
-                    return True
-                    
-            
-            #####################################################################################################################
-            # scan all serial ports the OS can see
-            for serialport in list_ports.comports():
-                
-                # Not all versions of pyserial have the list_ports_common module!		
-                if 'list_ports_common' in dir(serial.tools):
-                    objtype=serial.tools.list_ports_common.ListPortInfo
-                else:
-                    objtype=None
-
-                # if serialport returns a ListPortInfo object
-                if objtype is not None and isinstance(serialport,objtype):
-                    
-                    thevid = serialport.vid
-                    thepid = serialport.pid
-                    if thevid==self.params['vid'] and thepid==self.params['pid'] and locationMatch(serialport):
-                        self.params['tty']=serialport.device
-                        self.port=serialport.device
-            
-                # if the returned device is a list, tuple or dictionary
-                elif len(serialport)>1:
+            # We need to find an exact match - there may be multiple generic devices, so the
+            # bus-address location is checked to identify a particular device even if VID and PID are generic.
+            self.port = serialPorts.find_port(self.params, quiet=self.quiet)
+            if self.port is not None: self.params['tty']=self.port
 
-		            # Some versions return a dictionary, some return a tuple with the VID:PID in the last string.
-                    if 'VID:PID' in serialport[-1]: # tuple or list
-                        thename = serialport[0]
-                        # Sometimes serialport[-1] will contain "USB VID:PID=0x0000:0x0000" and
-                        # sometimes extra data will follow after, i.e. "USB VID:PID=1234:5678 SERIAL=90ab".
-                        if not self.quiet: print( '\t'+str(serialport[-1])) # report to terminal, useful for debugging.
-                        vididx = serialport[-1].upper().index('PID')
-                        if vididx <= 0: raise IndexError("Can't interpret USB VID:PID information!")
-                        vidpid = serialport[-1][vididx+4:vididx+13] # take fixed set of chars after 'PID='
-                        thevid,thepid = [ int(val,16) for val in vidpid.split(':')]
-                        if thevid==self.params['vid'] and thepid==self.params['pid'] and locationMatch(serialport):
-                            
-                            if not self.quiet: print( '\t'+str(serialport))
-                            if thename is not None:
-                                self.port = thename # Linux
-                            else:
-                                self.port = serialport.device # MacOS
-                            if not self.tty_prefix in self.port: self.port = self.tty_prefix + self.port
-                            self.params['tty']=self.port
-
-                    elif 'vid' in dir(serialport): # dictionary
-                        if serialport.vid==self.params['vid'] and serialport.pid==self.params['pid'] and locationMatch(serialport):
-                            # Vid/Pid matching
-                            if not self.quiet: print( '\t'+str(serialport.hwid)+' '+str(serialport.name))
-                            if serialport.name is not None:
-                                self.port = serialport.name # Linux
-                            else:
-                                self.port = serialport.device # MacOS
-                            if not self.tty_prefix in self.port: self.port = self.tty_prefix + self.port
-                            self.params['tty']=self.port
-
-                # List or dict with only one entry.
-                elif len(list_ports.comports())==1: # only one found, use as default
-                    self.port = serialport[0]
-                    if not self.tty_prefix in self.port: self.port = self.tty_prefix + self.port
-                    self.params['tty']=self.port
-
-                if 'tty' in self.params:
-                    if os.path.exists(self.params['tty']): break
-            #####################################################################################################################
-        
         if self.port is None:
             cprint( "\tUnable to connect to serial port - port unknown.", 'red', attrs=['bold'])
             cprint( "\tYou may need to install a specific USB-to-Serial driver.",'red')
             cprint( "\tfound non-matching ports:", 'red')
-            cprint( list_ports.comports()[0], 'red')
+            serialPorts.report_ports()
             raise pyLabDataLoggerIOError("Serial port driver missing")
         
         else: self.activate(quiet=self.quiet)
@@ -28,8 +28,9 @@
 
 from .device import device
 from .device import pyLabDataLoggerIOError
+from ..logger import hdf5Writer
 import numpy as np
-import datetime, time, subprocess, sys
+import datetime, time, subprocess, sys, threading, collections
 from termcolor import cprint
 
 try:
@@ -59,6 +60,16 @@ class opencvDevice(device):
                 self.live_preview=False
             else: self.live_preview=kwargs['live_preview']
         else: self.live_preview=self.params['live_preview']
+
+        # Optional background thread that keeps draining the camera into a ring buffer,
+        # so that query() returns the newest frames without waiting for the camera.
+        if not 'threaded_grab' in self.params:
+            self.threaded_grab = kwargs.get('threaded_grab', False)
+        else: self.threaded_grab=self.params['threaded_grab']
+        self.grabber = None
+        self.lastFrameTimestamps = None
+        self.lastFrameNumbers = None
+        self.loggedFrame = -1 # newest frame number written by log_hdf5
             
         if not 'ID' in self.params: self.params['ID'] = None # default OpenCV camera ID number
         if not 'debugMode' in self.params: self.params['debugMode']=False
@@ -162,6 +173,9 @@ class opencvDevice(device):
         if 'n_frames' in self.params: self.config['n_frames'] = self.params['n_frames']
         else: self.config['n_frames'] = 1
         
+        # Read frames in the background if requested, so queries take the newest frames instead of waiting for the camera
+        if self.threaded_grab: self.start_grabber()
+
         # Make first query to get units, description, etc.
         self.query(reset=True)
 
@@ -171,9 +185,67 @@ class opencvDevice(device):
     # Deactivate connection to device (close serial port)
     def deactivate(self):
         self.driverConnected=False
+        self.stop_grabber()
         del self.opencvdev
         return
 
+    # Start the frame grabber thread. The ring buffer holds (frame number, timestamp, frame, read time in s)
+    # for the last few frames read from the camera.
+    def start_grabber(self):
+        if self.grabber is not None: return
+        n_frames = self.config.get('n_frames', 1)
+        self.ringBuffer = collections.deque(maxlen=n_frames+2)
+        self.grabberLock = threading.Lock()
+        self.grabberStop = threading.Event()
+        self.grabberError = None
+        self.grabbedFrames = 0
+        self.grabber = threading.Thread(target=self.grab_frames, name='opencvGrabber-%s' % self.params['ID'])
+        self.grabber.daemon = True
+        self.grabber.start()
+        return
+
+    # Stop the frame grabber thread, if running.
+    def stop_grabber(self):
+        if self.grabber is None: return
+        self.grabberStop.set()
+        self.grabber.join(timeout=5.)
+        self.grabber = None
+        return
+
+    # Grabber thread: read frames as fast as the camera delivers them so the OpenCV
+    # buffer never holds stale frames. Frames are counted even if the read fails.
+    def grab_frames(self):
+        while not self.grabberStop.is_set():
+            # Timestamp the middle of the read
+            t0 = time.monotonic_ns()
+            ret, frame = self.opencvdev.read()
+            t1 = time.monotonic_ns()
+            t = datetime.datetime.now() - datetime.timedelta(microseconds=(time.monotonic_ns()-(t0+t1)//2)/1e3)
+            with self.grabberLock:
+                self.grabbedFrames += 1
+                if ret:
+                    self.ringBuffer.append((self.grabbedFrames-1, t, frame, (t1-t0)/1e9))
+                    self.grabberError = None
+                else:
+                    self.grabberError = "OpenCV Webcam capture failed"
+            if not ret: time.sleep(0.01) # don't spin on a disconnected camera
+        return
+
+    # Return the newest n frames from the ring buffer as a list of (frame number, timestamp, frame, read time).
+    # Only waits if fewer than n frames have been captured since the grabber started. A query made faster
+    # than the camera's frame rate gets some of the same frames again; log_hdf5 skips those.
+    def latest_frames(self, n, timeout=5.):
+        t0 = time.time()
+        while True:
+            with self.grabberLock:
+                frames = list(self.ringBuffer)[-n:]
+                error = self.grabberError
+            if len(frames) >= n: return frames
+            if (time.time()-t0 > timeout) or not self.grabber.is_alive():
+                if error is None: error = "OpenCV Webcam did not return %i frames within %.1f s" % (n, timeout)
+                raise pyLabDataLoggerIOError(error)
+            time.sleep(0.005)
+
     # Apply configuration changes to the driver (subdriver-specific)
     def apply_config(self):
         subdriver = self.params['driver'].split('/')[1:]
@@ -200,9 +272,6 @@ class opencvDevice(device):
         self.apply_config()
         return
 
-    def updateTimestamp(self):
-        self.lastValueTimestamp = datetime.datetime.now()
-
     # Re-establish connection to device.
     def reset(self):
         self.deactivate()
@@ -234,89 +303,126 @@ class opencvDevice(device):
             self.config['offset']=[0.]
             self.params['n_channels']=self.config['n_frames']
             self.frame_counter = -1 # reset frame counter. It'll be incremented up to zero before the first save.
+            self.loggedFrame = -1
 
         # Get Image(s)
         self.lastValue = []
+        self.lastFrameTimestamps = None
+        self.lastFrameNumbers = None
+        if self.grabber is not None:
+            # Newest frames from the grabber thread, with their own capture times
+            frames = self.latest_frames(self.config['n_frames'])
+            self.lastValue = [ f[2] for f in frames ]
+            self.lastFrameTimestamps = [ f[1] for f in frames ]
+            self.lastFrameNumbers = [ f[0] for f in frames ]
+            self.frame_counter = frames[-1][0]
+            if self.live_preview: self.preview()
+        else: self.read_frames()
+
+        # Generate scaled values. Convert non-numerics to NaN
+        # Frames are only scaled on access, and not copied at all if scale=1 and offset=0.
+        lastValueSanitized = []
+        for v in self.lastValue: 
+            if v is None: lastValueSanitized.append(np.nan)
+            else: lastValueSanitized.append(v)
+        self.lastScaled = self.scaledFrames(lastValueSanitized)
+        self.updateTimestamp()
+        if self.lastFrameTimestamps is not None:
+            self.lastValueTimestamp = self.lastFrameTimestamps[-1]
+            self.lastTimestampUncertainty = frames[-1][3]
+        return self.lastValue
+
+    # Read n_frames synchronously from the camera (when not using the grabber thread).
+    def read_frames(self):
+        self.acquisitionStart()
         for j in range(self.config['n_frames']):
             ret, frame = self.opencvdev.read()
+            self.acquisitionEnd()
             self.frame_counter += 1 # increment counter even if image not returned
             if ret:
                 self.lastValue.append(frame[...])
                 # Set up live preview mode if requested
                 if j==0 and self.live_preview:
-                    cprint("\tlive_preview: displaying frame_%08i" % self.frame_counter, 'green')
-                    cv2.imshow('pyLabDataLogger: %s' % (self.params['name']),frame)
-                    if cv2.waitKey(1000) & 0xFF == ord('q'): break  # require a 1000ms wait
+                    if self.preview(wait=1000) & 0xFF == ord('q'): break  # require a 1000ms wait
             else:
                 self.lastValue.append(np.array((np.nan,)))
                 raise pyLabDataLoggerIOError("OpenCV Webcam capture failed")
+        return
 
-        # Generate scaled values. Convert non-numerics to NaN
-        lastValueSanitized = []
-        for v in self.lastValue: 
-            if v is None: lastValueSanitized.append(np.nan)
-            else: lastValueSanitized.append(v)
-        self.lastScaled = np.array(lastValueSanitized) * self.config['scale'] + self.config['offset']
-        self.updateTimestamp()
-        return self.lastValue
 
+    # Show the first frame of sample (default: the last query) in the live preview window, and wait
+    # up to wait ms for a key press. Returns the key code as cv2.waitKey does (-1 for none).
+    # sample can be a snapshot taken by multiThreadedLogger, drawn from the main thread.
+    def preview(self, sample=None, wait=1):
+        if sample is None: sample = self
+        if (len(sample.lastValue) == 0) or not isinstance(sample.lastValue[0], np.ndarray): return -1
+        if getattr(sample,'lastFrameNumbers',None) is not None: frame_number = sample.lastFrameNumbers[0]
+        else: frame_number = sample.frame_counter-len(sample.lastValue)+1
+        cprint("\tlive_preview: displaying frame_%08i" % frame_number, 'green')
+        cv2.imshow('pyLabDataLogger: %s' % (self.params['name']),sample.lastValue[0])
+        return cv2.waitKey(wait)
 
     # log to HDF5 file - overload function
+    # filename can be a path or an open hdf5Writer session.
     def log_hdf5(self, filename, max_records=None):
-        try:
-            import h5py
-        except ImportError:
-            cprint( "Please install h5py", 'red', attrs=['bold'])
+        if not isinstance(filename, hdf5Writer.hdf5Writer):
+            with hdf5Writer.hdf5Writer(filename, max_records=max_records) as writer:
+                self.log_hdf5(writer)
             return
+        writer = filename
         
-        # Open file
-        with h5py.File(filename, 'a') as fh:
-
-            # Load group for this device.
-            if 'name' in self.config: devname = self.config['name']
-            elif 'name' in self.params: devname = self.params['name']
-            else: devname = self.name
-            if devname in fh: dg = fh[devname]
-            else:
-                dg = fh.create_group(devname)
-                # On creation, add attributes from config and params
-                for attr in self.params.keys():
-                    dg.attrs[attr] = repr(self.params[attr])
-                for attr in self.config.keys():
-                    dg.attrs[attr] = repr(self.config[attr])
-
-            # Create/update timestamp dataset
-            # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
-            if 'timestamp' in dg:
-                td = dg['timestamp']
-                td.resize([td.shape[0]+1,])
-                td[-1] = str(self.lastValueTimestamp)
-            else:
-                dg.create_dataset('timestamp',data=[str(self.lastValueTimestamp)],maxshape=(max_records,))
-
-
-            # Write images into dg...
-            for j in range(len(self.lastValue)):
-                dsname = 'frame_%08i' % (self.frame_counter-len(self.lastValue)+j+1)
-                if dsname in dg:
-                    cprint( "\tOverwriting image %s in HDF5 log file!" % dsname, 'yellow')
-                    del dg[dsname]
-                
-                # Flip colours in dataset - 21/5/20
-                dset=dg.create_dataset(dsname, data=np.flip(self.lastValue[j],axis=2), dtype='uint8', chunks=True,\
-                                        compression='gzip', compression_opts=1) # apply fast compression
-                
-                #Set the image attributes
-                dset.attrs.create('CLASS', 'IMAGE')
-                dset.attrs.create('IMAGE_VERSION', '1.2')
-                dset.attrs.create('IMAGE_SUBCLASS', 'IMAGE_TRUECOLOR')
-                dset.attrs.create('INTERLACE_MODE', 'INTERLACE_PIXEL')
-                #dset.attrs['IMAGE_COLORMODEL'] = 'RGB'
+        # Load group for this device.
+        dg = writer.device_group(self)
+
+        # Create/update timestamp dataset
+        # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
+        writer.append_timestamp(dg, self.lastValueTimestamp)
+        self.log_timestamp_uncertainty(writer, dg)
+
+        # Write images into dg...
+        for j in range(len(self.lastValue)):
+            if self.lastFrameNumbers is not None: frame_number = self.lastFrameNumbers[j]
+            else: frame_number = self.frame_counter-len(self.lastValue)+j+1
+
+            # The grabber returns the newest frames without waiting for new ones, so skip frames already logged
+            if frame_number <= self.loggedFrame:
+                if not self.quiet: cprint( "\tframe_%08i already logged, skipped" % frame_number, 'yellow')
+                continue
+            self.loggedFrame = frame_number
+
+            # Stacked mode: append to one (N, H, W, C) dataset
+            if writer.stack_frames:
+                if isinstance(self.lastValue[j], np.ndarray):
+                    # Frames from the grabber thread carry their own capture time
+                    if self.lastFrameTimestamps is not None: frame_time = self.lastFrameTimestamps[j]
+                    else: frame_time = self.lastValueTimestamp
+                    writer.append_frame(dg, self.lastValue[j], frame_time, frame_number, dtype='uint8',\
+                                        transform=lambda I: np.flip(I,axis=2))
+                else:
+                    cprint( "\tFrame %i of %s is not an image, not logged" % (frame_number, self.name), 'yellow')
+                continue
+
+            dsname = 'frame_%08i' % frame_number
+            if dsname in dg:
+                cprint( "\tOverwriting image %s in HDF5 log file!" % dsname, 'yellow')
+                del dg[dsname]
             
-            fh.close()
+            # Flip colours in dataset - 21/5/20
+            dset=dg.create_dataset(dsname, data=np.flip(self.lastValue[j],axis=2), dtype='uint8', chunks=True,\
+                                    compression='gzip', compression_opts=1) # apply fast compression
+            
+            #Set the image attributes
+            dset.attrs.create('CLASS', 'IMAGE')
+            dset.attrs.create('IMAGE_VERSION', '1.2')
+            dset.attrs.create('IMAGE_SUBCLASS', 'IMAGE_TRUECOLOR')
+            dset.attrs.create('INTERLACE_MODE', 'INTERLACE_PIXEL')
+            #dset.attrs['IMAGE_COLORMODEL'] = 'RGB'
+
+        writer.end_sample()
+        return
 
     # log to text file - overload function
-    def log_text(self, filename):
+    def log_text(self, filename, raw_only=False):
         # In "text" mode, perhaps just save a JPEG file?
         raise RuntimeError("Not implemented")
 
@@ -186,9 +186,6 @@ class pyvisaDevice(device):
         self.apply_config()
         return
 
-    def updateTimestamp(self):
-        self.lastValueTimestamp = datetime.datetime.now()
-
     # Re-establish connection to device.
     def reset(self):
         self.deactivate()
@@ -471,8 +468,10 @@ class pyvisaDevice(device):
             self.configure_device()
         
 
-        # Read values        
+        # Read values, bracketing the transaction for the timestamp
+        self.acquisitionStart()
         self.get_values()
+        self.acquisitionEnd()
 
         # Run postQuery if exists (ie put the device in mode ready to accept next trigger/data)
         if self.postQuery is not None:
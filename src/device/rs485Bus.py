@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Shared multi-drop RS-485 bus.
+
+    Several addressed instruments on one RS-485 line share a single serial port.
+    The bus opens the port once, gives it to one node at a time for a transaction
+    (a request and its response, or a pipelined batch), waits the direction-switch
+    turnaround once between transactions, and serves waiting nodes in turn so a
+    node polled quickly can't starve the others. Bus utilization and per-node
+    queueing and transaction times are kept as statistics.
+
+        bus = rs485Bus.open_bus('/dev/ttyUSB0', params)  # params as for serial.Serial
+        bus.attach(1, 'K3HB-VLC')
+        bus.acquire(1)
+        bus.Serial.write(request) ...
+        bus.release(1)
+
+    serialDevice does this for the K3HB and omega-iseries/485 drivers
+    (params['rs485_address'] is the node number).
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time, threading
+from termcolor import cprint
+from .device import pyLabDataLoggerIOError
+
+try:
+    import serial
+except ImportError:
+    cprint( "Please install pySerial", 'red', attrs=['bold'])
+    raise
+
+TURNAROUND_CHARS = 3.5     # default direction-switch delay in character times (the Modbus RTU inter-frame gap)
+MIN_TURNAROUND = 0.00175   # but at least this long (s)
+PORT_PARAMS = ('baudrate', 'bytesize', 'parity', 'stopbits', 'xonxoff', 'rtscts')  # must agree on one bus
+WAIT_TIMEOUT = 30.         # longest a node waits for the bus before giving up (s)
+
+# Open buses by port name, shared by every device on the port.
+BUSES = {}
+BUSES_LOCK = threading.Lock()
+
+# Return the bus on port, opening it if this is its first user. The port settings are taken from params
+# (the keys in PORT_PARAMS, and 'timeout'); every device on a bus must use the same settings.
+# turnaround is the direction-switch delay in seconds (default TURNAROUND_CHARS character times).
+def open_bus(port, params, turnaround=None):
+    with BUSES_LOCK:
+        bus = BUSES.get(port)
+        if bus is None:
+            bus = rs485Bus(port, params, turnaround)
+            BUSES[port] = bus
+        else:
+            for k in PORT_PARAMS:
+                if params[k] != bus.params[k]:
+                    raise ValueError("RS-485 bus %s is already open with %s=%s, not %s" % (port, k, bus.params[k], params[k]))
+        bus.users += 1
+    return bus
+
+# Detach node from bus, and close the port when its last user has gone.
+def release_bus(bus, node=None):
+    with BUSES_LOCK:
+        if node is not None: bus.detach(node)
+        bus.users -= 1
+        if bus.users <= 0:
+            bus.close()
+            if BUSES.get(bus.port) is bus: del BUSES[bus.port]
+    return
+
+
+class rs485Bus:
+    """ One RS-485 port shared by addressed nodes.
+
+        Nodes (usually the instrument's bus address) attach() and then bracket each transaction with
+        acquire() and release(). While a node holds the bus, nothing else uses the port. When the bus
+        is freed, the next node in attach order with a transaction waiting gets it, so polling is
+        interleaved fairly. The turnaround delay is waited once before each transaction, counted from
+        the end of the last one, and stale bytes (ie a late reply to another node) are flushed.
+
+        stats(node) gives bus utilization (fraction of time in transactions), and the node's
+        transaction count, queueing wait and transaction time.
+    """
+
+    def __init__(self, port, params, turnaround=None):
+        self.port = port
+        self.params = dict([(k, params[k]) for k in PORT_PARAMS])
+        self.Serial = serial.Serial(port=port, timeout=params['timeout'], **self.params)
+        if turnaround is None:
+            bits = 1 + self.Serial.bytesize + (self.Serial.parity != serial.PARITY_NONE) + self.Serial.stopbits
+            turnaround = max(MIN_TURNAROUND, TURNAROUND_CHARS*bits/float(self.Serial.baudrate))
+        self.turnaround = turnaround
+        self.users = 0
+        self.lock = threading.Condition()
+        self.nodes = []       # attached nodes in polling order
+        self.names = {}
+        self.waiting = {}     # node: transactions waiting for the bus
+        self.owner = None     # node holding the bus
+        self.last_node = None # node served last
+        self.t_open = time.monotonic()
+        self.t_free = 0.      # when the last transaction ended
+        self.t_start = None   # when the current one started
+        self.busy_time = 0.
+        self.turnaround_time = 0.
+        self.node_stats = {}
+        return
+
+    def close(self):
+        self.Serial.close()
+        return
+
+    # Add a node. Two devices can't share an address.
+    def attach(self, node, name=''):
+        with self.lock:
+            if node in self.nodes:
+                raise ValueError("RS-485 bus %s: address %s is already used by %s" % (self.port, node, self.names[node]))
+            self.nodes.append(node)
+            self.names[node] = name
+            self.waiting[node] = 0
+            self.node_stats[node] = {'transactions':0, 'wait':0., 'wait_max':0., 'time':0., 'time_max':0., 'last':0.}
+        return
+
+    def detach(self, node):
+        with self.lock:
+            if node in self.nodes:
+                self.nodes.remove(node)
+                del self.waiting[node]
+            self.lock.notify_all()
+        return
+
+    # The waiting node to serve next: the first one after the last node served, in attach order.
+    def next_node(self):
+        n = len(self.nodes)
+        if self.last_node in self.nodes: first = self.nodes.index(self.last_node)+1
+        else: first = 0
+        for j in range(n):
+            node = self.nodes[(first+j) % n]
+            if self.waiting[node] > 0: return node
+        return None
+
+    # Wait for the bus, then take it for a transaction by node. The port's read timeout is set to timeout,
+    # if given, since each node can need a different one. If the bus isn't free within wait_timeout seconds
+    # (ie another node has hung while holding it), pyLabDataLoggerIOError is raised.
+    def acquire(self, node, timeout=None, wait_timeout=WAIT_TIMEOUT):
+        t0 = time.monotonic()
+        with self.lock:
+            if not node in self.nodes: raise ValueError("RS-485 bus %s: address %s is not attached" % (self.port, node))
+            self.waiting[node] += 1
+            while (self.owner is not None) or (self.next_node() != node):
+                remaining = t0 + wait_timeout - time.monotonic()
+                if remaining <= 0:
+                    if node in self.waiting: self.waiting[node] -= 1
+                    self.lock.notify_all() # the next node may be served instead
+                    raise pyLabDataLoggerIOError("RS-485 bus %s: address %s waited %.1f s for the bus, held by address %s" %\
+                                                 (self.port, node, wait_timeout, self.owner))
+                self.lock.wait(remaining)
+            self.waiting[node] -= 1
+            self.owner = node
+
+        # Direction switch. Anything left in the receive buffer belongs to an earlier transaction.
+        t1 = time.monotonic()
+        delay = self.t_free + self.turnaround - t1
+        if delay > 0:
+            time.sleep(delay)
+            self.turnaround_time += delay
+        self.Serial.reset_input_buffer()
+        if (timeout is not None) and (self.Serial.timeout != timeout): self.Serial.timeout = timeout
+
+        self.t_start = time.monotonic()
+        s = self.node_stats[node]
+        s['wait'] += t1 - t0
+        s['wait_max'] = max(s['wait_max'], t1 - t0)
+        return
+
+    # End node's transaction and hand the bus to the next node waiting.
+    def release(self, node):
+        with self.lock:
+            if self.owner != node: raise RuntimeError("RS-485 bus %s: address %s released the bus without holding it" % (self.port, node))
+            self.t_free = time.monotonic()
+            dt = self.t_free - self.t_start
+            self.busy_time += dt
+            s = self.node_stats[node]
+            s['transactions'] += 1
+            s['time'] += dt
+            s['time_max'] = max(s['time_max'], dt)
+            s['last'] = dt
+            self.owner = None
+            self.last_node = node
+            self.lock.notify_all()
+        return
+
+    # Fraction of the time since the port was opened that it has been in use, including turnarounds.
+    def utilization(self):
+        elapsed = time.monotonic() - self.t_open
+        if elapsed <= 0: return 0.
+        return (self.busy_time + self.turnaround_time) / elapsed
+
+    # Statistics for the log file: bus utilization and node's transaction count, mean and max queueing
+    # wait and transaction time (s). With node=None, just the bus.
+    def stats(self, node=None):
+        with self.lock:
+            st = {'utilization':self.utilization(), 'turnaround':self.turnaround, 'nodes':len(self.nodes)}
+            if node in self.node_stats:
+                s = self.node_stats[node]
+                n = max(1, s['transactions'])
+                st.update({'transactions':s['transactions'], 'wait_mean':s['wait']/n, 'wait_max':s['wait_max'],\
+                           'latency_mean':s['time']/n, 'latency_max':s['time_max'], 'latency_last':s['last']})
+        return st
+
+    # Print utilization and per-node statistics.
+    def report(self):
+        cprint("\tRS-485 bus %s: %i nodes, %.1f%% utilization, %.2f ms turnaround" % (self.port, len(self.nodes),\
+               100*self.utilization(), 1e3*self.turnaround), 'cyan')
+        for node in self.nodes:
+            s = self.stats(node)
+            cprint("\t\taddress %s (%s): %i transactions, latency %.1f ms mean %.1f ms max, wait %.1f ms mean %.1f ms max" %\
+                   (node, self.names[node], s['transactions'], 1e3*s['latency_mean'], 1e3*s['latency_max'],\
+                    1e3*s['wait_mean'], 1e3*s['wait_max']), 'cyan')
+        return
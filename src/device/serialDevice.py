@@ -56,14 +56,24 @@
         08/06/2025 - Chemyx support
         23/02/2026 - CA100 support
         26/02/2026 - Updated alicat support for newer models firmware
+        17/10/2026 - Buffered serial reads instead of one byte at a time
+        17/10/2026 - Streaming response framer, used for Omron K3HB
+        17/10/2026 - Automatic response latency calibration with params['auto_latency']
+        17/10/2026 - Pipelined queries for K3HB and PT200M
+        17/10/2026 - Subdriver registry replaces the if/elif chains in configure_device and convert_raw_string_to_values
+        17/10/2026 - Precompiled decoders for K3HB, HPMA, TC08 and USB-H responses
+        17/10/2026 - Generic Modbus RTU support with batched register reads
+        17/10/2026 - Shared RS-485 bus for K3HB and Omega iSeries nodes, params['rs485_address']
+        17/10/2026 - Port lookup through the shared serialPorts inventory
         
 """
 
 from .device import device
 from .device import pyLabDataLoggerIOError
+from . import serialFramer, modbusRTU, rs485Bus, serialPorts
 import numpy as np
 import datetime, time, struct, sys, os
-import binascii
+import binascii, json
 from termcolor import cprint
 
 try:
@@ -73,6 +83,37 @@ except ImportError:
     raise
 
 
+# Response latency calibration (params['auto_latency']=True)
+LATENCY_CACHE = os.path.join(os.path.expanduser('~'), '.pyLabDataLogger', 'serial_latency.json')
+LATENCY_REPEATS = 5         # turnarounds measured per command
+LATENCY_MARGIN = 3.         # learned timeout is this many times the slowest turnaround,
+LATENCY_MIN_TIMEOUT = 0.05  # but at least this long (s)
+LATENCY_TUNABLE = ('blockingSerialRequest', 'blockingRawSerialRequest', 'framedSerialRequest')
+
+ISERIES_CONNECT_TRIES = 10  # requests for the Omega iSeries version before giving up
+MODBUS_MAX_FAILURES = 3     # consecutive failed Modbus reads (timeout or bad CRC) before the error is raised
+
+# Decoders for fixed-format responses, built once rather than on every sample.
+# Omron K3HB CompoWay/F read response: STX, node(2), sub-address(2), end code(2), MRC(2), SRC(2),
+# response code(4), data(8 hex digits), ETX, BCC
+K3HB_RESPONSE = struct.Struct('x2s2s2s2s2s4s8sxx')
+HPMA_READING = struct.Struct('>2h')  # PM2.5, PM10
+TC08_READING = struct.Struct('>?H')  # negative flag, counts
+OMEGA_USBH_FRAME = np.dtype([('header','V2'), ('value','<f4')])  # 6 byte frames: 2 byte header, float
+
+########################################################################################################################
+class serialSubdriver:
+    """ Registry entry for a serialDevice subdriver (see SUBDRIVERS).
+        configure(dev) is the startup config: it sets the name, channels, units, serialQuery and comms function.
+        parse(dev, rawData, requests) converts the responses to serialQuery into a list of values.
+        cumulative subdrivers keep lastValue between reads instead of resetting it to NaN.
+    """
+    def __init__(self, configure, parse, cumulative=False):
+        self.configure = configure
+        self.parse = parse
+        self.cumulative = cumulative
+        return
+
 ########################################################################################################################
 class serialDevice(device):
     """ Class providing support for any tty type serial device. 
@@ -102,6 +143,7 @@ class serialDevice(device):
             'serial/k3hb/vlc'          : Omron K3HB-VLC Load Cell Amplifier with FLK1B communications board
             'serial/k3hb/x'            : Omron K3HB-X Ammeter with FLK1B communications board
             'serial/lc-adc-f103c8'     : LC STM32 10 channel ADC
+            'serial/modbus'            : Any Modbus RTU device(s), with registers listed in params['modbus_registers']
             'serial/mx5060'            : Metrix MX5060 Bench Multimeter 
             'serial/omega-ir-usb'      : Omega IR-USB temperature probe with built in USB to Serial converter
             'serial/omega-iseries/232' : Omega iSeries Process Controller via RS232 transciever
@@ -116,6 +158,24 @@ class serialDevice(device):
             'serial/tc08rs232'         : Pico TC08 RS-232 thermocouple datalogger (USB version has a seperate driver 'picotc08')
             'serial/tds220gpib'        : Tektronix TDS22x series oscilloscopes
             'serial/wtb'               : Radwag WTB precision balance/scale
+
+        Set params['auto_latency']=True to replace the driver's fixed delay between request and response with
+        a wait for the response itself, using a timeout learned from the device's measured turnaround. The
+        measurement is made once per device and cached in LATENCY_CACHE (or params['latency_cache']);
+        set params['recalibrate_latency']=True to measure again.
+
+        Set params['pipeline']=True to send all of a poll's queries back to back, for subdrivers that support it
+        (K3HB and PT200M). This is off by default: on a half-duplex line the instrument must buffer requests
+        while it is still replying, which hasn't been verified on hardware. params['pipeline_depth'] limits
+        the requests in flight.
+
+        RS-485 instruments (K3HB and omega-iseries/485) share their port through an rs485Bus, so several of them
+        can be logged from one bus. Give each one its node number in params['rs485_address'] (default 1) and the
+        same port. Set params['rs485_turnaround'] to override the direction-switch delay (s), or params['rs485_bus']=False
+        to open the port directly. A query that can't get the bus within params['rs485_wait_timeout'] seconds
+        (default 30) raises pyLabDataLoggerIOError.
+
+        Each subdriver has a configure_<name> and parse_<name> method, registered in SUBDRIVERS at the end of this file.
     """
 
 
@@ -127,6 +187,10 @@ class serialDevice(device):
         self.lastValue = None # Last known value (for logging)
         self.lastValueTimestamp = None # Time when last value was obtained
         self.Serial = None
+        self.rxBuffer = bytearray() # bytes read past the end of the last response
+        self.framer = None # serialFramer.framer for subdrivers using framedSerialRequest
+        self.bus = None # rs485Bus.rs485Bus shared with other nodes on the port, if any
+        self.busNode = None
         self.tty_prefix = tty_prefix
         
         if 'quiet' in kwargs: self.quiet = kwargs['quiet']
@@ -178,105 +242,18 @@ class serialDevice(device):
             self.port = self.params['port']
         elif 'pid' in self.params.keys() and 'vid' in self.params.keys(): # USB serial
             
-            # This will find all serial ports available to pySerial.
+            # Look up the port in the inventory of serial ports available to pySerial (see serialPorts).
             # We hope the USB device scanned in usbDevice.py can be found here.
-            # We need to find an exact match - there may be multiple generic devices.
-            from serial.tools import list_ports
-            
-            # This subroutine will check for matching bus-address locations
-            # to identify a particular device even if VID and PID are generic.
-            def locationMatch(serialport):
-                # Check for bus and port match (for multiple generic serial adapters...)
-                if ('port_numbers' in self.params) and ('bus' in self.params) and ('location' in dir(serialport)):
-                    search_location = '%i-%s' % (self.params['bus'],'.'.join(['%i'% nn for nn in self.params['port_numbers']]))
-                    if search_location == serialport.location:
-                        if not self.quiet: cprint( '\tVID:PID match- location %s == %s' % (search_location,\
-                                                  serialport.location) , 'green')
-                        return True
-                        
-                    elif ((':' not in search_location) and (':' in serialport.location)): # if '2-1' doesn't match '2-1:1.0' for example.
-                        if search_location in serialport.location:
-                            if not self.quiet: cprint( '\tVID:PID match- location %s == %s' % (search_location,\
-                                                  serialport.location) , 'green')
-                            return True
-                    
-                    else:
-                        if not self.quiet: cprint( '\tVID:PID match but location %s does not match %s' % (search_location,\
-                                                serialport.location), 'yellow' )
-                        return False
-                else:
-                    # If the feature is unsupported, assume first device is the real one! We can't check.
-                    return True
-                    
-            
-            #####################################################################################################################
-            # scan all serial ports the OS can see
-            for serialport in list_ports.comports():
-                
-                # Not all versions of pyserial have the list_ports_common module!		
-                if 'list_ports_common' in dir(serial.tools):
-                    objtype=serial.tools.list_ports_common.ListPortInfo
-                else:
-                    objtype=None
-
-                # if serialport returns a ListPortInfo object
-                if objtype is not None and isinstance(serialport,objtype):
-                    
-                    thevid = serialport.vid
-                    thepid = serialport.pid
-                    if thevid==self.params['vid'] and thepid==self.params['pid'] and locationMatch(serialport):
-                        self.params['tty']=serialport.device
-                        self.port=serialport.device
-            
-                # if the returned device is a list, tuple or dictionary
-                elif len(serialport)>1:
-
-		            # Some versions return a dictionary, some return a tuple with the VID:PID in the last string.
-                    if 'VID:PID' in serialport[-1]: # tuple or list
-                        thename = serialport[0]
-                        # Sometimes serialport[-1] will contain "USB VID:PID=0x0000:0x0000" and
-                        # sometimes extra data will follow after, i.e. "USB VID:PID=1234:5678 SERIAL=90ab".
-                        if not self.quiet: print( '\t'+str(serialport[-1])) # report to terminal, useful for debugging.
-                        vididx = serialport[-1].upper().index('PID')
-                        if vididx <= 0: raise IndexError("Can't interpret USB VID:PID information!")
-                        vidpid = serialport[-1][vididx+4:vididx+13] # take fixed set of chars after 'PID='
-                        thevid,thepid = [ int(val,16) for val in vidpid.split(':')]
-                        if thevid==self.params['vid'] and thepid==self.params['pid'] and locationMatch(serialport):
-                            
-                            if not self.quiet: print( '\t'+str(serialport))
-                            if thename is not None:
-                                self.port = thename # Linux
-                            else:
-                                self.port = serialport.device # MacOS
-                            if not self.tty_prefix in self.port: self.port = self.tty_prefix + self.port
-                            self.params['tty']=self.port
-
-                    elif 'vid' in dir(serialport): # dictionary
-                        if serialport.vid==self.params['vid'] and serialport.pid==self.params['pid'] and locationMatch(serialport):
-                            # Vid/Pid matching
-                            if not self.quiet: print( '\t'+str(serialport.hwid)+' '+str(serialport.name))
-                            if serialport.name is not None:
-                                self.port = serialport.name # Linux
-                            else:
-                                self.port = serialport.device # MacOS
-                            if not self.tty_prefix in self.port: self.port = self.tty_prefix + self.port
-                            self.params['tty']=self.port
-
-                # List or dict with only one entry.
-                elif len(list_ports.comports())==1: # only one found, use as default
-                    self.port = serialport[0]
-                    if not self.tty_prefix in self.port: self.port = self.tty_prefix + self.port
-                    self.params['tty']=self.port
-
-                if 'tty' in self.params:
-                    if os.path.exists(self.params['tty']): break
-            #####################################################################################################################
+            # We need to find an exact match - there may be multiple generic devices, so the
+            # bus-address location is checked to identify a particular device even if VID and PID are generic.
+            self.port = serialPorts.find_port(self.params, self.tty_prefix, self.quiet)
+            if self.port is not None: self.params['tty']=self.port
         
         if self.port is None:
             cprint( "\tUnable to connect to serial port - port unknown.", 'red', attrs=['bold'])
             cprint( "\tYou may need to install a specific USB-to-Serial driver.",'red')
             cprint( "\tfound non-matching ports:", 'red')
-            cprint( list_ports.comports()[0], 'red')
+            serialPorts.report_ports()
             raise pyLabDataLoggerIOError("Serial port driver missing")
         
         else: self.activate()
@@ -406,10 +383,24 @@ class serialDevice(device):
                                     self.params['stopbits'], self.params['xonxoff'],\
                                     self.params['rtscts'], self.params['timeout']), 'green')
                                     
-        self.Serial = serial.Serial(port=self.port, baudrate=self.params['baudrate'],\
-                                    bytesize=self.params['bytesize'], parity=self.params['parity'],\
-                                    stopbits=self.params['stopbits'], xonxoff=self.params['xonxoff'],\
-                                    rtscts=self.params['rtscts'], timeout=self.params['timeout'])
+        if self.uses_rs485_bus():
+            # Share the port with the other nodes on the bus
+            if not 'rs485_address' in self.params.keys(): self.params['rs485_address']=1
+            self.bus = rs485Bus.open_bus(self.port, self.params, turnaround=self.params.get('rs485_turnaround'))
+            try:
+                self.bus.attach(self.params['rs485_address'], self.params['driver'])
+            except ValueError:
+                rs485Bus.release_bus(self.bus)
+                self.bus = None
+                raise
+            self.busNode = self.params['rs485_address']
+            self.Serial = self.bus.Serial
+        else:
+            self.Serial = serial.Serial(port=self.port, baudrate=self.params['baudrate'],\
+                                        bytesize=self.params['bytesize'], parity=self.params['parity'],\
+                                        stopbits=self.params['stopbits'], xonxoff=self.params['xonxoff'],\
+                                        rtscts=self.params['rtscts'], timeout=self.params['timeout'])
+        self.rxBuffer = bytearray()
         
         self.driverConnected=True
                                     
@@ -421,10 +412,18 @@ class serialDevice(device):
     ########################################################################################################################
     # Deactivate connection to device (close serial port)
     def deactivate(self):
-        self.Serial.close()
+        if self.bus is not None:
+            rs485Bus.release_bus(self.bus, self.busNode)
+            self.bus = None
+        else: self.Serial.close()
         self.driverConnected=False
         return
 
+    # True if this device is a node on a shared RS-485 bus (see rs485Bus).
+    def uses_rs485_bus(self):
+        default = (self.subdriver=='k3hb') or (self.driver==['omega-iseries','485'])
+        return self.params.get('rs485_bus', default)
+
     ########################################################################################################################
     # Apply configuration changes to the driver (subdriver-specific)
     def apply_config(self):
@@ -479,9 +478,6 @@ class serialDevice(device):
         self.apply_config()
         return
 
-    def updateTimestamp(self):
-        self.lastValueTimestamp = datetime.datetime.now()
-
     # Re-establish connection to device.
     def reset(self):
         self.deactivate()
@@ -489,6 +485,50 @@ class serialDevice(device):
         if self.driverConnected: self.activate()
         else: cprint( "Error resetting %s: device is not detected" % self.name, 'red', attrs=['bold'])
 
+    ########################################################################################################################
+    # Convert a response terminator given as str, bytes or int (ie ord('\r')) to bytes.
+    # An empty result means there is no terminator.
+    @staticmethod
+    def terminator_bytes(terminationChar):
+        if isinstance(terminationChar, int): return bytes([terminationChar])
+        if isinstance(terminationChar, str): return terminationChar.encode('latin-1')
+        if isinstance(terminationChar, (bytes, bytearray)): return bytes(terminationChar)
+        return b'' # None or []
+
+    ########################################################################################################################
+    # Read a response into a buffer until the terminator ends it after more than min_response_length bytes,
+    # maxlen bytes have been read, or timeout seconds have passed. Each read takes everything waiting in the
+    # port's input buffer, or blocks for the next byte (up to the port timeout) if there is nothing waiting.
+    # At least one read is made, even if timeout has already passed.
+    # If stop_on_empty, give up when the first read times out with nothing received.
+    # Returns (bytes read, length of the response including its terminator, or None if not terminated).
+    # Bytes read after the terminator are kept in self.rxBuffer for the next response.
+    def read_response(self,terminationChar,maxlen,min_response_length=0,timeout=None,stop_on_empty=False):
+        term = self.terminator_bytes(terminationChar)
+        if timeout is None: timeout = self.params['timeout_total']
+        buf = self.rxBuffer
+        self.rxBuffer = bytearray()
+        t_end = time.time() + timeout
+        start = 0 # where to resume the terminator search
+        first = True
+        while True:
+            if len(term) > 0:
+                i = buf.find(term, start)
+                while (i >= 0) and (i+len(term) <= min_response_length): i = buf.find(term, i+1)
+                if i >= 0:
+                    end = i+len(term)
+                    self.rxBuffer = buf[end:]
+                    return bytes(buf[:end]), end
+                start = max(0, len(buf)-len(term)+1)
+            if (len(buf) >= maxlen) or ((time.time() > t_end) and not first): break
+            first = False
+            n = self.Serial.in_waiting
+            if n > 0: chunk = self.Serial.read(min(n, maxlen-len(buf)))
+            else: chunk = self.Serial.read(1)
+            if (len(chunk) == 0) and (len(buf) == 0) and stop_on_empty: break
+            buf += chunk
+        return bytes(buf), None
+
     ########################################################################################################################
     # Blocking call to send raw bytes on the serial port.  
     # This function will keep on transmitting at regular intervals until it gets a reply or hits timeout,
@@ -496,6 +536,7 @@ class serialDevice(device):
     def simpleSerialRequest(self,request,terminationChar=None,maxlen=None,min_response_length=0,sleeptime=0.1):
         self.Serial.reset_output_buffer()
         self.Serial.reset_input_buffer()
+        self.rxBuffer = bytearray()
         data=b''
         t_=time.time()
         while (data==b'') or (len(data)<min_response_length): # while read buffer not full enough
@@ -511,29 +552,21 @@ class serialDevice(device):
     # This method block is for devices that use a standard
     # method; call<CR/LF> -short delay- response<CR/LF>.
     # Works well for most RS-232 devices.
+    # Returns None if no terminated response arrives within timeout_total.
     def blockingSerialRequest(self,request,terminationChar='\r',maxlen=1024,min_response_length=0,sleeptime=0.01):
-        try:
-            s=b''
-            response=None
-            if len(request)>0:
-                if not self.quiet:
-                    sys.stdout.write('\t'+self.port+':'+repr(request)+'\t')
-                    sys.stdout.flush()
-                if type(request)==bytes: self.Serial.write(request)
-                else: self.Serial.write(request.encode('ascii'))
-            t_=time.time()
-            time.sleep(sleeptime)
-            while len(s)<maxlen:
-                s+=self.Serial.read(1)#.decode('ascii')
-                if len(s) == 0: # response timed out
-                    break
-                if (s[-1:] == terminationChar) and (len(s)>min_response_length):
-                    response=s.strip()
-                    break
-                if (time.time() - t_) > self.params['timeout_total']: raise pyLabDataLoggerIOError("timeout")
-            if not self.quiet: sys.stdout.write(repr(response)+'\n')
-        except pyLabDataLoggerIOError:
-            pass
+        if len(request)>0:
+            if not self.quiet:
+                sys.stdout.write('\t'+self.port+':'+repr(request)+'\t')
+                sys.stdout.flush()
+            if type(request)==bytes: self.Serial.write(request)
+            else: self.Serial.write(request.encode('ascii'))
+        t_=time.time()
+        time.sleep(sleeptime)
+        data, end = self.read_response(terminationChar,maxlen,min_response_length,\
+                                       timeout=self.params['timeout_total']-(time.time()-t_),stop_on_empty=True)
+        response=None
+        if end is not None: response=data.strip()
+        if not self.quiet: sys.stdout.write(repr(response)+'\n')
         return response
     
     ########################################################################################################################
@@ -541,30 +574,96 @@ class serialDevice(device):
     # This is useful if the length of the data could be arbitrary and not even whole numbers of bytes,
     # or if the read command doesn't reliably returned buffered data (i.e. for RS-485 where there is
     # some delay for the direction switching)
+    # Without a terminator, reads until maxlen bytes arrive or timeout_total.
+    # String requests are sent as latin-1, since some (ie Omega iSeries) carry parity bits in their characters.
     def blockingRawSerialRequest(self,request,terminationChar='\r',maxlen=1024,min_response_length=0,sleeptime=0.01):
-        try:
+        if not self.quiet:
+            sys.stdout.write('\t'+self.port+':'+repr(request)+'\t')
+            sys.stdout.flush()
+        if len(request)>0:
+            if type(request)==bytes: self.Serial.write(request)
+            else: self.Serial.write(request.encode('latin-1'))
+        t_=time.time()
+        time.sleep(sleeptime)
+        data, end = self.read_response(terminationChar,maxlen,min_response_length,\
+                                       timeout=self.params['timeout_total']-(time.time()-t_))
+        return data
+    
+    ########################################################################################################################
+    # Send a request and return the next complete frame assembled by self.framer (a serialFramer.framer set up
+    # by the subdriver in configure_device). There are no fixed delays: bytes are fed to the framer as they arrive
+    # until a frame is complete, so error responses shorter than expected return as soon as they end.
+    # Frames left over from an earlier request that timed out are dropped before sending.
+    # Returns b'' if no valid frame arrives within timeout_total.
+    def framedSerialRequest(self,request,terminationChar=None,maxlen=None,min_response_length=None,sleeptime=None):
+        if len(request)>0:
             if not self.quiet:
                 sys.stdout.write('\t'+self.port+':'+repr(request)+'\t')
                 sys.stdout.flush()
-            if len(request)>0:
-                if type(request)==bytes: self.Serial.write(request)
-                else: self.Serial.write(request.encode('ascii'))
-            t_=time.time()
-            time.sleep(sleeptime)
-            data=b''
-            while len(data)<maxlen:
-                data += self.Serial.read(1) #.decode('ascii')
-                if len(data) > 0:
-                    if (data[-1] == terminationChar) and (len(data)>min_response_length):
-                        break
-                if (time.time() - t_) > self.params['timeout_total']: raise pyLabDataLoggerIOError("timeout")
-        except pyLabDataLoggerIOError:
-            pass
-        return data
-    
+            self.framer.discard()
+            if type(request)==bytes: self.Serial.write(request)
+            else: self.Serial.write(request.encode('ascii'))
+        frame = self.read_frame()
+        if not self.quiet: sys.stdout.write(repr(frame)+'\n')
+        return frame
+
+    # Send several requests back to back, with up to pipelineDepth (or params['pipeline_depth']) awaiting a response
+    # at once, and return the responses demultiplexed by self.framer. This costs about one round trip rather than one
+    # per request. Responses must come back in the order the requests were sent; if one times out or fails its
+    # checksum, the rest can't be matched to their requests and are returned as b''.
+    def pipelinedSerialRequests(self,requests):
+        depth = max(1, self.params.get('pipeline_depth', self.pipelineDepth))
+        self.framer.discard()
+        responses = []
+        sent = 0
+        while len(responses) < len(requests):
+            while (sent < len(requests)) and (sent-len(responses) < depth):
+                if type(requests[sent])==bytes: self.Serial.write(requests[sent])
+                else: self.Serial.write(requests[sent].encode('ascii'))
+                sent += 1
+            bad_frames = self.framer.bad_frames
+            frame = self.read_frame()
+            if (len(frame) == 0) or (self.framer.bad_frames != bad_frames):
+                responses.extend([b'']*(len(requests)-len(responses)))
+                break
+            responses.append(frame)
+        if not self.quiet: sys.stdout.write('\t'+self.port+':'+repr(requests)+'\t'+repr(responses)+'\n')
+        return responses
+
+    # Read from the port into self.framer until it has a complete frame, and return it.
+    # Each read takes everything waiting, or blocks for the next byte (up to the port timeout).
+    # Returns b'' after timeout seconds (default timeout_total) without a frame.
+    def read_frame(self,timeout=None):
+        if timeout is None: timeout = self.params['timeout_total']
+        t_end = time.time() + timeout
+        while True:
+            frame = self.framer.get()
+            if frame is not None: return frame
+            if time.time() > t_end: return b''
+            n = self.Serial.in_waiting
+            if n > 0: self.framer.feed(self.Serial.read(n))
+            else: self.framer.feed(self.Serial.read(1))
+
+    ########################################################################################################################
+    # Read all the Modbus registers in self.modbusBlocks, coalesced into as few requests as possible.
+    # Returns the registers for each channel, or None if a transaction fails. After params['modbus_max_failures']
+    # consecutive failures the pyLabDataLoggerIOError is raised, so a dead device can be reconnected.
+    def modbusSerialRequest(self,request,terminationChar=None,maxlen=None,min_response_length=None,sleeptime=None):
+        try:
+            registers = self.modbus.read(self.modbusBlocks)
+        except pyLabDataLoggerIOError as e:
+            self.modbusFailures += 1
+            if self.modbusFailures >= self.params.get('modbus_max_failures', MODBUS_MAX_FAILURES):
+                self.modbusFailures = 0
+                raise
+            cprint( "\t%s: %s" % (self.name, e), 'red')
+            return None
+        self.modbusFailures = 0
+        return registers
+
     ########################################################################################################################
-    # Special function to handle MODBUS communications for ES-D508 devices. In future this could be replaced with
-    # a generic MODBUS communications handler, but for now I'll code it to use a special subroutine for this one device.
+    # Special function to handle MODBUS communications for ES-D508 devices. The drive's encoder readout doesn't
+    # follow standard Modbus framing, so esd508Device drives the port itself using the CRC from modbusRTU.
     def esd508_modbus(self,request,terminationChar=None,maxlen=99999,min_response_length=0,sleeptime=0.001):
         from pyLabDataLogger.device import esd508Device
         return esd508Device.move_servomotor(self.Serial, debugMode=self.debugMode, verbose=~self.quiet, \
@@ -575,14 +674,11 @@ class serialDevice(device):
     # the meter settings, specify a request string. To read normal data, no command need be sent, only
     # holding the RTS line high for long enough to receive an ASCII string terminated with \r.
     def p6000SerialRequest(self, request=b'',terminationChar=None,maxlen=None,min_response_length=None,sleeptime=None): 
-        data=b''
         if len(request) == 0:  # read data only
             self.Serial.rts=True; self.Serial.dtr=True
             time.sleep(0.05) # it takes at least 15 ms for the meter to respond, and it only updates every 1s or so.
             # The meter won't transmit if the gate is closed (ie no signal), this generates a timeout.
-            t=time.time()
-            while (not b'\r' in data) and ((time.time() - t)<self.params['timeout']):
-                data+=self.Serial.read(1)
+            data, end = self.read_response(b'\r', 1024, timeout=self.params['timeout'])
             if not self.quiet:
                 sys.stdout.write('\t'+self.port+':'+repr(data)+'\t')
                 sys.stdout.flush()
@@ -598,8 +694,7 @@ class serialDevice(device):
             time.sleep(0.01)
             self.Serial.rts=True; self.Serial.dtr=True
             time.sleep(0.015)
-            while not b'\r' in data:    
-                data+=self.Serial.read(1)
+            data, end = self.read_response(b'\r', 1024)
             if not self.quiet:
                 sys.stdout.write('\t'+self.port+':'+repr(data)+'\t')
                 sys.stdout.flush()
@@ -613,6 +708,16 @@ class serialDevice(device):
         for c in s[2:]: checksum ^= ord(c)
         return chr(checksum)
     
+    ########################################################################################################################
+    # Return the data field (8 hex digits) of an Omron K3HB CompoWay/F read response.
+    # Short responses (ie error codes), and empty or unframed ones (ie after a timeout), raise IndexError.
+    @staticmethod
+    def k3hb_data(r):
+        try:
+            return K3HB_RESPONSE.unpack_from(r, r.index(b'\x02'))[6]
+        except (struct.error, ValueError):
+            raise IndexError("Short or missing K3HB response %s" % repr(r))
+
     ########################################################################################################################
     # Special function to calculate BCC checksum for A5000 RS-232/RS-485 communications.
     def a5000_checksum(self,s):
@@ -621,6 +726,83 @@ class serialDevice(device):
         checksumstr = str(hex(checksum & 0xff)).upper()
         return checksumstr[3]+ checksumstr[2]
     
+    ########################################################################################################################
+    # Key identifying this device in the latency cache: driver, USB VID:PID if known, port, and bus address.
+    def latency_cache_key(self):
+        key = self.params['driver']
+        if ('vid' in self.params) and ('pid' in self.params): key += ' %04x:%04x' % (self.params['vid'],self.params['pid'])
+        key += ' ' + str(self.port)
+        if self.bus is not None: key += ' address %s' % self.busNode
+        return key
+
+    ########################################################################################################################
+    # Calibrate the response latency. The turnaround of each command in serialQuery is measured with no delay before
+    # reading, and the request functions then poll for the response straight away with a port and total timeout of
+    # LATENCY_MARGIN times the slowest turnaround. Results are cached per device so later runs skip the measurement.
+    # Only drivers whose responses end themselves (terminator or frame) can be tuned; others keep their fixed delays.
+    def calibrate_latency(self):
+        fname = self.params.get('latency_cache', LATENCY_CACHE)
+        key = self.latency_cache_key()
+        try:
+            with open(fname) as f: cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+        entry = cache.get(key)
+        if (entry is None) or self.params.get('recalibrate_latency', False):
+            entry = self.measure_latency()
+            if entry is None: return
+            cache[key] = entry
+            self.params['recalibrate_latency'] = False
+            try:
+                os.makedirs(os.path.dirname(fname), exist_ok=True)
+                with open(fname, 'w') as f: json.dump(cache, f, indent=1, sort_keys=True)
+            except OSError as e:
+                cprint( "\tCould not save latency cache %s: %s" % (fname, e), 'yellow')
+        elif not self.quiet: cprint( "\tUsing cached response latency for %s" % key, 'green')
+
+        self.sleeptime = 0
+        self.Serial.timeout = entry['timeout']
+        self.params['timeout'] = entry['timeout']
+        self.params['timeout_total'] = entry['timeout']
+        self.params['latency'] = entry['latency']
+        return
+
+    # Measure the turnaround of every query command, LATENCY_REPEATS times each.
+    # Returns a latency cache entry, or None if this device can't be tuned.
+    def measure_latency(self):
+        if getattr(self.serialCommsFunction, '__name__', None) not in LATENCY_TUNABLE:
+            cprint( "\tResponse latency calibration is not supported for %s" % self.name, 'yellow')
+            return None
+        cmds = []
+        for q in self.serialQuery:
+            if q is None: continue
+            if ',,' in q: # deliberate acquisition pause, don't tune
+                cprint( "\tResponse latency calibration is not supported for %s" % self.name, 'yellow')
+                return None
+            cmds.extend([c for c in q.split(',') if c != ''])
+
+        turnaround = {}
+        for cmd in cmds:
+            dt = []
+            for j in range(LATENCY_REPEATS):
+                t0 = time.perf_counter()
+                r = self.serialCommsFunction(cmd+self.queryTerminator,self.responseTerminator,self.maxlen,\
+                                             self.params['min_response_length'],0)
+                dt.append(time.perf_counter() - t0)
+                # No response, or one that only ended by timing out: keep the fixed delays.
+                if (r is None) or (len(r) == 0) or (dt[-1] > 0.9*self.params['timeout_total']):
+                    cprint( "\tResponse latency calibration failed for %s on %s" % (self.name, repr(cmd)), 'yellow')
+                    return None
+            turnaround[repr(cmd)] = max(dt)
+
+        latency = max(turnaround.values()) if len(turnaround) > 0 else 0.
+        timeout = max(LATENCY_MARGIN*latency, LATENCY_MIN_TIMEOUT)
+        cprint( "\tMeasured response latency %.1f ms, timeout %.1f ms (was %.1f ms delay, %.1f s timeout)" %\
+                (latency*1e3, timeout*1e3, self.sleeptime*1e3, self.params['timeout_total']), 'green')
+        return {'latency':latency, 'timeout':timeout, 'turnaround':turnaround, 'sleeptime':self.sleeptime,\
+                'date':datetime.datetime.now().isoformat()}
+
     ########################################################################################################################
     # Configure device based on what sub-driver is being used.
     # This is done when self.query(reset=True) is called, as at
@@ -633,1035 +815,1091 @@ class serialDevice(device):
         self.serialCommsFunction = self.blockingSerialRequest
         self.maxlen = 1024
         self.sleeptime = 0.01
+        # Subdrivers whose instruments answer requests in order can set a framer and pipelineDepth>1
+        # so their serialQuery can be sent back to back with params['pipeline']=True (see pipelinedSerialRequests)
+        self.framer = None
+        self.pipelineDepth = 0
 
-        # ----------------------------------------------------------------------------------------
-        if subdriver=='tds220gpib': # Startup config for Tektronix TDS220 series via GPIB to serial
-            # Configure USB-GPIB adapter to talk to bus device no. 1
-            self.blockingSerialRequest('++addr %i\r' % self.params['gpib-address'],terminationChar='\r',min_response_length=0)
-            # Configure USB-GPIB to automatically send data back when we make a query
-            self.blockingSerialRequest('++auto 1\r',terminationChar='\r',min_response_length=0)
-            
-            # Find out what model we have
-            idstring = self.blockingSerialRequest('ID?\r\n',terminationChar='\r',min_response_length=1)
-            if idstring is None:  raise pyLabDataLoggerIOError("no response from oscilloscope") 
-            else: cprint( "\tGPIB Address %i: Device ID string = %s" % (self.params['gpib-address'],idstring) , 'green')
-            
-            if 'TDS 220' in idstring: 
-                self.name = "Tektronix TDS220"
-                self.params['n_channels']=2
-            elif 'TDS 210' in idstring:
-                self.name = "Tektronix TDS210"
-                self.params['n_channels']=2
-            elif 'TDS 224' in idstring:
-                self.name = "Tektronix TDS224"
-                self.params['n_channels']=4
-            else:
-                raise pyLabDataLoggerIOError("Unknown model %s" % idstring)
-            
-            # Set up device
-            self.params['id']=idstring
-            self.config['channel_names']=['Time']
-            self.config['channel_names'].extend(['CH%i' % n for n in range(self.params['n_channels'])])
-            self.params['raw_units']=['']
-            self.params['raw_units'].extend(['']*self.params['n_channels'])
-            self.config['eng_units']=['']
-            self.config['eng_units'].extend(['']*self.params['n_channels'])
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=None
-            self.serialQuery.extend([':DAT:SOU CH%i,WAVF?' % n for n in range(self.params['n_channels'])]) # To set!
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.maxlen=999999 # large chunks of data will come back!
-            self.sleeptime=0.5
-
-        # ----------------------------------------------------------------------------------------
-        if subdriver=='hp53131agpib': # Startup config for HP/Agilent 53131A via GPIB to serial
-            # Configure USB-GPIB adapter to talk to bus device no. 1
-            self.blockingSerialRequest('++addr %i\r' % self.params['gpib-address'],terminationChar='\r',min_response_length=0)
-            # Configure USB-GPIB to automatically send data back when we make a query
-            self.blockingSerialRequest('++auto 1\r',terminationChar='\r',min_response_length=0)
-            
-            # Find out what model we have
-            idstring = self.blockingSerialRequest('*IDN?\r\n',terminationChar='\r',min_response_length=1)
-            if idstring is None:  raise pyLabDataLoggerIOError("no response from GPIB device") 
-            else: cprint( "\tGPIB Address %i: Device ID string = %s" % (self.params['gpib-address'],idstring) , 'green')
-            
-            # Set up device
-            self.params['id']=idstring
-            self.name='HP 53131A GPIB %i' % self.params['gpib-address']
-            self.config['channel_names']=['DisplayedValue']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['']*self.params['n_channels']
-            self.config['eng_units']=['']*self.params['n_channels']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=[':READ?']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.params['min_response_length']=4
-            #self.sleeptime=0.5
-            
-            # Set the format of the data to come back.
-            self.blockingSerialRequest(':FORM ASCII\r\n',terminationChar='\r',min_response_length=0)
-            
-        # ----------------------------------------------------------------------------------------
-        if subdriver=='hp4263agpib': # Startup config for HP 4263 LCR Meter
-            # Configure USB-GPIB adapter to talk to bus device no. 1
-            self.blockingSerialRequest('++addr %i\r' % self.params['gpib-address'],terminationChar='\r',min_response_length=0)
-            # Configure USB-GPIB to automatically send data back when we make a query
-            self.blockingSerialRequest('++auto 1\r',terminationChar='\r',min_response_length=0)
-            
-            # Find out what model we have
-            idstring = self.blockingSerialRequest('*IDN?\r\n',terminationChar='\r',min_response_length=1)
-            if idstring is None:  raise pyLabDataLoggerIOError("no response from GPIB device") 
-            else: cprint( "\tGPIB Address %i: Device ID string = %s" % (self.params['gpib-address'],idstring) , 'green')
-            
-            # Set up device
-            self.params['id']=idstring
-            self.name='HP 4263A GPIB %i' % self.params['gpib-address']
-            self.config['channel_names']=['Displayed Values','Status','Mode','Frequency','Level','Bias']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['','','','Hz','V','V']
-            self.config['eng_units']=['','','','Hz','V','V']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=[':FETC?',':SENS:FUNC?',None,':SOUR:FREQ?',':SENS:FIMP:RANG?',':SOUR:VOLT:OFFS?']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.params['min_response_length']=4
-            #self.sleeptime=0.5
-            
-            # Set the format of the data to come back.
-            self.blockingSerialRequest(':FORM ASCII\r\n',terminationChar='\r',min_response_length=0)
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='cozir': # Startup config for COZIR CO2 sensor
-            self.name = 'COZIR CO2 Sensor'
-            self.config['channel_names']=['humidity','temperature','z1','z2']
-            self.params['raw_units']=['%',u'\u03a9','ppm','ppm']
-            self.config['eng_units']=['%',u'\u03a9','ppm','ppm']
-            self.config['scale']=[1.,1.,1.,1.]
-            self.config['offset']=[0.,0.,0.,0.]
-            self.params['n_channels']=4        
-
-            self.serialQuery=['Q']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.sleeptime=0.001
-
-            # Set polling mode
-            self.Serial.write('K 2\r\n'.encode())
-            self.config['Polling Mode']=self.Serial.read(64)
-            if not b'K 00002' in self.config['Polling Mode']:
-                raise PyLabDataLoggerIOError("Couldn't set COZIR polling mode - check serial port")
-
-            # Get device info
-            self.Serial.write('Y\r\n'.encode())
-            self.config['Device Info String']=self.Serial.read(64)
-            if not self.quiet: cprint("\tCOZIR Device Info: %s" % self.config['Device Info String'],'white')
-
-            # Get scaling constant
-            self.Serial.write('.\r\n'.encode())
-            ret = self.Serial.read(16)
-            self.config['zconst'] = float(ret[3:8])
-
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='hpma': # Startup config for Honeywell HPMA air quality sensor
-            self.name = 'Honeywell HPMA1150S Air Quality Sensor'
-            self.config['channel_names']=['pm2.5','pm10','checksum']
-            self.params['raw_units']=['ug/m3','ug/m3','']
-            self.config['eng_units']=['ug/m3','ug/m3','']
-            self.config['scale']=[1.,1.,1.]
-            self.config['offset']=[0.,0.,0.]
-            self.params['n_channels']=3
-            self.serialQuery=[[0x68,0x01,0x04,0x93]]
-            self.queryTerminator=[]
-            self.responseTerminator=[]
-            self.sleeptime=0.001
-            self.serialCommsFunction=self.simpleSerialRequest
-            self.params['min_response_length']=38 # bytes
-
-            #Stop Auto Send, in  case it is enabled.
-            self.Serial.write([0x68,0x01,0x20,0x77])
-            if b'\xa5\xa5' in self.Serial.read(5):  # 0xA5A5 = success
-                if not self.quiet: cprint("\tHPMA Auto-send off",'white')
-            else:
-                raise pyLabDataLoggerIOError("HPMA communication error")
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='omega-ir-usb': # Statup config for IR-USB
-            self.name = "Omega IR-USB"
-            self.config['channel_names']=['tempC','tempF','ambientC','ambientF','emissivity']
-            self.params['raw_units']=['C','F','C','F','']
-            self.config['eng_units']=['C','F','C','F','']
-            self.config['scale']=[1.,1.,1.,1.,1.]
-            self.config['offset']=[0.,0.,0.,0.,0.]
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.serialQuery=['C','F','A','E']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.config['set_emissivity']=None
-        
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='ca100': # Statup config for Yokogawa CA100
-            self.name = "Yokogawa CA100"
-            self.config['channel_names']=['measure','measure_range','measure_mode','source','source_range','source_mode']
-            self.params['raw_units']=['','','','','','']
-            self.config['eng_units']=['','','','','',''] # units get updated when device polled
-            self.config['scale']=[1.,1.,1.,1.,1.,1.]
-            self.config['offset']=[0.,0.,0.,0.,0.,0.]
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.serialQuery=['OD','MR?','MF?','SD?','SR?','SF?']
-            self.queryTerminator='\r\n'
-            self.responseTerminator=b'\n'
-            self.params['min_response_length']=4
-            self.params['maxlen']=16
-            self.sleeptime=0.1
-            #self.serialCommsFunction=self.blockingRawSerialRequest
-
-            # turn on measurement mode please
-            self.Serial.write(b'MO1\r\n')
-            time.sleep(.1)          
+        # Look up the subdriver and run its startup config
+        if not subdriver in SUBDRIVERS:
+            raise KeyError("I don't know what to do with a device driver %s" % self.driver)
+        self.subdriverEntry = SUBDRIVERS[subdriver]
+        self.subdriverEntry.configure(self)
 
-            
-            
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='omega-pt': # Statup config for Omega Platinum via USB with Omega protocol
-            # See https://bl831.als.lbl.gov/~gmeigs/PDF/CN8_serial_comm.pdf for decoding the strings
-            
-            self.name = "Omega Platinum Meter"
-            self.config['channel_names']=['value','peak','valley','SP1','SP2']
-            self.params['n_channels']=5
-            self.params['raw_units']=['']*self.params['n_channels']
-            self.config['eng_units']=['']*self.params['n_channels']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=['*G110','*G111','*G112','*R400','*R410']
-            self.queryTerminator='\r'
-            self.responseTerminator='\r'
-
-            # Set the communications mode for Omega protocol, command mode, no LF, Echo on, <CR> between records.
-            # This way we don't need any logic to decode the responses later.  
-            self.config['commMode']=self.blockingSerialRequest('*W320 00011\r','\r').decode('ascii')
-            if not 'W320' in self.config['commMode']: 
-                raise pyLabDataLoggerIOError("Could not set communication mode.")
-            
-            # Find out what kind of input device is chosen
-            self.OMEGAPT_INPUT_TYPES=['Thermocouple','RTD','Process','Thermistor','Remote']
-            self.OMEGAPT_SI1=[['J','K','T','E','N','?','R','S','B','C','?','?'],\
-                              ['2wire','3wire','4wire'],\
-                              ['4-20mA','0-24mA','?','?','?','+-10VDC','+-1VDC','+-0.1VDC'],\
-                              ['2.25K','5K','10K']]
-            self.OMEGAPT_UNIT=['deg','deg',['mA','mA','','','','V','V','V'],'deg','']
-            
-            inpt=self.blockingSerialRequest('*R100\r','\r').decode('ascii')
-            if len(inpt)>1:
-                self.config['InputType']=self.OMEGAPT_INPUT_TYPES[int(inpt[4])]
-                self.config['InputConfig']=self.OMEGAPT_SI1[int(inpt[4])][int(inpt[5])]
-            
-            
-                # Determine units
-                if self.config['InputType']==2: 
-                    unit=self.OMEGAPT_UNIT[int(inpt[4])][int(inpt[5])]
+        '''
+        # Multi-sampling support for devices that need only a single serial command to cause data to be sent back.
+        if self.config['samples'] > 1:
+            for n in range(len(self.serialQuery)):
+                if ',' in self.serialQuery[n]:
+                    cprint("Error: samples > 1 not supported for device %s" % self.name,'red')
+                    self.config['samples']=1
                 else:
-                    unit=self.OMEGAPT_UNIT[int(inpt[4])]
-            
-                if unit == 'deg': 
-                    cf = int(self.blockingSerialRequest('*R200\r','\r').decode('ascii')[5])
-                    if cf==0: unit=''
-                    elif cf==1: unit+='C'
-                    elif cf==2: unit+='F'
-                    else: raise pyLabDataLoggerIOError("Could not set temperature unit.")
-            
-                cprint("\tProcess meter mode: %s - %s (%s)" % (self.config['InputType'],self.config['InputConfig'],unit),'white')
-            
-            else:
-                raise pyLabDataLoggerIOError("Could not determine input mode.")
-            
-            self.params['raw_units']=[unit]*self.params['n_channels']
-            self.config['eng_units']=[unit]*self.params['n_channels']
-            
-            # Get other settings
-            self.config['filterConst']=self.blockingSerialRequest('*R101\r','\r').decode('ascii')
-            self.config['thermocoupleCalibrationMode']=self.blockingSerialRequest('*R120\r','\r').decode('ascii')
-            self.config['thermocoupleCalibrationPoint']=self.blockingSerialRequest('*R121\r','\r').decode('ascii')+' '+\
-                                                        self.blockingSerialRequest('*R122\r','\r').decode('ascii')+' '+\
-                                                        self.blockingSerialRequest('*R123\r','\r').decode('ascii')
-            self.OMEGAPT_EXC=['0V','5V','10V','12V','24V']                                            
-            self.config['excitationVoltage']=self.OMEGAPT_EXC[int(self.blockingSerialRequest('*R210\r','\r').decode('ascii')[-1])]
-            
-            remSetPt=self.blockingSerialRequest('*R401\r','\r').decode('ascii')
-            self.OMEGAPT_OPR=['4-20V','0-24V','0-10V','0-1V']
-            if remSetPt[0]=='1': 
-                self.config['remoteSetpoint']=self.OMEGAPT_OPR[int(remSetPt[1])]
-            else:
-                self.config['remoteSetpoint']='Disabled'
-            
-            self.config['PID']=' '.join([self.blockingSerialRequest('*R%3i\r' % n,'\r').decode('ascii') for n in range(500,506)])
-            self.OMEGAPT_OPMODE=['Off','PID','On-Off','ScaledPV','Alarm1','Alarm2','Ramp&Soak RE.ON','Ramp&Soak SE.ON']
-            self.config['outputMode']=self.OMEGAPT_OPMODE[int(self.blockingSerialRequest('*R600\r','\r').decode('ascii')[-1])]
-            self.OMEGAPT_OPTYP=['None avail','Single poll relay','SSR','Double poll relay','DC pulse','Analog','Isolated Analog']
-            self.config['outputSelect']=self.OMEGAPT_OPTYP[int(self.blockingSerialRequest('*G601\r','\r').decode('ascii')[-1])]
-            self.config['outputOnOff']=self.blockingSerialRequest('*R610\r','\r').decode('ascii')[4:]
-            self.config['alarmConfig']=self.blockingSerialRequest('*R620\r','\r').decode('ascii')[4:]
-            self.config['alarmSettings']=' '.join([self.blockingSerialRequest('*R%3i\r' % n,'\r').decode('ascii')[4:]\
-                                                 for n in range(621,626)])
-            self.OMEGAPT_OPR=['0-10V','0-5V','0-20V','4-20V','0-24V']
-            self.config['outputRange']=self.OMEGAPT_OPR[int(self.blockingSerialRequest('*R660\r','\r').decode('ascii')[-1])]
-            
-            # Make name unique with the firmware version?
-            self.config['firmwareVersion']=self.blockingSerialRequest('*GF20\r','\r').decode('ascii')[4:].strip()
-            self.config['bootloaderVersion']=self.blockingSerialRequest('*GF22\r','\r').decode('ascii')[4:].strip()
-            self.config['devAddress']=self.blockingSerialRequest('*R300\r','\r').decode('ascii')[4:].strip()
-            
-            # Add the device address to the name of the device
-            if len(self.config['devAddress'])>0:
-                self.name+=' '+self.config['devAddress']
-            
-            # Force the controller to RUN mode
-            cprint("\tSetting RUN mode",'white')
-            self.config['runMode']=self.blockingSerialRequest('*WF23 6\r','\r').decode('ascii')
-            if not 'F23' in self.config['runMode']: 
-                raise pyLabDataLoggerIOError("Could not set RUN mode.")
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='omega-usbh':
-            self.name = "Omega USB High-Speed Pressure Transducer"
-            self.config['channel_names']=['pressure']
-            self.params['raw_units']=['psia']
-            self.config['eng_units']=['psia']
-            self.config['scale']=[1.]
-            self.config['offset']=[0.]
-            self.params['n_channels']=1
-            self.serialQuery=['PC,,PS']
-            self.queryTerminator='\r\n'
-            self.responseTerminator=''
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            # First ensure that streaming is inactive.
-            self.Serial.write('PS'.encode('ascii'))
-            self.blockingSerialRequest('SNR\r\n','\r') # dummy command to flush buffer
-            # Get unit ID and serial
-            self.params['Info'] = self.blockingSerialRequest('ENQ\r\n','\r',min_response_length=36)
-            if self.params['Info'] is not None: self.params['Info'] = self.params['Info'].decode('utf-8').strip()
-            self.params['ID'] = self.blockingSerialRequest('SNR\r\n','\r')
-            if self.params['ID'] is not None: 
-                self.params['ID'] = self.params['ID'].decode('utf-8').split('=')[-1]
-                if self.params['ID'].strip() != '': self.name += ' '+self.params['ID'].strip()
-            # Get filter settings and sample rate
-            for var in ['IFILTER','MFILTER','AVG','RATE']:
-                if not var in self.config:
-                    self.config[var] = self.blockingSerialRequest(var+'\r\n','\r').decode('ascii').split('=')[-1]
-            # Apply user-set filter and sample rate setting to the client device
-            self.apply_config()
-            # Write human readable sample rate
-            if int(self.config['RATE'])==0:   self.config['sample_rate_Hz'] = 5
-            elif int(self.config['RATE'])==1: self.config['sample_rate_Hz'] = 10
-            elif int(self.config['RATE'])==2: self.config['sample_rate_Hz'] = 20
-            elif int(self.config['RATE'])==3: self.config['sample_rate_Hz'] = 40
-            elif int(self.config['RATE'])==4: self.config['sample_rate_Hz'] = 80
-            elif int(self.config['RATE'])==5: self.config['sample_rate_Hz'] = 160
-            elif int(self.config['RATE'])==6: self.config['sample_rate_Hz'] = 320
-            elif int(self.config['RATE'])==7: self.config['sample_rate_Hz'] = 640
-            elif int(self.config['RATE'])==8: self.config['sample_rate_Hz'] = 1000
-            else: raise ValueError("omega-usbh: unknown RATE value %s" % self.config['RATE'])
-            cprint( "\tomega-usbh: Sample rate %i Hz" % self.config['sample_rate_Hz'], 'green')
-            # Get/set sampling period. Default 1 second.
-            if not 'sample_period' in self.params: self.params['sample_period']=1.
-            # 6-10 bytes per sample, * sample period, * samples per second, dictates maxlen returned for 'PC'
-            self.maxlen= int(6*(self.params['sample_period']*self.config['sample_rate_Hz']+1))
-
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='ohaus7k': # Startup config for OHAUS Valor 7000
-            #Get the units currently set on the display
-            unit='?'
-            unit=self.blockingSerialRequest('PU\r\n','\r')
-            if unit is None: unit='?'
-            elif unit == 'N': unit = 'Net' # not Newtons!
-            # Fixed settings.
-            self.name = "OHAUS Valor 7000 Scale"
-            self.config['channel_names']=['weight']
-            self.params['raw_units']=[unit]
-            self.config['eng_units']=[unit]
-            self.config['scale']=[1.]
-            self.config['offset']=[0.]
-            self.params['n_channels']=1
-            self.serialQuery=['IP']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='wtb': # Startup config for Radwag WTB scale
-            # Fixed settings.
-            self.name = "Radwag WTB series balance"
-            self.config['channel_names']=['weight']
-            self.params['raw_units']=['?']
-            self.config['eng_units']=['?']
-            self.config['scale']=[1.]
-            self.config['offset']=[0.]
-            self.params['n_channels']=1
-            self.serialQuery=['SUI']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-
-
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='center310': # Startup config for CENTER 310
-            self.name = "Center 310 Humidity/Temperature meter"
-            self.config['channel_names']=['humidity','temperature','timer','hold','min_max']
-            self.params['raw_units']=['%','','s','',''] # temp units will be determined when query runs
-            self.config['eng_units']=['%','','s','','']
-            self.config['scale']=[1.,1.,1.,1.,1.]
-            self.config['offset']=[0.,0.,0.,0.,0.]
-            self.params['n_channels']=5
-            self.serialQuery=['A'] # This will return everything except the model number
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\x03' # The "K" query terminates in \r\n but the "A" terminates in 0x03
-            self.params['min_response_length']=4 # bytes
-            
-            # Confirm model number. Send 'K' and response will be \r\n terminated.
-            self.params['ID']=self.blockingSerialRequest('K\r\n','\r')
-            cprint( "\tReturned Model ID = %s" % self.params['ID'], 'green')
+                    self.serialQuery[n] = ','.join([self.serialQuery[n]] * self.config['samples'])
+        '''
+        
+        return
 
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='omega-iseries': # Startup config for Omega iSeries Process Controller
-            self.name = "Omega iSeries Process Controller"
-            if not 'units' in self.params: u=u'\u03a9'
-            else: u=self.params['units']
-            self.config['channel_names']=['Current Value','Set Point 1','Set Point 2','Alarm']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=[u,u,u,'']
-            self.config['eng_units']=[u,u,u,'']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            if '485' in self.driver:
-                if not self.quiet: cprint( '\tRS-485 comms mode with fixed address = 01', 'green')
-                #RS-485 requires commands to be prepended with the device's address
-                self.serialQuery=['*\xb01X\xb01',\
-                                  '*\xb01R\xb01',\
-                                  '*\xb01R\xb02',\
-                                  '*\xb01U\xb01']
-            else: # RS-232
-                if not self.quiet: cprint( '\tRS-232 comms mode with fixed address = 01','green')
-                self.serialQuery=['*\xb01X\xb01',\
-                                  '*\xb01R\xb01',\
-                                  '*\xb01R\xb02',\
-                                  '*\xb01U\xb01']
-            self.queryTerminator='\r'
-            self.responseTerminator='\r'
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.params['min_response_length']=1 # bytes
-
-            # Try and establish communication with the device.
-            self.params['version']=None
-            time.sleep(1.)  #settling time
-            while True:
-                req='*\xb01R\xb05\r'
-                print( "\tSend "+repr(req) )
-                ver=self.blockingRawSerialRequest(req,terminationChar='',\
-                                 sleeptime=.01,min_response_length=1,maxlen=64)
-                #ver=struct.unpack('>3c',ver)
-                cprint( "\tRead "+repr(ver) )
-                #self.params['version'] = repr(ver)#ver[0]+binascii.hexlify(ver[1])
-                #if self.params['version'][0] == 'V': break
-                time.sleep(.1)
-            cprint( '\tISeries ID = '+self.params['version'], 'green')
-
-
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='tc08rs232': # Startup config for TC-08 over RS-232
-            self.name = "Picolog RS-232 TC-08 thermocouple datalogger"
-            self.config['channel_names']=['T1','T2','T3','T4','T5','T6','T7','T8','Cold Junction Reference','Cold Junction Thermistor']
-            if 'init_tc08_config' in self.params: self.config['tc_config'] = self.params['init_tc08_config']
-            else: self.config['tc_config'] = ['K','K','K','K','K','K','K','K','','']
-            self.params['n_channels']=10
-            self.params['raw_units']=['C','C','C','C','C','C','C','C','','']
-            self.config['eng_units']=['C','C','C','C','C','C','C','C','','']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery = [ struct.pack('>B',n) for n in [ 0,20,40,60,80,0xA0,0xC0,0xE0,0x22,0x42 ] ]
-            self.queryTerminator=''
-            self.responseTerminator=''
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.params['min_response_length']=3 # bytes
-            self.maxlen=3
-
-            # Set RTS and DTR to provide power to the device, as per user manual.
-            # Have confirmed these are the right ones.
-            self.Serial.rts = True
-            self.Serial.dtr = False
-            time.sleep(1.)
-
-            # Try and get device version code.
-            self.params['version']=None
-            time.sleep(1.)  #settling time
-            while True:
-                ver=struct.unpack('>3c',self.blockingRawSerialRequest(struct.pack('>B',1),terminationChar='',\
-                                                              sleeptime=.01,min_response_length=3,maxlen=3))
-                self.params['version'] = ver[0]+binascii.hexlify(ver[1])
-                if self.params['version'][0] == 'V': break
-                time.sleep(.5)
-            cprint( '\tTC08 version = '+str(self.params['version']), 'green' )
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='sd700':
-            # 9600 8N1 XonXoff active
-            # Mode 2 switch selected
-            self.name = "Extech SD700 Barometric PTH Datalogger"
-            self.config['channel_names']=['humidity','temperature','pressure']
-            self.params['raw_units']=['%',u'\u03a9','hPa'] # temp units will be determined when query runs
-            self.config['eng_units']=['%',u'\u03a9','hPa']
-            self.config['scale']=[1.,1.,1.]
-            self.config['offset']=[0.,0.,0.]
-            self.params['n_channels']=3
-            self.serialQuery=['','',''] # The device streams data regardless of TX signal.
-            self.queryTerminator=''
-            self.responseTerminator='\r'
-            self.params['min_response_length']=8 # bytes
-
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='esd508':
-            self.name = "Leadshine ES-D508 easy servo driver"
-            self.config['channel_names']=['encoder_history','last_encoder_position']
-            self.params['raw_units']=['rev','rev']
-            self.config['eng_units']=['rev','rev']
-            self.config['scale']=[1.,1.]
-            self.config['offset']=[0.,0.]
-            self.lastValue = [np.nan, 0] # force set starting encoder position
+    ########################################################################################################################
+    # Startup config for Tektronix TDS220 series via GPIB to serial
+    def configure_tds220gpib(self):
+        # Configure USB-GPIB adapter to talk to bus device no. 1
+        self.blockingSerialRequest('++addr %i\r' % self.params['gpib-address'],terminationChar='\r',min_response_length=0)
+        # Configure USB-GPIB to automatically send data back when we make a query
+        self.blockingSerialRequest('++auto 1\r',terminationChar='\r',min_response_length=0)
+        
+        # Find out what model we have
+        idstring = self.blockingSerialRequest('ID?\r\n',terminationChar='\r',min_response_length=1)
+        if idstring is None:  raise pyLabDataLoggerIOError("no response from oscilloscope") 
+        else: cprint( "\tGPIB Address %i: Device ID string = %s" % (self.params['gpib-address'],idstring) , 'green')
+        
+        if 'TDS 220' in idstring: 
+            self.name = "Tektronix TDS220"
             self.params['n_channels']=2
-            
-            # apply default settings
-            for k, default in zip(['velocity','acceleration','intermission','repeats','current','reverse','bidirectional','ESD508_ID',\
-                      'pulses_per_rev','encoder_resolution','position_err','encoder_calibration'],\
-                      [120,200,1000,1,100,False,False,'\x01',4000,4000,10,None]):
-                if not k in self.config: self.config[k]=default
-            
-            if not 'revolutions' in self.config:
-                if not self.quiet: cprint("\tRevolutions per trigger not set  - defaulting to 1.0",'yellow')
-                self.config['revolutions']=1.0
-            
-            self.serialCommsFunction=self.esd508_modbus
-            self.serialQuery='\x00' # Special functions will be used for MODBUS communication. Have to put a dummy byte here
-            self.queryTerminator=''
-            self.responseTerminator=''
-            self.sleeptime = 0.001
-            self.params['min_response_length']=1 # bytes
-        
-        # ----------------------------------------------------------------------------------------
-        elif 'alicat' in subdriver:
-            self.name = "Alicat Scientific M-series mass flow meter" # update w/model number later
-            self.params['n_channels']=5
-            self.config['channel_names']=['','','','',''] # will be obtained by query below
-            self.params['raw_units']    =['','','','',''] # will be obtained by query below
-            self.config['eng_units']    =['','','','',''] # will be obtained by query below
-            self.config['scale']        =[1.,1.,1.,1.,1.]
-            self.config['offset']       =[0.,0.,0.,0.,0.]
-            if not 'ID' in self.params.keys(): self.params['ID']='A' # default unit ID is 'A'
-            self.serialQuery=[self.params['ID']] # one command returns all the variables.
-            self.queryTerminator='\r'
-            self.responseTerminator=b'\r'
-            self.params['min_response_length']=8 # bytes
-            
-            
-             # clear serial buffer
-            self.Serial.reset_input_buffer()
-            self.Serial.reset_output_buffer()
-            
-            # talk to flowmeter-
-            # get params for model, serial number etc, and add to device name for uniqueness in logfile
-            if subdriver=='alicat-legacy': 
-                self.serialCommsFunction=self.blockingSerialRequest
-                self.params['model']=self.serialCommsFunction(self.params['ID']+'??m4'+self.queryTerminator,'\r')
-                self.params['serial']=self.serialCommsFunction(self.params['ID']+'??m5'+self.queryTerminator,'\r')
-                self.params['cal_date']=self.serialCommsFunction(self.params['ID']+'??m7'+self.queryTerminator,'\r')
-                self.params['firmware']=self.serialCommsFunction(self.params['ID']+'??m9'+self.queryTerminator,'\r')
-            else: 
-                self.serialCommsFunction=self.simpleSerialRequest
-                self.params['model']=self.serialCommsFunction(self.params['ID']+'??M5'+self.queryTerminator,'\r')
-                self.params['serial']=self.serialCommsFunction(self.params['ID']+'??M6'+self.queryTerminator,'\r')
-                self.params['cal_date']=self.serialCommsFunction(self.params['ID']+'??M8'+self.queryTerminator,'\r')
-                self.params['firmware']=self.serialCommsFunction(self.params['ID']+'??M9'+self.queryTerminator,'\r')
-           
+        elif 'TDS 210' in idstring:
+            self.name = "Tektronix TDS210"
+            self.params['n_channels']=2
+        elif 'TDS 224' in idstring:
+            self.name = "Tektronix TDS224"
+            self.params['n_channels']=4
+        else:
+            raise pyLabDataLoggerIOError("Unknown model %s" % idstring)
+        
+        # Set up device
+        self.params['id']=idstring
+        self.config['channel_names']=['Time']
+        self.config['channel_names'].extend(['CH%i' % n for n in range(self.params['n_channels'])])
+        self.params['raw_units']=['']
+        self.params['raw_units'].extend(['']*self.params['n_channels'])
+        self.config['eng_units']=['']
+        self.config['eng_units'].extend(['']*self.params['n_channels'])
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=None
+        self.serialQuery.extend([':DAT:SOU CH%i,WAVF?' % n for n in range(self.params['n_channels'])]) # To set!
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.maxlen=999999 # large chunks of data will come back!
+        self.sleeptime=0.5
 
-            try:
-                serialNumInt = int(self.params['serial'].split(' ')[-1])
-                modelString  = self.params['model'].split(' ')[-1]
-                self.name += ' %s %i' % (modelString,serialNumInt)
-            except:
-                # in case serial num etc invalid or empty
-                pass
+    ########################################################################################################################
+    # Startup config for HP/Agilent 53131A via GPIB to serial
+    def configure_hp53131agpib(self):
+        # Configure USB-GPIB adapter to talk to bus device no. 1
+        self.blockingSerialRequest('++addr %i\r' % self.params['gpib-address'],terminationChar='\r',min_response_length=0)
+        # Configure USB-GPIB to automatically send data back when we make a query
+        self.blockingSerialRequest('++auto 1\r',terminationChar='\r',min_response_length=0)
+        
+        # Find out what model we have
+        idstring = self.blockingSerialRequest('*IDN?\r\n',terminationChar='\r',min_response_length=1)
+        if idstring is None:  raise pyLabDataLoggerIOError("no response from GPIB device") 
+        else: cprint( "\tGPIB Address %i: Device ID string = %s" % (self.params['gpib-address'],idstring) , 'green')
+        
+        # Set up device
+        self.params['id']=idstring
+        self.name='HP 53131A GPIB %i' % self.params['gpib-address']
+        self.config['channel_names']=['DisplayedValue']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['']*self.params['n_channels']
+        self.config['eng_units']=['']*self.params['n_channels']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=[':READ?']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.params['min_response_length']=4
+        #self.sleeptime=0.5
+        
+        # Set the format of the data to come back.
+        self.blockingSerialRequest(':FORM ASCII\r\n',terminationChar='\r',min_response_length=0)
 
-            # get units & channel names
-            for j in range(2,7):
-                if subdriver=='alicat-legacy': 
-                    descStr = self.serialCommsFunction(self.params['ID']+'??d%i' % j +self.queryTerminator,'\r').decode('utf-8').strip('\x08').strip()
-                else:
-                    self.Serial.flush()
-                    if j==2:  self.serialCommsFunction(self.params['ID']+'??D%i' % j +self.queryTerminator,'\r')
-                    descStr = self.serialCommsFunction(self.params['ID']+'??D%i' % j +self.queryTerminator,'\r').decode('utf-8').strip('\x08').strip()
-                try:
-                    unitStr = descStr.split()[-1].replace('`',u'\u00b0')
-                    if subdriver=='alicat-legacy': nameStr = descStr.split()[3].strip()
-                    else: nameStr =  '_'.join(descStr.split()[3:5]).strip()
-                    if j<6: # skip units for 'gas type'
-                        self.params['raw_units'][j-2] = unitStr
-                        self.config['eng_units'][j-2] = unitStr
-                        nameStr=nameStr.replace('_string','')
-                    self.config['channel_names'][j-2]=nameStr
-                except:
-                    raise pyLabDataLoggerIOError("Unable to parse Alicat channel descriptor string.\nCheck the baud rate is %i and the device ID is %s"\
-                                 % (self.params['baudrate'],self.params['ID']))
-                    
-            # dummy read to flush buffer
-            self.Serial.flush()
-            self.serialCommsFunction(self.params['ID']+self.queryTerminator,'\r')
-        
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='mx5060': # Startup config for MX5060 multimeter
-            # Fixed settings.
-            self.name = "Metrix MX5060 Bench Multimeter"
-            self.config['channel_names']=['Primary', 'Secondary']
-            self.params['raw_units']=['','']
-            self.config['eng_units']=['','']
-            self.config['scale']=[1.,1.]
-            self.config['offset']=[0.,0.]
-            self.params['n_channels']=2
-            self.serialQuery=['READ?','SEC?']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.sleeptime = 0.1
-            
-            # Confirm model number.
-            self.params['ID']=self.blockingSerialRequest('*IDN?\r\n','\r',sleeptime=self.sleeptime)
-            cprint( "\tReturned Model ID = %s" % self.params['ID'], 'green')
-            
-            # Get other settings and store in config
-            self.params['Function']=self.blockingSerialRequest('FUNC?\r\n','\r',sleeptime=self.sleeptime)
-            self.params['Range']=self.blockingSerialRequest('RANG?\r\n','\r',sleeptime=self.sleeptime)
-            self.params['Filter']=self.blockingSerialRequest('FILT?\r\n','\r',sleeptime=self.sleeptime)
-            self.params['Coupling']=self.blockingSerialRequest('INP:COUP?\r\n','\r',sleeptime=self.sleeptime)
-            self.params['AutoRange']=self.blockingSerialRequest('RANG:AUTO?\r\n','\r',sleeptime=self.sleeptime)
-            
-            self.sleeptime = 0.5 # Slow down for SEC?
-            
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='r5000': # Startup config for Ranger 5000 series load cell amp
-            # Assume default device address = 31  (0x1F)
-            # Fixed settings.
-            self.name = "Ranger 5000 Load Cell Amplifier"
-            self.config['channel_names']=['Load']
-            self.params['raw_units']=['']
-            self.config['eng_units']=['']
-            self.config['scale']=[1.]
-            self.config['offset']=[0.]
-            self.params['n_channels']=1
-            self.serialQuery=['\x02Kp31\x03']
-            self.queryTerminator=''
-            self.responseTerminator='\x03'
-            self.params['min_response_length']=5
-            #self.serialCommsFunction=self.blockingRawSerialRequest
-            self.sleeptime=0.001
-        
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='a5000': # Startup config for Asahi Heiki A5000 Load Cell Amplifier
-            # Fixed settings.
-            self.name = "A5000 Load Cell Amplifier"
-            self.config['channel_names']=['Reading']
-            self.params['raw_units']=['kN']
-            self.config['eng_units']=['kN']
-            self.config['scale']=[1.]
-            self.config['offset']=[0.]
-            self.params['n_channels']=1
-            self.serialQuery=['\x02DSP\x03']
-            for i in range(len(self.serialQuery)):
-                self.serialQuery[i]+=self.a5000_checksum(self.serialQuery[i])
-            
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\n'
-            self.params['min_response_length']=3
-            self.maxlen=15
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.sleeptime=0.
-            
-            # Check device is online
-            
-            #st=''; for c in self.serialQuery[0]+'\r\n': st+=str(hex(ord(c)))+' '
-            #print(st);exit()
-            #device_id=self.blockingSerialRequest('\x0500\r\n','\n',sleeptime=0.05,min_response_length=3)
-            #device_id=self.blockingSerialRequest('\x02PRO\x03'+self.a5000_checksum('\x02PRO\x03')+'\r\n','\n',sleeptime=0.05,min_response_length=3)
-            
-            # Release a5000 communications link
-            # self.blockingSerialRequest('\x04\r\n',sleeptime=0.02)
-        # ----------------------------------------------------------------------------------------
-        elif subdriver=='radwag-r': # Startup config for RADWAG R-series
-            self.name = "Radwag R-Series Balance"
-            self.config['channel_names']=['Current reading','Tare value']
-            self.params['raw_units']=['','']
-            self.config['eng_units']=['','']
-            self.config['scale']=[1.,1.]
-            self.config['offset']=[0.,0.]
-            self.params['n_channels']=2
-            self.serialQuery=['SUI','OT']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\r'
-            self.params['min_response_length']=3
-            self.sleeptime=0.001
-
-            # Use device info to update name and units.
-            get_name = self.blockingSerialRequest('BN\r\n','\r',sleeptime=self.sleeptime)
-            if b'BN' in get_name: self.name+=' '+get_name.decode('ascii').split('"')[1].strip()
-            self.config['Serial_Number']=self.blockingSerialRequest('NB\r\n','\r',sleeptime=self.sleeptime)
-            unit_str=self.blockingSerialRequest('UG\r\n','\r',sleeptime=self.sleeptime)
-            if b'OK' in unit_str:
-                unit=unit_str.decode('ascii').split(' ')[1].strip()
-                self.params['raw_units']=[unit, unit]
-                self.config['eng_units']=[unit, unit]
-
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for DataQ DI-148 ADC
-        elif subdriver=='di148': 
-            self.name = "DataQ DI-148 ADC"
-            self.config['channel_names']=['A%i' % n for n in range(1,9)]
-            self.config['channel_names'].extend(['D%i' % n for n in range(1,6)])
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['V']*8
-            self.params['raw_units'].extend(['']*6)
-            self.config['eng_units']=self.params['raw_units']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=[''] 
-            self.queryTerminator=''
-            self.responseTerminator=''
-            self.params['min_response_length']=3
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.sleeptime=1.0
-
-            cmd='info 0\r' # Should print 'DATAQ' !!!
-            print( self.blockingRawSerialRequest(cmd,'',maxlen=25,sleeptime=.1) )
-            raise RuntimeError("Driver not yet implemented, contact software maintainer")
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for Newport P6000A frequency counter/timer
-        elif self.subdriver=='p6000a':
-            self.name = "Newport P6000A Frequency Counter"
-            self.config['channel_names']=['Displayed_Value']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=[''] # will be set when first data is read in.	
-            self.config['eng_units']=['?']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=[''] # manually set inside p6000SerialRequest
-            self.queryTerminator='' # manually set inside p6000SerialRequest
-            self.responseTerminator='' # manually set inside p6000SerialRequest
-            self.params['min_response_length']=8
-            self.serialCommsFunction=self.p6000SerialRequest
-            self.sleeptime=0.1 # has no effect but set >0 in case it causes errors elsewhere.
-
-            # get current setup
-            setup_data = self.serialCommsFunction(b'@U?G\r')
-            self.config['P6000A setup string'] = setup_data.decode('ascii')
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for PT Ltd. PT200M load cell amplifier
-        elif self.subdriver=='pt200m':
-            self.name = "PT200M Load Cell"
-            #self.params['serial_address']=31 # default value - for multiple devices on the one bus.
-            self.config['channel_names']=['Gross','Net','Setpoint/value','Status','Error','Setpoint/type','Setpoint/source']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['']*self.params['n_channels']
-            self.config['eng_units']=['']*self.params['n_channels']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=['20050026:','20050027:','20050172:','20050021:','20050022:','20050170:','20050171:']
-            self.queryTerminator='\r'
-            self.responseTerminator='\r'
-            #self.serialCommsFunction=self.blockingRawSerialRequest
-            self.params['min_response_length']=8
-            self.sleeptime=0.01
-            self.params['timeout']=0.1
-
-            # get current setup
-            #print(self.serialCommsFunction('3F110005:',terminationChar='\r\n',min_response_length=8,sleeptime=0.01))
-            #raise RuntimeError("Not yet implemented")
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for Omron K3HB-VLC-FLK1B Load Cell Amplifier or K3HB-X ammeter
-        elif (self.driver==['k3hb','vlc']) or (self.driver==['k3hb','x']): 
-            
-            # Assume device node number is 1 (factory default)
-            # Fixed settings.
-            if self.driver==['k3hb','vlc']:
-                self.name = "Omron K3HB-VLC Load Cell Amplifier"
-                self.config['channel_names']=['Load','Max','Min']
-            elif self.driver==['k3hb','x']:
-                self.name = "Omron K3HB-X Ammeter"
-                self.config['channel_names']=['Current','Max','Min']
-            else:
-                raise RuntimeError("Unknown K3HB model "+subdriver)
-                
-            self.config['scale']=[1.,1.,1.]
-            self.config['offset']=[0.,0.,0.]
-            self.params['n_channels']=3
-            # CompoWay/F serial communications protocol -- see the PDF in manuals/
-            if self.driver==['k3hb','x']:
-                self.serialQuery=['\x02010000101C00002000001\x03','\x02010000101C00003000001\x03','\x02010000101C00004000001\x03']
-            else:
-                self.serialQuery=['\x02010000101C00002000001\x03','\x02010000101C00003000001\x03','\x02010000101C00004000001\x03']
-            # Add checksums to end of each query. XOR of every byte following the \x02 start byte.
-            for i in range(len(self.serialQuery)):
-                self.serialQuery[i] += self.k3hbvlc_checksum(self.serialQuery[i])
-            
-            self.queryTerminator=''
-            self.responseTerminator=''
-            self.params['min_response_length']=3 # error codes might be short.
-            self.maxlen=25 # this at least applies to my commands in serialQuery but it's not universal.
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.sleeptime=0.1
-
-            # Get some fixed parameters. 
-
-            # no. decimal places
-            cmd='\x02010000101C4000D000001\x03'
-            dp = self.blockingRawSerialRequest(cmd+self.k3hbvlc_checksum(cmd),'',maxlen=25,sleeptime=.1)
-            self.config['decimal_places'] = int(dp[-10:-2],16)
-
-            # Input channel/mode - determines range
-            cmd='\x02010000101C40001000001\x03'
-            inpA = self.blockingRawSerialRequest(cmd+self.k3hbvlc_checksum(cmd),'',maxlen=25,sleeptime=.1)
-            a=inpA.index(b'\x02'); b=inpA.index(b'\x03')
-            self.params['input_type_A'] = int(inpA[a+11:b])
-            if self.driver==['k3hb','vlc']:
-                baseunit='kgf'
-                if self.params['input_type_A'] == 0:   self.params['range'] = '+-199.99mV'
-                elif self.params['input_type_A'] == 1: self.params['range'] = '+-19.999mV'
-                elif self.params['input_type_A'] == 2: self.params['range'] = '+-100mV'
-                elif self.params['input_type_A'] == 3: self.params['range'] = '+-199mV'
-                else: self.params['range']=str(self.params['input_type_A'])
-            elif self.driver==['k3hb','x']:
-                baseunit='mA'
-                if self.params['input_type_A'] == 0:   self.params['range'] = '+-199.99mA'
-                elif self.params['input_type_A'] == 1: self.params['range'] = '+-19.999mA'
-                elif self.params['input_type_A'] == 2: self.params['range'] = '+-1.9999mA'
-                elif self.params['input_type_A'] == 3: self.params['range'] = '4-20mA'
-                else: self.params['range']=str(self.params['input_type_A'])
+    ########################################################################################################################
+    # Startup config for HP 4263 LCR Meter
+    def configure_hp4263agpib(self):
+        # Configure USB-GPIB adapter to talk to bus device no. 1
+        self.blockingSerialRequest('++addr %i\r' % self.params['gpib-address'],terminationChar='\r',min_response_length=0)
+        # Configure USB-GPIB to automatically send data back when we make a query
+        self.blockingSerialRequest('++auto 1\r',terminationChar='\r',min_response_length=0)
+        
+        # Find out what model we have
+        idstring = self.blockingSerialRequest('*IDN?\r\n',terminationChar='\r',min_response_length=1)
+        if idstring is None:  raise pyLabDataLoggerIOError("no response from GPIB device") 
+        else: cprint( "\tGPIB Address %i: Device ID string = %s" % (self.params['gpib-address'],idstring) , 'green')
+        
+        # Set up device
+        self.params['id']=idstring
+        self.name='HP 4263A GPIB %i' % self.params['gpib-address']
+        self.config['channel_names']=['Displayed Values','Status','Mode','Frequency','Level','Bias']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['','','','Hz','V','V']
+        self.config['eng_units']=['','','','Hz','V','V']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=[':FETC?',':SENS:FUNC?',None,':SOUR:FREQ?',':SENS:FIMP:RANG?',':SOUR:VOLT:OFFS?']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.params['min_response_length']=4
+        #self.sleeptime=0.5
+        
+        # Set the format of the data to come back.
+        self.blockingSerialRequest(':FORM ASCII\r\n',terminationChar='\r',min_response_length=0)
+
+    ########################################################################################################################
+    # Startup config for COZIR CO2 sensor
+    def configure_cozir(self):
+        self.name = 'COZIR CO2 Sensor'
+        self.config['channel_names']=['humidity','temperature','z1','z2']
+        self.params['raw_units']=['%',u'\u03a9','ppm','ppm']
+        self.config['eng_units']=['%',u'\u03a9','ppm','ppm']
+        self.config['scale']=[1.,1.,1.,1.]
+        self.config['offset']=[0.,0.,0.,0.]
+        self.params['n_channels']=4        
+
+        self.serialQuery=['Q']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.sleeptime=0.001
+
+        # Set polling mode
+        self.Serial.write('K 2\r\n'.encode())
+        self.config['Polling Mode']=self.Serial.read(64)
+        if not b'K 00002' in self.config['Polling Mode']:
+            raise PyLabDataLoggerIOError("Couldn't set COZIR polling mode - check serial port")
+
+        # Get device info
+        self.Serial.write('Y\r\n'.encode())
+        self.config['Device Info String']=self.Serial.read(64)
+        if not self.quiet: cprint("\tCOZIR Device Info: %s" % self.config['Device Info String'],'white')
+
+        # Get scaling constant
+        self.Serial.write('.\r\n'.encode())
+        ret = self.Serial.read(16)
+        self.config['zconst'] = float(ret[3:8])
+
+    ########################################################################################################################
+    # Startup config for Honeywell HPMA air quality sensor
+    def configure_hpma(self):
+        self.name = 'Honeywell HPMA1150S Air Quality Sensor'
+        self.config['channel_names']=['pm2.5','pm10','checksum']
+        self.params['raw_units']=['ug/m3','ug/m3','']
+        self.config['eng_units']=['ug/m3','ug/m3','']
+        self.config['scale']=[1.,1.,1.]
+        self.config['offset']=[0.,0.,0.]
+        self.params['n_channels']=3
+        self.serialQuery=[[0x68,0x01,0x04,0x93]]
+        self.queryTerminator=[]
+        self.responseTerminator=[]
+        self.sleeptime=0.001
+        self.serialCommsFunction=self.simpleSerialRequest
+        self.params['min_response_length']=38 # bytes
+
+        #Stop Auto Send, in  case it is enabled.
+        self.Serial.write([0x68,0x01,0x20,0x77])
+        if b'\xa5\xa5' in self.Serial.read(5):  # 0xA5A5 = success
+            if not self.quiet: cprint("\tHPMA Auto-send off",'white')
+        else:
+            raise pyLabDataLoggerIOError("HPMA communication error")
+
+    ########################################################################################################################
+    # Startup config for IR-USB
+    def configure_omega_ir_usb(self):
+        self.name = "Omega IR-USB"
+        self.config['channel_names']=['tempC','tempF','ambientC','ambientF','emissivity']
+        self.params['raw_units']=['C','F','C','F','']
+        self.config['eng_units']=['C','F','C','F','']
+        self.config['scale']=[1.,1.,1.,1.,1.]
+        self.config['offset']=[0.,0.,0.,0.,0.]
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.serialQuery=['C','F','A','E']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.config['set_emissivity']=None
+
+    ########################################################################################################################
+    # Startup config for Yokogawa CA100
+    def configure_ca100(self):
+        self.name = "Yokogawa CA100"
+        self.config['channel_names']=['measure','measure_range','measure_mode','source','source_range','source_mode']
+        self.params['raw_units']=['','','','','','']
+        self.config['eng_units']=['','','','','',''] # units get updated when device polled
+        self.config['scale']=[1.,1.,1.,1.,1.,1.]
+        self.config['offset']=[0.,0.,0.,0.,0.,0.]
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.serialQuery=['OD','MR?','MF?','SD?','SR?','SF?']
+        self.queryTerminator='\r\n'
+        self.responseTerminator=b'\n'
+        self.params['min_response_length']=4
+        self.params['maxlen']=16
+        self.sleeptime=0.1
+        #self.serialCommsFunction=self.blockingRawSerialRequest
+
+        # turn on measurement mode please
+        self.Serial.write(b'MO1\r\n')
+        time.sleep(.1)          
+
+    ########################################################################################################################
+    # Startup config for Omega Platinum via USB with Omega protocol
+    def configure_omega_pt(self):
+        # See https://bl831.als.lbl.gov/~gmeigs/PDF/CN8_serial_comm.pdf for decoding the strings
+        
+        self.name = "Omega Platinum Meter"
+        self.config['channel_names']=['value','peak','valley','SP1','SP2']
+        self.params['n_channels']=5
+        self.params['raw_units']=['']*self.params['n_channels']
+        self.config['eng_units']=['']*self.params['n_channels']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=['*G110','*G111','*G112','*R400','*R410']
+        self.queryTerminator='\r'
+        self.responseTerminator='\r'
+
+        # Set the communications mode for Omega protocol, command mode, no LF, Echo on, <CR> between records.
+        # This way we don't need any logic to decode the responses later.  
+        self.config['commMode']=self.blockingSerialRequest('*W320 00011\r','\r').decode('ascii')
+        if not 'W320' in self.config['commMode']: 
+            raise pyLabDataLoggerIOError("Could not set communication mode.")
+        
+        # Find out what kind of input device is chosen
+        self.OMEGAPT_INPUT_TYPES=['Thermocouple','RTD','Process','Thermistor','Remote']
+        self.OMEGAPT_SI1=[['J','K','T','E','N','?','R','S','B','C','?','?'],\
+                          ['2wire','3wire','4wire'],\
+                          ['4-20mA','0-24mA','?','?','?','+-10VDC','+-1VDC','+-0.1VDC'],\
+                          ['2.25K','5K','10K']]
+        self.OMEGAPT_UNIT=['deg','deg',['mA','mA','','','','V','V','V'],'deg','']
+        
+        inpt=self.blockingSerialRequest('*R100\r','\r').decode('ascii')
+        if len(inpt)>1:
+            self.config['InputType']=self.OMEGAPT_INPUT_TYPES[int(inpt[4])]
+            self.config['InputConfig']=self.OMEGAPT_SI1[int(inpt[4])][int(inpt[5])]
+        
+        
+            # Determine units
+            if self.config['InputType']==2: 
+                unit=self.OMEGAPT_UNIT[int(inpt[4])][int(inpt[5])]
             else:
-                raise RuntimeError("Unknown K3HB model "+subdriver)
-            self.params['raw_units']=[baseunit]*len(self.config['channel_names'])
-            self.config['eng_units']=[baseunit]*len(self.config['channel_names'])
+                unit=self.OMEGAPT_UNIT[int(inpt[4])]
+        
+            if unit == 'deg': 
+                cf = int(self.blockingSerialRequest('*R200\r','\r').decode('ascii')[5])
+                if cf==0: unit=''
+                elif cf==1: unit+='C'
+                elif cf==2: unit+='F'
+                else: raise pyLabDataLoggerIOError("Could not set temperature unit.")
+        
+            cprint("\tProcess meter mode: %s - %s (%s)" % (self.config['InputType'],self.config['InputConfig'],unit),'white')
+        
+        else:
+            raise pyLabDataLoggerIOError("Could not determine input mode.")
+        
+        self.params['raw_units']=[unit]*self.params['n_channels']
+        self.config['eng_units']=[unit]*self.params['n_channels']
+        
+        # Get other settings
+        self.config['filterConst']=self.blockingSerialRequest('*R101\r','\r').decode('ascii')
+        self.config['thermocoupleCalibrationMode']=self.blockingSerialRequest('*R120\r','\r').decode('ascii')
+        self.config['thermocoupleCalibrationPoint']=self.blockingSerialRequest('*R121\r','\r').decode('ascii')+' '+\
+                                                    self.blockingSerialRequest('*R122\r','\r').decode('ascii')+' '+\
+                                                    self.blockingSerialRequest('*R123\r','\r').decode('ascii')
+        self.OMEGAPT_EXC=['0V','5V','10V','12V','24V']                                            
+        self.config['excitationVoltage']=self.OMEGAPT_EXC[int(self.blockingSerialRequest('*R210\r','\r').decode('ascii')[-1])]
+        
+        remSetPt=self.blockingSerialRequest('*R401\r','\r').decode('ascii')
+        self.OMEGAPT_OPR=['4-20V','0-24V','0-10V','0-1V']
+        if remSetPt[0]=='1': 
+            self.config['remoteSetpoint']=self.OMEGAPT_OPR[int(remSetPt[1])]
+        else:
+            self.config['remoteSetpoint']='Disabled'
+        
+        self.config['PID']=' '.join([self.blockingSerialRequest('*R%3i\r' % n,'\r').decode('ascii') for n in range(500,506)])
+        self.OMEGAPT_OPMODE=['Off','PID','On-Off','ScaledPV','Alarm1','Alarm2','Ramp&Soak RE.ON','Ramp&Soak SE.ON']
+        self.config['outputMode']=self.OMEGAPT_OPMODE[int(self.blockingSerialRequest('*R600\r','\r').decode('ascii')[-1])]
+        self.OMEGAPT_OPTYP=['None avail','Single poll relay','SSR','Double poll relay','DC pulse','Analog','Isolated Analog']
+        self.config['outputSelect']=self.OMEGAPT_OPTYP[int(self.blockingSerialRequest('*G601\r','\r').decode('ascii')[-1])]
+        self.config['outputOnOff']=self.blockingSerialRequest('*R610\r','\r').decode('ascii')[4:]
+        self.config['alarmConfig']=self.blockingSerialRequest('*R620\r','\r').decode('ascii')[4:]
+        self.config['alarmSettings']=' '.join([self.blockingSerialRequest('*R%3i\r' % n,'\r').decode('ascii')[4:]\
+                                             for n in range(621,626)])
+        self.OMEGAPT_OPR=['0-10V','0-5V','0-20V','4-20V','0-24V']
+        self.config['outputRange']=self.OMEGAPT_OPR[int(self.blockingSerialRequest('*R660\r','\r').decode('ascii')[-1])]
+        
+        # Make name unique with the firmware version?
+        self.config['firmwareVersion']=self.blockingSerialRequest('*GF20\r','\r').decode('ascii')[4:].strip()
+        self.config['bootloaderVersion']=self.blockingSerialRequest('*GF22\r','\r').decode('ascii')[4:].strip()
+        self.config['devAddress']=self.blockingSerialRequest('*R300\r','\r').decode('ascii')[4:].strip()
+        
+        # Add the device address to the name of the device
+        if len(self.config['devAddress'])>0:
+            self.name+=' '+self.config['devAddress']
+        
+        # Force the controller to RUN mode
+        cprint("\tSetting RUN mode",'white')
+        self.config['runMode']=self.blockingSerialRequest('*WF23 6\r','\r').decode('ascii')
+        if not 'F23' in self.config['runMode']: 
+            raise pyLabDataLoggerIOError("Could not set RUN mode.")
 
-            # Status
-            cmd='\x02010000101C00001000001\x03'
-            dp = self.blockingRawSerialRequest(cmd+self.k3hbvlc_checksum(cmd),'',maxlen=25,sleeptime=.1)
-            self.config['status'] = int(dp[-10:-2],16)
+    ########################################################################################################################
+    # Startup config for Omega USB-H pressure transducers
+    def configure_omega_usbh(self):
+        self.name = "Omega USB High-Speed Pressure Transducer"
+        self.config['channel_names']=['pressure']
+        self.params['raw_units']=['psia']
+        self.config['eng_units']=['psia']
+        self.config['scale']=[1.]
+        self.config['offset']=[0.]
+        self.params['n_channels']=1
+        self.serialQuery=['PC,,PS']
+        self.queryTerminator='\r\n'
+        self.responseTerminator=''
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        # First ensure that streaming is inactive.
+        self.Serial.write('PS'.encode('ascii'))
+        self.blockingSerialRequest('SNR\r\n','\r') # dummy command to flush buffer
+        # Get unit ID and serial
+        self.params['Info'] = self.blockingSerialRequest('ENQ\r\n','\r',min_response_length=36)
+        if self.params['Info'] is not None: self.params['Info'] = self.params['Info'].decode('utf-8').strip()
+        self.params['ID'] = self.blockingSerialRequest('SNR\r\n','\r')
+        if self.params['ID'] is not None: 
+            self.params['ID'] = self.params['ID'].decode('utf-8').split('=')[-1]
+            if self.params['ID'].strip() != '': self.name += ' '+self.params['ID'].strip()
+        # Get filter settings and sample rate
+        for var in ['IFILTER','MFILTER','AVG','RATE']:
+            if not var in self.config:
+                self.config[var] = self.blockingSerialRequest(var+'\r\n','\r').decode('ascii').split('=')[-1]
+        # Apply user-set filter and sample rate setting to the client device
+        self.apply_config()
+        # Write human readable sample rate
+        if int(self.config['RATE'])==0:   self.config['sample_rate_Hz'] = 5
+        elif int(self.config['RATE'])==1: self.config['sample_rate_Hz'] = 10
+        elif int(self.config['RATE'])==2: self.config['sample_rate_Hz'] = 20
+        elif int(self.config['RATE'])==3: self.config['sample_rate_Hz'] = 40
+        elif int(self.config['RATE'])==4: self.config['sample_rate_Hz'] = 80
+        elif int(self.config['RATE'])==5: self.config['sample_rate_Hz'] = 160
+        elif int(self.config['RATE'])==6: self.config['sample_rate_Hz'] = 320
+        elif int(self.config['RATE'])==7: self.config['sample_rate_Hz'] = 640
+        elif int(self.config['RATE'])==8: self.config['sample_rate_Hz'] = 1000
+        else: raise ValueError("omega-usbh: unknown RATE value %s" % self.config['RATE'])
+        cprint( "\tomega-usbh: Sample rate %i Hz" % self.config['sample_rate_Hz'], 'green')
+        # Get/set sampling period. Default 1 second.
+        if not 'sample_period' in self.params: self.params['sample_period']=1.
+        # 6-10 bytes per sample, * sample period, * samples per second, dictates maxlen returned for 'PC'
+        self.maxlen= int(6*(self.params['sample_period']*self.config['sample_rate_Hz']+1))
 
-            # Version
-            cmd='\x02010000101C00000000001\x03'
-            dp = self.blockingRawSerialRequest(cmd+self.k3hbvlc_checksum(cmd),'',maxlen=25,sleeptime=.1)
-            self.params['version'] = int(dp[-10:-2],16)
+    ########################################################################################################################
+    # Startup config for OHAUS Valor 7000
+    def configure_ohaus7k(self):
+        #Get the units currently set on the display
+        unit='?'
+        unit=self.blockingSerialRequest('PU\r\n','\r')
+        if unit is None: unit='?'
+        elif unit == 'N': unit = 'Net' # not Newtons!
+        # Fixed settings.
+        self.name = "OHAUS Valor 7000 Scale"
+        self.config['channel_names']=['weight']
+        self.params['raw_units']=[unit]
+        self.config['eng_units']=[unit]
+        self.config['scale']=[1.]
+        self.config['offset']=[0.]
+        self.params['n_channels']=1
+        self.serialQuery=['IP']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
 
-            
+    ########################################################################################################################
+    # Startup config for Radwag WTB scale
+    def configure_wtb(self):
+        # Fixed settings.
+        self.name = "Radwag WTB series balance"
+        self.config['channel_names']=['weight']
+        self.params['raw_units']=['?']
+        self.config['eng_units']=['?']
+        self.config['scale']=[1.]
+        self.config['offset']=[0.]
+        self.params['n_channels']=1
+        self.serialQuery=['SUI']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
 
-            cprint( "\tReturned Version = %s, Status = %s, Decimal places = %i, Range = %s" % (self.params['version'],\
-                                    self.config['status'],self.config['decimal_places'],self.params['range']), 'green')
- 
- 
-        # ----------------------------------------------------------------------------------------
-        # Startup config for BK Precision 168xx power supply
-        elif subdriver=='bkp168': 
-            self.name = "BK Precision 168xx Power Supply"
-            self.config['channel_names']=['voltage','current','set_voltage','set_current','mode']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['V','A','V','A','']
-            self.config['eng_units']=self.params['raw_units']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.queryTerminator='\r'
-            self.responseTerminator='\r'
-            self.params['min_response_length']=1
-            self.sleeptime=0.01
-            
-            self.serialQuery=['GETD','','GETS','']
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for CC 8870 current clamp
-        elif subdriver=='cc8870': 
-            self.name = "USB Current Clamp 8870"
-            self.config['channel_names']=['current']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['A']
-            self.config['eng_units']=self.params['raw_units']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.queryTerminator=''
-            self.responseTerminator='\n'
-            self.params['min_response_length']=4
-            self.sleeptime=0.05
-            self.serialQuery=['~']
-            
-            # turn off auto reporting
-            self.serialCommsFunction('auto off\n',min_response_length=12)
-            s=self.serialCommsFunction('ver\n',min_response_length=8).decode('ascii').strip()
-            if 'ver:' in s:
-                self.config['version']=s[s.index('ver:'):]
-            
-            print(self.serialCommsFunction('~',min_response_length=1).decode('ascii').strip())
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for AND G[XF]-K balance
-        elif subdriver=='andg':
-            self.config['Model'] = self.serialCommsFunction('?TN\r\n').decode('ascii').split(',')[-1].strip()
-            if (self.config['Model'] is None) or (self.config['Model'] == ''):
-                self.name = "AND G Series Balance"
-            else: 
-                self.name = "AND Balance %s" % self.config['Model']
-            self.config['channel_names']=['weight','state']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['?','']
-            self.config['eng_units']=self.params['raw_units']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.queryTerminator='\r\n'
-            self.responseTerminator='\n'
-            self.params['min_response_length']=1
-            self.config['ID']=str(self.serialCommsFunction('?ID\r\n').decode('ascii').strip().split(',')[1:])
-            self.config['Serial Number']=str(self.serialCommsFunction('?SN\r\n').decode('ascii').strip().split(',')[1:])
-            self.serialQuery=['Q']
-            
-        # ----------------------------------------------------------------------------------------
-        # Startup config for FY3200S Function Generator
-        elif subdriver=='fy3200s':
-            self.name = "FeelTech FY3200S"
-            self.config['channel_names']=[]
-            for ch in [1,2]:
-                for desc in ['Freq','Ampl','Offset','Duty','Phase','Active']:
-                    self.config['channel_names'].append('%s_%s' % (ch,desc))
-            self.params['n_channels']=len(self.config['channel_names'])          
-            self.params['raw_units']=['Hz','V','V','%','deg','']*2
-            self.config['eng_units']=self.params['raw_units']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.queryTerminator='\n'
-            self.serialQuery=['RMF','RMA','RMO','RMD','RMP','RMN',\
-                              'RFF','RFA','RFO','RFD','RFP','RFN']
-            self.config['ID'] = self.blockingRawSerialRequest('UID\n','\n',18,1,1.0).decode('ascii')
-            self.config['ID']+=' '+self.serialCommsFunction('UMO\n').decode('ascii')
-            self.name += ' '+self.config['ID']
-            for ch in [1,2]:
-                self.config['Ch%i_Wave' % ch]=self.serialCommsFunction('RMW\n').decode('ascii')
-                self.config['Ch%i_TrigMode' % ch]=self.serialCommsFunction('RPM\n').decode('ascii')
-
-        # ----------------------------------------------------------------------------------------
-        # Startup config for LC 10ch ADC STM32
-        elif subdriver=='lc-adc-f103c8':
-            self.name = "LC STM32 10 channel ADC"
-            self.params['n_channels']=10
-            self.config['channel_names']=['Ch%i' % i for i in range(self.params['n_channels']) ]
-            self.params['raw_units']=['V']*self.params['n_channels']
-            self.config['eng_units']=['V']*self.params['n_channels']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.queryTerminator=''
-            self.responseTerminator='V'
-            self.serialQuery=['']*self.params['n_channels']
+    ########################################################################################################################
+    # Startup config for CENTER 310
+    def configure_center310(self):
+        self.name = "Center 310 Humidity/Temperature meter"
+        self.config['channel_names']=['humidity','temperature','timer','hold','min_max']
+        self.params['raw_units']=['%','','s','',''] # temp units will be determined when query runs
+        self.config['eng_units']=['%','','s','','']
+        self.config['scale']=[1.,1.,1.,1.,1.]
+        self.config['offset']=[0.,0.,0.,0.,0.]
+        self.params['n_channels']=5
+        self.serialQuery=['A'] # This will return everything except the model number
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\x03' # The "K" query terminates in \r\n but the "A" terminates in 0x03
+        self.params['min_response_length']=4 # bytes
+        
+        # Confirm model number. Send 'K' and response will be \r\n terminated.
+        self.params['ID']=self.blockingSerialRequest('K\r\n','\r')
+        cprint( "\tReturned Model ID = %s" % self.params['ID'], 'green')
+
+    ########################################################################################################################
+    # Startup config for Omega iSeries Process Controller
+    def configure_omega_iseries(self):
+        self.name = "Omega iSeries Process Controller"
+        if not 'units' in self.params: u=u'\u03a9'
+        else: u=self.params['units']
+        self.config['channel_names']=['Current Value','Set Point 1','Set Point 2','Alarm']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=[u,u,u,'']
+        self.config['eng_units']=[u,u,u,'']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        # Commands are '*', the two digit address, and the command. The 0s carry an odd parity bit, which
+        # the 7-bit port drops.
+        addr = ('%02X' % self.params.get('rs485_address',1)).replace('0','\xb0')
+        if '485' in self.driver:
+            if not self.quiet: cprint( '\tRS-485 comms mode with address = %s' % addr, 'green')
+            #RS-485 requires commands to be prepended with the device's address
+            self.serialQuery=['*'+addr+'X\xb01',\
+                              '*'+addr+'R\xb01',\
+                              '*'+addr+'R\xb02',\
+                              '*'+addr+'U\xb01']
+        else: # RS-232
+            if not self.quiet: cprint( '\tRS-232 comms mode with fixed address = 01','green')
+            self.serialQuery=['*\xb01X\xb01',\
+                              '*\xb01R\xb01',\
+                              '*\xb01R\xb02',\
+                              '*\xb01U\xb01']
+        self.queryTerminator='\r'
+        self.responseTerminator='\r'
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.params['min_response_length']=1 # bytes
+
+        # Try and establish communication with the device.
+        # This holds the port, so give up after ISERIES_CONNECT_TRIES rather than starve other nodes on the bus.
+        self.params['version']=None
+        time.sleep(1.)  #settling time
+        for attempt in range(ISERIES_CONNECT_TRIES):
+            req='*'+addr+'R\xb05\r'
+            print( "\tSend "+repr(req) )
+            ver=self.blockingRawSerialRequest(req,terminationChar='',\
+                             sleeptime=.01,min_response_length=1,maxlen=64)
+            #ver=struct.unpack('>3c',ver)
+            cprint( "\tRead "+repr(ver) )
+            if len(ver.strip()) > 0:
+                self.params['version'] = repr(ver.strip())
+                break
+            time.sleep(.1)
+        if self.params['version'] is None:
+            raise pyLabDataLoggerIOError("No response from Omega iSeries at address %s on %s" % (addr, self.port))
+        cprint( '\tISeries ID = '+self.params['version'], 'green')
+
+    ########################################################################################################################
+    # Startup config for TC-08 over RS-232
+    def configure_tc08rs232(self):
+        self.name = "Picolog RS-232 TC-08 thermocouple datalogger"
+        self.config['channel_names']=['T1','T2','T3','T4','T5','T6','T7','T8','Cold Junction Reference','Cold Junction Thermistor']
+        if 'init_tc08_config' in self.params: self.config['tc_config'] = self.params['init_tc08_config']
+        else: self.config['tc_config'] = ['K','K','K','K','K','K','K','K','','']
+        self.params['n_channels']=10
+        self.params['raw_units']=['C','C','C','C','C','C','C','C','','']
+        self.config['eng_units']=['C','C','C','C','C','C','C','C','','']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery = [ struct.pack('>B',n) for n in [ 0,20,40,60,80,0xA0,0xC0,0xE0,0x22,0x42 ] ]
+        self.queryTerminator=''
+        self.responseTerminator=''
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.params['min_response_length']=3 # bytes
+        self.maxlen=3
+
+        # Set RTS and DTR to provide power to the device, as per user manual.
+        # Have confirmed these are the right ones.
+        self.Serial.rts = True
+        self.Serial.dtr = False
+        time.sleep(1.)
+
+        # Try and get device version code.
+        self.params['version']=None
+        time.sleep(1.)  #settling time
+        while True:
+            ver=struct.unpack('>3c',self.blockingRawSerialRequest(struct.pack('>B',1),terminationChar='',\
+                                                          sleeptime=.01,min_response_length=3,maxlen=3))
+            self.params['version'] = ver[0]+binascii.hexlify(ver[1])
+            if self.params['version'][0] == 'V': break
+            time.sleep(.5)
+        cprint( '\tTC08 version = '+str(self.params['version']), 'green' )
+
+    ########################################################################################################################
+    # Startup config for Extech SD700 barometric PTH datalogger
+    def configure_sd700(self):
+        # 9600 8N1 XonXoff active
+        # Mode 2 switch selected
+        self.name = "Extech SD700 Barometric PTH Datalogger"
+        self.config['channel_names']=['humidity','temperature','pressure']
+        self.params['raw_units']=['%',u'\u03a9','hPa'] # temp units will be determined when query runs
+        self.config['eng_units']=['%',u'\u03a9','hPa']
+        self.config['scale']=[1.,1.,1.]
+        self.config['offset']=[0.,0.,0.]
+        self.params['n_channels']=3
+        self.serialQuery=['','',''] # The device streams data regardless of TX signal.
+        self.queryTerminator=''
+        self.responseTerminator='\r'
+        self.params['min_response_length']=8 # bytes
+
+    ########################################################################################################################
+    # Startup config for Leadshine ES-D508 Easy Servomotor Driver
+    def configure_esd508(self):
+        self.name = "Leadshine ES-D508 easy servo driver"
+        self.config['channel_names']=['encoder_history','last_encoder_position']
+        self.params['raw_units']=['rev','rev']
+        self.config['eng_units']=['rev','rev']
+        self.config['scale']=[1.,1.]
+        self.config['offset']=[0.,0.]
+        self.lastValue = [np.nan, 0] # force set starting encoder position
+        self.params['n_channels']=2
+        
+        # apply default settings
+        for k, default in zip(['velocity','acceleration','intermission','repeats','current','reverse','bidirectional','ESD508_ID',\
+                  'pulses_per_rev','encoder_resolution','position_err','encoder_calibration'],\
+                  [120,200,1000,1,100,False,False,'\x01',4000,4000,10,None]):
+            if not k in self.config: self.config[k]=default
+        
+        if not 'revolutions' in self.config:
+            if not self.quiet: cprint("\tRevolutions per trigger not set  - defaulting to 1.0",'yellow')
+            self.config['revolutions']=1.0
+        
+        self.serialCommsFunction=self.esd508_modbus
+        self.serialQuery='\x00' # Special functions will be used for MODBUS communication. Have to put a dummy byte here
+        self.queryTerminator=''
+        self.responseTerminator=''
+        self.sleeptime = 0.001
+        self.params['min_response_length']=1 # bytes
+
+    ########################################################################################################################
+    # Startup config for Alicat Scientific M-series mass flow meter
+    def configure_alicat(self):
+        subdriver = self.subdriver
+        self.name = "Alicat Scientific M-series mass flow meter" # update w/model number later
+        self.params['n_channels']=5
+        self.config['channel_names']=['','','','',''] # will be obtained by query below
+        self.params['raw_units']    =['','','','',''] # will be obtained by query below
+        self.config['eng_units']    =['','','','',''] # will be obtained by query below
+        self.config['scale']        =[1.,1.,1.,1.,1.]
+        self.config['offset']       =[0.,0.,0.,0.,0.]
+        if not 'ID' in self.params.keys(): self.params['ID']='A' # default unit ID is 'A'
+        self.serialQuery=[self.params['ID']] # one command returns all the variables.
+        self.queryTerminator='\r'
+        self.responseTerminator=b'\r'
+        self.params['min_response_length']=8 # bytes
+        
+        
+         # clear serial buffer
+        self.Serial.reset_input_buffer()
+        self.Serial.reset_output_buffer()
+        
+        # talk to flowmeter-
+        # get params for model, serial number etc, and add to device name for uniqueness in logfile
+        if subdriver=='alicat-legacy': 
+            self.serialCommsFunction=self.blockingSerialRequest
+            self.params['model']=self.serialCommsFunction(self.params['ID']+'??m4'+self.queryTerminator,'\r')
+            self.params['serial']=self.serialCommsFunction(self.params['ID']+'??m5'+self.queryTerminator,'\r')
+            self.params['cal_date']=self.serialCommsFunction(self.params['ID']+'??m7'+self.queryTerminator,'\r')
+            self.params['firmware']=self.serialCommsFunction(self.params['ID']+'??m9'+self.queryTerminator,'\r')
+        else: 
+            self.serialCommsFunction=self.simpleSerialRequest
+            self.params['model']=self.serialCommsFunction(self.params['ID']+'??M5'+self.queryTerminator,'\r')
+            self.params['serial']=self.serialCommsFunction(self.params['ID']+'??M6'+self.queryTerminator,'\r')
+            self.params['cal_date']=self.serialCommsFunction(self.params['ID']+'??M8'+self.queryTerminator,'\r')
+            self.params['firmware']=self.serialCommsFunction(self.params['ID']+'??M9'+self.queryTerminator,'\r')
+       
+
+        try:
+            serialNumInt = int(self.params['serial'].split(' ')[-1])
+            modelString  = self.params['model'].split(' ')[-1]
+            self.name += ' %s %i' % (modelString,serialNumInt)
+        except:
+            # in case serial num etc invalid or empty
+            pass
+
+        # get units & channel names
+        for j in range(2,7):
+            if subdriver=='alicat-legacy': 
+                descStr = self.serialCommsFunction(self.params['ID']+'??d%i' % j +self.queryTerminator,'\r').decode('utf-8').strip('\x08').strip()
+            else:
+                self.Serial.flush()
+                if j==2:  self.serialCommsFunction(self.params['ID']+'??D%i' % j +self.queryTerminator,'\r')
+                descStr = self.serialCommsFunction(self.params['ID']+'??D%i' % j +self.queryTerminator,'\r').decode('utf-8').strip('\x08').strip()
+            try:
+                unitStr = descStr.split()[-1].replace('`',u'\u00b0')
+                if subdriver=='alicat-legacy': nameStr = descStr.split()[3].strip()
+                else: nameStr =  '_'.join(descStr.split()[3:5]).strip()
+                if j<6: # skip units for 'gas type'
+                    self.params['raw_units'][j-2] = unitStr
+                    self.config['eng_units'][j-2] = unitStr
+                    nameStr=nameStr.replace('_string','')
+                self.config['channel_names'][j-2]=nameStr
+            except:
+                raise pyLabDataLoggerIOError("Unable to parse Alicat channel descriptor string.\nCheck the baud rate is %i and the device ID is %s"\
+                             % (self.params['baudrate'],self.params['ID']))
                 
+        # dummy read to flush buffer
+        self.Serial.flush()
+        self.serialCommsFunction(self.params['ID']+self.queryTerminator,'\r')
+
+    ########################################################################################################################
+    # Startup config for MX5060 multimeter
+    def configure_mx5060(self):
+        # Fixed settings.
+        self.name = "Metrix MX5060 Bench Multimeter"
+        self.config['channel_names']=['Primary', 'Secondary']
+        self.params['raw_units']=['','']
+        self.config['eng_units']=['','']
+        self.config['scale']=[1.,1.]
+        self.config['offset']=[0.,0.]
+        self.params['n_channels']=2
+        self.serialQuery=['READ?','SEC?']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.sleeptime = 0.1
         
+        # Confirm model number.
+        self.params['ID']=self.blockingSerialRequest('*IDN?\r\n','\r',sleeptime=self.sleeptime)
+        cprint( "\tReturned Model ID = %s" % self.params['ID'], 'green')
         
-        # ----------------------------------------------------------------------------------------
-        # Startup config for Hameg HM8131
-        elif subdriver=='hm8131':
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.queryTerminator='\r\n'
-            self.responseTerminator=ord('\r')
-            self.params['min_response_length']=1
-            self.maxlen=32
-            self.config['Unit ID'] = self.serialCommsFunction(' ID?\r\n',ord('\r')).decode('ascii')
-            
-            cprint('\tID?: %s' % self.config['Unit ID'],'green')
-            self.name = "Hameg HM8131 - %s" % self.config['Unit ID']
-            self.config['channel_names']=['SweepTime','Freq','Phase','Amplitude']
-            self.params['n_channels']=len(self.config['channel_names'])   
-            self.params['raw_units']=['s','Hz','deg','V']
-            self.config['eng_units']=['s','Hz','deg','V']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=['SWT?','FRQ?','PHA?','AMP?']
-            
-            self.config['SerialNumber']=self.serialCommsFunction('SNR?\r\n',ord('\r')).decode('ascii')
-            self.config['Status']=self.serialCommsFunction('STA?\r\n',ord('\r')).decode('ascii')
-            cprint('\tSNR?: %s' % self.config['SerialNumber'],'green')
-            cprint('\tSTA?: %s' % self.config['Status'],'green')
-            self.config['eng_units'][2] = self.config['Status'].split(' ')[-1] # Set VPP or VRMS
-            
-            
-        # ----------------------------------------------------------------------------------------
-        # Startup config for Hameg HM8122
-        elif subdriver=='hm8122':
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.queryTerminator='\r\n'
-            self.responseTerminator=ord('\r')
-            self.params['min_response_length']=1
-            self.maxlen=32
-            self.config['Unit ID'] = self.serialCommsFunction(' ID?\r\n',ord('\r'),maxlen=8).decode('ascii')
-            
-            cprint('\tID?: %s' % self.config['Unit ID'],'green')
-            
-            self.name = "Hameg HM8122 - %s" % self.config['Unit ID']
-            self.config['channel_names']=['FreqA','FreqB']
-            self.params['n_channels']=len(self.config['channel_names']) 
-            self.params['raw_units']=['Hz']*self.params['n_channels']
-            self.config['eng_units']=['Hz']*self.params['n_channels']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=['FRA?','FRB?']
-        
-        # ----------------------------------------------------------------------------------------
-        # Startup config for Chemyx syringe pump
-        elif subdriver=='chemyx':
-            self.serialCommsFunction=self.blockingRawSerialRequest
-            self.queryTerminator='\r\n'
-            self.responseTerminator=ord('>') # prompt for next command
-            self.params['min_response_length']=8
-            
-            self.name = "Chemyx syringe pump"
-            self.config['channel_names']=['Dispensed','Time','Status','Pressure','Temperature']
-            self.params['n_channels']=len(self.config['channel_names'])
-            self.params['raw_units']=['mL','s','','psi',u'\u03a9']
-            self.config['eng_units']=['mL','s','','psi',u'\u03a9']
-            self.config['scale']=[1.]*self.params['n_channels']
-            self.config['offset']=[0.]*self.params['n_channels']
-            self.serialQuery=['dispensed volume','elapsed time','status','read press and temp']
+        # Get other settings and store in config
+        self.params['Function']=self.blockingSerialRequest('FUNC?\r\n','\r',sleeptime=self.sleeptime)
+        self.params['Range']=self.blockingSerialRequest('RANG?\r\n','\r',sleeptime=self.sleeptime)
+        self.params['Filter']=self.blockingSerialRequest('FILT?\r\n','\r',sleeptime=self.sleeptime)
+        self.params['Coupling']=self.blockingSerialRequest('INP:COUP?\r\n','\r',sleeptime=self.sleeptime)
+        self.params['AutoRange']=self.blockingSerialRequest('RANG:AUTO?\r\n','\r',sleeptime=self.sleeptime)
         
-        # ----------------------------------------------------------------------------------------
+        self.sleeptime = 0.5 # Slow down for SEC?
+
+    ########################################################################################################################
+    # Startup config for Ranger 5000 series load cell amp
+    def configure_r5000(self):
+        # Assume default device address = 31  (0x1F)
+        # Fixed settings.
+        self.name = "Ranger 5000 Load Cell Amplifier"
+        self.config['channel_names']=['Load']
+        self.params['raw_units']=['']
+        self.config['eng_units']=['']
+        self.config['scale']=[1.]
+        self.config['offset']=[0.]
+        self.params['n_channels']=1
+        self.serialQuery=['\x02Kp31\x03']
+        self.queryTerminator=''
+        self.responseTerminator='\x03'
+        self.params['min_response_length']=5
+        #self.serialCommsFunction=self.blockingRawSerialRequest
+        self.sleeptime=0.001
+
+    ########################################################################################################################
+    # Startup config for Asahi Heiki A5000 Load Cell Amplifier
+    def configure_a5000(self):
+        # Fixed settings.
+        self.name = "A5000 Load Cell Amplifier"
+        self.config['channel_names']=['Reading']
+        self.params['raw_units']=['kN']
+        self.config['eng_units']=['kN']
+        self.config['scale']=[1.]
+        self.config['offset']=[0.]
+        self.params['n_channels']=1
+        self.serialQuery=['\x02DSP\x03']
+        for i in range(len(self.serialQuery)):
+            self.serialQuery[i]+=self.a5000_checksum(self.serialQuery[i])
         
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\n'
+        self.params['min_response_length']=3
+        self.maxlen=15
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.sleeptime=0.
+        
+        # Check device is online
+        
+        #st=''; for c in self.serialQuery[0]+'\r\n': st+=str(hex(ord(c)))+' '
+        #print(st);exit()
+        #device_id=self.blockingSerialRequest('\x0500\r\n','\n',sleeptime=0.05,min_response_length=3)
+        #device_id=self.blockingSerialRequest('\x02PRO\x03'+self.a5000_checksum('\x02PRO\x03')+'\r\n','\n',sleeptime=0.05,min_response_length=3)
+        
+        # Release a5000 communications link
+        # self.blockingSerialRequest('\x04\r\n',sleeptime=0.02)
+
+    ########################################################################################################################
+    # Startup config for RADWAG R-series
+    def configure_radwag_r(self):
+        self.name = "Radwag R-Series Balance"
+        self.config['channel_names']=['Current reading','Tare value']
+        self.params['raw_units']=['','']
+        self.config['eng_units']=['','']
+        self.config['scale']=[1.,1.]
+        self.config['offset']=[0.,0.]
+        self.params['n_channels']=2
+        self.serialQuery=['SUI','OT']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\r'
+        self.params['min_response_length']=3
+        self.sleeptime=0.001
+
+        # Use device info to update name and units.
+        get_name = self.blockingSerialRequest('BN\r\n','\r',sleeptime=self.sleeptime)
+        if b'BN' in get_name: self.name+=' '+get_name.decode('ascii').split('"')[1].strip()
+        self.config['Serial_Number']=self.blockingSerialRequest('NB\r\n','\r',sleeptime=self.sleeptime)
+        unit_str=self.blockingSerialRequest('UG\r\n','\r',sleeptime=self.sleeptime)
+        if b'OK' in unit_str:
+            unit=unit_str.decode('ascii').split(' ')[1].strip()
+            self.params['raw_units']=[unit, unit]
+            self.config['eng_units']=[unit, unit]
+
+    ########################################################################################################################
+    # Startup config for DataQ DI-148 ADC
+    def configure_di148(self):
+        self.name = "DataQ DI-148 ADC"
+        self.config['channel_names']=['A%i' % n for n in range(1,9)]
+        self.config['channel_names'].extend(['D%i' % n for n in range(1,6)])
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['V']*8
+        self.params['raw_units'].extend(['']*6)
+        self.config['eng_units']=self.params['raw_units']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=[''] 
+        self.queryTerminator=''
+        self.responseTerminator=''
+        self.params['min_response_length']=3
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.sleeptime=1.0
+
+        cmd='info 0\r' # Should print 'DATAQ' !!!
+        print( self.blockingRawSerialRequest(cmd,'',maxlen=25,sleeptime=.1) )
+        raise RuntimeError("Driver not yet implemented, contact software maintainer")
+
+    ########################################################################################################################
+    # Startup config for Newport P6000A frequency counter/timer
+    def configure_p6000a(self):
+        self.name = "Newport P6000A Frequency Counter"
+        self.config['channel_names']=['Displayed_Value']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=[''] # will be set when first data is read in.	
+        self.config['eng_units']=['?']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=[''] # manually set inside p6000SerialRequest
+        self.queryTerminator='' # manually set inside p6000SerialRequest
+        self.responseTerminator='' # manually set inside p6000SerialRequest
+        self.params['min_response_length']=8
+        self.serialCommsFunction=self.p6000SerialRequest
+        self.sleeptime=0.1 # has no effect but set >0 in case it causes errors elsewhere.
+
+        # get current setup
+        setup_data = self.serialCommsFunction(b'@U?G\r')
+        self.config['P6000A setup string'] = setup_data.decode('ascii')
+
+    ########################################################################################################################
+    # Startup config for PT Ltd. PT200M load cell amplifier
+    def configure_pt200m(self):
+        self.name = "PT200M Load Cell"
+        #self.params['serial_address']=31 # default value - for multiple devices on the one bus.
+        self.config['channel_names']=['Gross','Net','Setpoint/value','Status','Error','Setpoint/type','Setpoint/source']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['']*self.params['n_channels']
+        self.config['eng_units']=['']*self.params['n_channels']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=['20050026:','20050027:','20050172:','20050021:','20050022:','20050170:','20050171:']
+        self.queryTerminator='\r'
+        self.responseTerminator='\r'
+        #self.serialCommsFunction=self.blockingRawSerialRequest
+        self.params['min_response_length']=8
+        self.sleeptime=0.01
+        self.params['timeout']=0.1
+        # Registers are read in order, so all seven can be requested at once with params['pipeline']=True.
+        self.framer=serialFramer.framer(terminator=b'\r',min_length=self.params['min_response_length'])
+        self.serialCommsFunction=self.framedSerialRequest
+        self.pipelineDepth=len(self.serialQuery)
+
+        # get current setup
+        #print(self.serialCommsFunction('3F110005:',terminationChar='\r\n',min_response_length=8,sleeptime=0.01))
+        #raise RuntimeError("Not yet implemented")
+
+    ########################################################################################################################
+    # Startup config for Omron K3HB-VLC-FLK1B Load Cell Amplifier or K3HB-X ammeter
+    def configure_k3hb(self):
+        subdriver = self.subdriver
+        # Device node number is params['rs485_address'], default 1 (factory default)
+        stx = '\x02%02i' % self.params.get('rs485_address',1)
+        # Fixed settings.
+        if self.driver==['k3hb','vlc']:
+            self.name = "Omron K3HB-VLC Load Cell Amplifier"
+            self.config['channel_names']=['Load','Max','Min']
+        elif self.driver==['k3hb','x']:
+            self.name = "Omron K3HB-X Ammeter"
+            self.config['channel_names']=['Current','Max','Min']
         else:
-            raise KeyError("I don't know what to do with a device driver %s" % self.driver)
-            
-        '''
-        # Multi-sampling support for devices that need only a single serial command to cause data to be sent back.
-        if self.config['samples'] > 1:
-            for n in range(len(self.serialQuery)):
-                if ',' in self.serialQuery[n]:
-                    cprint("Error: samples > 1 not supported for device %s" % self.name,'red')
-                    self.config['samples']=1
-                else:
-                    self.serialQuery[n] = ','.join([self.serialQuery[n]] * self.config['samples'])
-        '''
+            raise RuntimeError("Unknown K3HB model "+subdriver)
+            
+        self.config['scale']=[1.,1.,1.]
+        self.config['offset']=[0.,0.,0.]
+        self.params['n_channels']=3
+        # CompoWay/F serial communications protocol -- see the PDF in manuals/
+        if self.driver==['k3hb','x']:
+            self.serialQuery=[stx+'0000101C00002000001\x03',stx+'0000101C00003000001\x03',stx+'0000101C00004000001\x03']
+        else:
+            self.serialQuery=[stx+'0000101C00002000001\x03',stx+'0000101C00003000001\x03',stx+'0000101C00004000001\x03']
+        # Add checksums to end of each query. XOR of every byte following the \x02 start byte.
+        for i in range(len(self.serialQuery)):
+            self.serialQuery[i] += self.k3hbvlc_checksum(self.serialQuery[i])
         
-        return
+        self.queryTerminator=''
+        self.responseTerminator=''
+        self.params['min_response_length']=3 # error codes might be short.
+        self.maxlen=25 # this at least applies to my commands in serialQuery but it's not universal.
+        # Responses are STX ... ETX followed by the BCC byte. Error responses are shorter, so frame
+        # on the ETX rather than waiting for maxlen bytes.
+        self.framer=serialFramer.framer(start=b'\x02',terminator=b'\x03',trailer_length=1,checksum=serialFramer.bcc_xor)
+        self.serialCommsFunction=self.framedSerialRequest
+        self.pipelineDepth=len(self.serialQuery) # only used with params['pipeline']=True
+        self.sleeptime=0
+
+        # Get some fixed parameters. 
+
+        # no. decimal places
+        cmd=stx+'0000101C4000D000001\x03'
+        dp = self.framedSerialRequest(cmd+self.k3hbvlc_checksum(cmd))
+        self.config['decimal_places'] = int(self.k3hb_data(dp),16)
+
+        # Input channel/mode - determines range
+        cmd=stx+'0000101C40001000001\x03'
+        inpA = self.framedSerialRequest(cmd+self.k3hbvlc_checksum(cmd))
+        a=inpA.index(b'\x02'); b=inpA.index(b'\x03')
+        self.params['input_type_A'] = int(inpA[a+11:b])
+        if self.driver==['k3hb','vlc']:
+            baseunit='kgf'
+            if self.params['input_type_A'] == 0:   self.params['range'] = '+-199.99mV'
+            elif self.params['input_type_A'] == 1: self.params['range'] = '+-19.999mV'
+            elif self.params['input_type_A'] == 2: self.params['range'] = '+-100mV'
+            elif self.params['input_type_A'] == 3: self.params['range'] = '+-199mV'
+            else: self.params['range']=str(self.params['input_type_A'])
+        elif self.driver==['k3hb','x']:
+            baseunit='mA'
+            if self.params['input_type_A'] == 0:   self.params['range'] = '+-199.99mA'
+            elif self.params['input_type_A'] == 1: self.params['range'] = '+-19.999mA'
+            elif self.params['input_type_A'] == 2: self.params['range'] = '+-1.9999mA'
+            elif self.params['input_type_A'] == 3: self.params['range'] = '4-20mA'
+            else: self.params['range']=str(self.params['input_type_A'])
+        else:
+            raise RuntimeError("Unknown K3HB model "+subdriver)
+        self.params['raw_units']=[baseunit]*len(self.config['channel_names'])
+        self.config['eng_units']=[baseunit]*len(self.config['channel_names'])
+
+        # Status
+        cmd=stx+'0000101C00001000001\x03'
+        dp = self.framedSerialRequest(cmd+self.k3hbvlc_checksum(cmd))
+        self.config['status'] = int(self.k3hb_data(dp),16)
+
+        # Version
+        cmd=stx+'0000101C00000000001\x03'
+        dp = self.framedSerialRequest(cmd+self.k3hbvlc_checksum(cmd))
+        self.params['version'] = int(self.k3hb_data(dp),16)
+
+        
+
+        cprint( "\tReturned Version = %s, Status = %s, Decimal places = %i, Range = %s" % (self.params['version'],\
+                                self.config['status'],self.config['decimal_places'],self.params['range']), 'green')
+
+    ########################################################################################################################
+    # Startup config for BK Precision 168xx power supply
+    def configure_bkp168(self):
+        self.name = "BK Precision 168xx Power Supply"
+        self.config['channel_names']=['voltage','current','set_voltage','set_current','mode']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['V','A','V','A','']
+        self.config['eng_units']=self.params['raw_units']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.queryTerminator='\r'
+        self.responseTerminator='\r'
+        self.params['min_response_length']=1
+        self.sleeptime=0.01
+        
+        self.serialQuery=['GETD','','GETS','']
+
+    ########################################################################################################################
+    # Startup config for CC 8870 current clamp
+    def configure_cc8870(self):
+        self.name = "USB Current Clamp 8870"
+        self.config['channel_names']=['current']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['A']
+        self.config['eng_units']=self.params['raw_units']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.queryTerminator=''
+        self.responseTerminator='\n'
+        self.params['min_response_length']=4
+        self.sleeptime=0.05
+        self.serialQuery=['~']
+        
+        # turn off auto reporting
+        self.serialCommsFunction('auto off\n',min_response_length=12)
+        s=self.serialCommsFunction('ver\n',min_response_length=8).decode('ascii').strip()
+        if 'ver:' in s:
+            self.config['version']=s[s.index('ver:'):]
+        
+        print(self.serialCommsFunction('~',min_response_length=1).decode('ascii').strip())
+
+    ########################################################################################################################
+    # Startup config for AND G[XF]-K balance
+    def configure_andg(self):
+        self.config['Model'] = self.serialCommsFunction('?TN\r\n').decode('ascii').split(',')[-1].strip()
+        if (self.config['Model'] is None) or (self.config['Model'] == ''):
+            self.name = "AND G Series Balance"
+        else: 
+            self.name = "AND Balance %s" % self.config['Model']
+        self.config['channel_names']=['weight','state']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['?','']
+        self.config['eng_units']=self.params['raw_units']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.queryTerminator='\r\n'
+        self.responseTerminator='\n'
+        self.params['min_response_length']=1
+        self.config['ID']=str(self.serialCommsFunction('?ID\r\n').decode('ascii').strip().split(',')[1:])
+        self.config['Serial Number']=str(self.serialCommsFunction('?SN\r\n').decode('ascii').strip().split(',')[1:])
+        self.serialQuery=['Q']
+
+    ########################################################################################################################
+    # Startup config for FY3200S Function Generator
+    def configure_fy3200s(self):
+        self.name = "FeelTech FY3200S"
+        self.config['channel_names']=[]
+        for ch in [1,2]:
+            for desc in ['Freq','Ampl','Offset','Duty','Phase','Active']:
+                self.config['channel_names'].append('%s_%s' % (ch,desc))
+        self.params['n_channels']=len(self.config['channel_names'])          
+        self.params['raw_units']=['Hz','V','V','%','deg','']*2
+        self.config['eng_units']=self.params['raw_units']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.queryTerminator='\n'
+        self.serialQuery=['RMF','RMA','RMO','RMD','RMP','RMN',\
+                          'RFF','RFA','RFO','RFD','RFP','RFN']
+        self.config['ID'] = self.blockingRawSerialRequest('UID\n','\n',18,1,1.0).decode('ascii')
+        self.config['ID']+=' '+self.serialCommsFunction('UMO\n').decode('ascii')
+        self.name += ' '+self.config['ID']
+        for ch in [1,2]:
+            self.config['Ch%i_Wave' % ch]=self.serialCommsFunction('RMW\n').decode('ascii')
+            self.config['Ch%i_TrigMode' % ch]=self.serialCommsFunction('RPM\n').decode('ascii')
+
+    ########################################################################################################################
+    # Startup config for LC 10ch ADC STM32
+    def configure_lc_adc_f103c8(self):
+        self.name = "LC STM32 10 channel ADC"
+        self.params['n_channels']=10
+        self.config['channel_names']=['Ch%i' % i for i in range(self.params['n_channels']) ]
+        self.params['raw_units']=['V']*self.params['n_channels']
+        self.config['eng_units']=['V']*self.params['n_channels']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.queryTerminator=''
+        self.responseTerminator='V'
+        self.serialQuery=['']*self.params['n_channels']
+
+    ########################################################################################################################
+    # Startup config for Hameg HM8131
+    def configure_hm8131(self):
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.queryTerminator='\r\n'
+        self.responseTerminator=ord('\r')
+        self.params['min_response_length']=1
+        self.maxlen=32
+        self.config['Unit ID'] = self.serialCommsFunction(' ID?\r\n',ord('\r')).decode('ascii')
+        
+        cprint('\tID?: %s' % self.config['Unit ID'],'green')
+        self.name = "Hameg HM8131 - %s" % self.config['Unit ID']
+        self.config['channel_names']=['SweepTime','Freq','Phase','Amplitude']
+        self.params['n_channels']=len(self.config['channel_names'])   
+        self.params['raw_units']=['s','Hz','deg','V']
+        self.config['eng_units']=['s','Hz','deg','V']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=['SWT?','FRQ?','PHA?','AMP?']
+        
+        self.config['SerialNumber']=self.serialCommsFunction('SNR?\r\n',ord('\r')).decode('ascii')
+        self.config['Status']=self.serialCommsFunction('STA?\r\n',ord('\r')).decode('ascii')
+        cprint('\tSNR?: %s' % self.config['SerialNumber'],'green')
+        cprint('\tSTA?: %s' % self.config['Status'],'green')
+        self.config['eng_units'][2] = self.config['Status'].split(' ')[-1] # Set VPP or VRMS
+
+    ########################################################################################################################
+    # Startup config for Hameg HM8122
+    def configure_hm8122(self):
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.queryTerminator='\r\n'
+        self.responseTerminator=ord('\r')
+        self.params['min_response_length']=1
+        self.maxlen=32
+        self.config['Unit ID'] = self.serialCommsFunction(' ID?\r\n',ord('\r'),maxlen=8).decode('ascii')
+        
+        cprint('\tID?: %s' % self.config['Unit ID'],'green')
+        
+        self.name = "Hameg HM8122 - %s" % self.config['Unit ID']
+        self.config['channel_names']=['FreqA','FreqB']
+        self.params['n_channels']=len(self.config['channel_names']) 
+        self.params['raw_units']=['Hz']*self.params['n_channels']
+        self.config['eng_units']=['Hz']*self.params['n_channels']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=['FRA?','FRB?']
+
+    ########################################################################################################################
+    # Startup config for Chemyx syringe pump
+    def configure_chemyx(self):
+        self.serialCommsFunction=self.blockingRawSerialRequest
+        self.queryTerminator='\r\n'
+        self.responseTerminator=ord('>') # prompt for next command
+        self.params['min_response_length']=8
+        
+        self.name = "Chemyx syringe pump"
+        self.config['channel_names']=['Dispensed','Time','Status','Pressure','Temperature']
+        self.params['n_channels']=len(self.config['channel_names'])
+        self.params['raw_units']=['mL','s','','psi',u'\u03a9']
+        self.config['eng_units']=['mL','s','','psi',u'\u03a9']
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        self.serialQuery=['dispensed volume','elapsed time','status','read press and temp']
+
+    ########################################################################################################################
+    # Startup config for generic Modbus RTU devices. params['modbus_registers'] lists the channels as
+    # (name, slave address, function, register, type, units) tuples, where function is 3 (holding) or
+    # 4 (input registers) and type is one of modbusRTU.TYPES. Several slaves can share the port.
+    def configure_modbus(self):
+        if not 'modbus_registers' in self.params:
+            raise KeyError("serial/modbus needs a list of channels in params['modbus_registers']")
+        regs = self.params['modbus_registers']
+        self.name = "Modbus RTU %s" % ','.join(sorted(set(['%i' % r[1] for r in regs])))
+        self.config['channel_names']=[r[0] for r in regs]
+        self.params['n_channels']=len(regs)
+        self.params['raw_units']=[r[5] for r in regs]
+        self.config['eng_units']=[r[5] for r in regs]
+        self.config['scale']=[1.]*self.params['n_channels']
+        self.config['offset']=[0.]*self.params['n_channels']
+        # One batched read per sample
+        self.modbusBlocks=[(r[1], r[2], r[3], modbusRTU.TYPES[r[4]][0]) for r in regs]
+        self.modbus=modbusRTU.modbusClient(self.Serial, timeout=self.params['timeout'],\
+                                           max_gap=self.params.get('modbus_max_gap',8))
+        self.modbusFailures=0 # consecutive failed reads
+        self.serialQuery=['']
+        self.queryTerminator=''
+        self.responseTerminator=''
+        self.serialCommsFunction=self.modbusSerialRequest
 
     ########################################################################################################################
     # Convert string responses from serial port into usable numbers/values
     def convert_raw_string_to_values(self, rawData, requests=None):
-        subdriver = self.subdriver
-        
         # Generally, we want to wipe away the old measurements first.
         # However, for cumulative measurement devices such as stepper motor encoders, we don't.
         if not 'lastValue' in dir(self):
             self.lastValue=[np.nan]*self.params['n_channels']
-        if subdriver != 'esd508':
+        if not self.subdriverEntry.cumulative:
             self.lastValue=[np.nan]*self.params['n_channels']
         
         # Parse depending on subdriver
@@ -1672,671 +1910,702 @@ class serialDevice(device):
             elif rawData[0] is None: raise IndexError
             elif len(rawData[0]) is None: raise IndexError
 
-            # ----------------------------------------------------------------------------------------
-            if subdriver=='tds220gpib':
-            
-                processed_curves = []
-                self.params['info'] = ['']
-                for i in range(1,len(rawData)):
-                    l=rawData[i].split(';') # Break apart header & data.
-                    def tryfloat(val):
-                        try: return float(val)
-                        except ValueError: return val
-                    # Get all the header variables.
-                    byt_nr, bit_nr, encoding, bn_fmt, byt_or, nr_pt, wfid, pt_fmt, xincr, pt_off, xzero,\
-                        xunit, ymult, yzero, yoff, yunit = [tryfloat(v.strip()) for v in l[:16]]
-                    
-                    if encoding == 'BIN': # Binary decode with struct.unpack
-                        if byt_or == 'LSB': decode_string = '<'
-                        else: decode_string = '>'
-                        x_ = int(l[16][1])
-                        buf_len = int(l[16][2:2+x_])
-                        decode_string += 'x'*(2+x_)
-                        decode_string += str(int(buf_len))
-                        if bn_fmt == 'RP': # Signed or unsigned binary?
-                            if byt_nr == 1: decode_string += 'B'
-                            elif byt_nr == 2: decode_string += 'H'
-                            elif byt_nr == 4: decode_string += 'I'
-                            elif byt_nr == 8: decode_string += 'Q'
-                            else: raise ValueError("TDS22x decoder: Unknown bytes per sample %s" % byt_nr)
-                        elif bn_fmt == 'RI':
-                            if byt_nr == 1: decode_string += 'b'
-                            elif byt_nr == 2: decode_string += 'h'
-                            elif byt_nr == 4: decode_string += 'i'
-                            elif byt_nr == 8: decode_string += 'q'
-                            else: raise ValueError("TDS22x decoder: Unknown bytes per sample %s" % byt_nr)
-                        else:
-                            raise ValueError("TDS22x decoder: Unknown binary format")
-                        
-                        buf = struct.unpack(decode_string, l[16])
-                    
-                    elif encoding == 'ASC': # Ascii decode. Always a signed integer.
-                        x_ = int(l[16][1])
-                        buf_len = int(l[16][2:2+x_])
-                        buf = [int(v) for v in l[16][2+x_:]]
-                
-                    if i==1: # Add time axis
-                        processed_curves.append(np.linspace(xzero, xzero+xincr*nr_pt, nr_pt))
-                        self.params['raw_units'][0]=xunit
-                        if self.config['eng_units'][0] == '': self.config['eng_units'][0] = xunit
-                        
-                    # Add voltage trace
-                    processed_curves.append((np.array(buf).astype(np.float) - yoff)*ymult)
-                    
-                    # Add units & scaling factors.
-                    self.config['raw_units'][i]=yunit
-                    if self.config['eng_units'][i] == '': self.config['eng_units'][i] = yunit
-    
-                    # Add wfid string to params
-                    self.params['info'].append(wfid)
-    
-                return processed_curves
+            values = self.subdriverEntry.parse(self, rawData, requests)
+            if values is not None: return values
 
-    
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='hp53131agpib': 
-                # :FORM:ASCII mode
-                return [ float(s.decode('ascii')) for s in rawData]
-           
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='hp4263agpib':
-                # :FORM:ASCII mode
-                fetch = [ float(v) for v in rawData[0].decode('ascii').split(',') ]
-                if fetch[0] == 0: status='Normal'
-                elif fetch[0] == 0: status='Overload'
-                elif fetch[0] == 2: status='Non-contact'
-                else: status='?'
-                mode = rawData[1].decode('ascii').strip().strip('"')
-                res = [ np.array(fetch[1:]) ]
-                res.extend( [ status, mode ] )
-                res.extend( [ float(s.decode('ascii')) for s in rawData[2:] ] )
-                return res
-                
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='tc08rs232':
-                # This algorithm follows the TC-08 user manual.
-                # Each call returns 3 bytes, the first is the sign and the second two are the MSB and LSB
-                microvolts = np.array([ struct.unpack('>H',s[1:]) for s in rawData ]).astype(np.float)
-                # Apply sign
-                for n in range(len(microvolts)):
-                    neg = struct.unpack('?',rawData[n][0])
-                    if neg: microvolts[n] *= -1
-                microvolts *= 0.9082780194 # 65535 counts == 59524uV
-                # Calculate cold junction temperature
-                divisor = (microvolts[9] + 65535)/65536.
-                r = (65536 * (microvolts[9]/divisor)) / (microvolts[8]/divisor)
-                cold_junction = -3.63620e-25*r**5 + 2.81708e-19*r**4 - 8.70805e-14*r**3 + 1.39391e-8*r**2 - 1.31981e-3*r + 71.3437
-                # Convert to temperature
-                temp = np.zeros_like(microvolts)
-                from thermocouples_reference import thermocouples
-                for n in range(8):
-                    tc=thermocouples[self.config['tc_config'][n].upper()]
-                    if self.params['raw_units'][n] == 'C': fconversion = tc.inverse_CmV
-                    elif self.params['raw_units'][n] == 'F': fconversion = tc.inverse_FmV
-                    elif self.params['raw_units'][n] == 'R': conversion = tc.inverse_RmV
-                    elif self.params['raw_units'][n] == 'K': fconversion = tc.inverse_KmV
-                    else: raise KeyError("Unknown units of measurement")
-                    temp[n] = fconversion(microvolts[n]/1000., Tref=cold_junction)
-                temp[-1] = cold_junction
-                return temp
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='hpma':
-                
-                header=rawData[0][:2]
-                data=rawData[0][2:]
-
-                if header==b'\x96\x96':
-                    if not self.quiet: cprint("\tHPMA: Negative ACK",'red')
-                    return [None]*self.params['n_channels']
-
-                elif header==b'\x40\x05':
-                        #print("Positive ACK")
-                        #print("\tData: (received %i bytes)" % len(data))
-                        pm25 = struct.unpack('>h',data[1:3])[0]
-                        pm10 = struct.unpack('>h',data[3:5])[0]
-                        cs1 = data[5]
-                        cs2 = (65536-(int(header[0])+int(header[1])+int(data[0])+sum([int(v) for v in data[1:5]])))%256
-                        #print("\tPM2.5 = %s\n\tPM10 = %s\n\tChecksum match=%s\n" % (pm25,pm10,cs1==cs2))
-                        return [pm25, pm10, cs1-cs2]
-                else:
-                        if not self.quiet: cprint("\tHMPA: Comm Error. Got %s" % repr(rawData[0]),'red')
-                        return [None]*self.params['n_channels']
+        except ValueError:
+            cprint( "\t!! Failure to unpack raw string from device: "+str( rawData ), 'red', attrs=['bold'])
+            raise
+        except IndexError: # Nothing in rawData!
+            cprint( "\tDevice %s returned no data." % self.name , 'red', attrs=['bold'])
+        
+        return [np.nan]*self.params['n_channels']
 
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='cozir':
-                #Typical response looks like: Q\r\n'    b'H 00510 T 01244 Z 00698 z 00737
-                try:
-                    zconst=self.config['zconst']
-                    l=rawData[0].decode('ascii').strip().replace("\\r\\n","").strip('\'').split(' ')
-                    h=float(l[1]) * 0.1
-                    t=float(l[3][2:]) * 0.1
-                    z1=float(l[5][2:])  * zconst
-                    z2=float(l[7][2:])  * zconst
-                    return [h,t,z1,z2]
-                except:
-                    raise
-                    return [None]*self.params['n_channels']
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='omega-ir-usb':
-                if len(rawData)<2: return [None]*self.params['n_channels']
-                vals= [float(rawData[0].strip('>')), float(rawData[1].strip('>'))]
-                if len(rawData)<3: vals.extend([np.nan, np.nan])
-                else: vals.extend([float(v) for v in rawData[2].split('=')[1].split(',')])
-                if len(rawData)<4: vals.append(np.nan)
-                else: vals.append(float(rawData[3].split('=')[1]))
-                return vals
-                
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='omega-pt':
-                vals = []
-                for d in rawData:
-                    try:
-                        vals.append(float(d.strip()[4:]))
-                    except ValueError:
-                        vals.append(None)
-                return vals
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='omega-usbh':
-                vals = []
-                for i in range(len(rawData)):
-                    
-                    # first frame beginning point
-                    offset = rawData[i].index(b'\xaa')
-                    # Remove 0xAAAA and replace with 0xAA (delete the bit stuff)
-                    rawData[i] = rawData[i].replace(b'\xaa\xaa',b'\xaa')
-                    # number of frames to process
-                    n_frames = int(np.floor(len(rawData[i][offset:])/6))                   
-                    vals.append( np.array( struct.unpack('<'+'xxf'*n_frames,rawData[i][offset:offset+n_frames*6]) ) )
-                    
-                return vals
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='ohaus7k':
-                vals=rawData[0].split(b' ')
-                self.params['raw_units']=[vals[-1].strip()]
-                return [float(vals[0])]
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='wtb':
-                vals=rawData[0].strip().split(' ')
-                self.params['raw_units']=[vals[-1]]
-                if self.config['eng_units'][0] == '?': self.config['eng_units']=[vals[-1]]
-                return [float(vals[-2])]
-
-            # ----------------------------------------------------------------------------------------
-            elif self.subdriver=='p6000a':
-                rawString = rawData[0].decode('ascii')#.strip()
-                if len(rawString)>=9:
-                    # Valid response received, should be 10 to 12 characters ASCII.
-                    val=float(rawString[:9])
-                    if (len(rawString)>=11): # There is a mode bit that can turn off unit transmission.
-                        self.params['raw_units'][0]=rawString[9:].strip()
-                        if (self.config['eng_units'][0] == '?') | (self.config['eng_units'][0] == ''):
-                            self.params['eng_units']=self.params['raw_units'][0]
+    ########################################################################################################################
+    # Parse responses from Tektronix TDS22x series oscilloscopes
+    def parse_tds220gpib(self, rawData, requests=None):
+        processed_curves = []
+        self.params['info'] = ['']
+        for i in range(1,len(rawData)):
+            l=rawData[i].split(';') # Break apart header & data.
+            def tryfloat(val):
+                try: return float(val)
+                except ValueError: return val
+            # Get all the header variables.
+            byt_nr, bit_nr, encoding, bn_fmt, byt_or, nr_pt, wfid, pt_fmt, xincr, pt_off, xzero,\
+                xunit, ymult, yzero, yoff, yunit = [tryfloat(v.strip()) for v in l[:16]]
+            
+            if encoding == 'BIN': # Binary decode with struct.unpack
+                if byt_or == 'LSB': decode_string = '<'
+                else: decode_string = '>'
+                x_ = int(l[16][1])
+                buf_len = int(l[16][2:2+x_])
+                decode_string += 'x'*(2+x_)
+                decode_string += str(int(buf_len))
+                if bn_fmt == 'RP': # Signed or unsigned binary?
+                    if byt_nr == 1: decode_string += 'B'
+                    elif byt_nr == 2: decode_string += 'H'
+                    elif byt_nr == 4: decode_string += 'I'
+                    elif byt_nr == 8: decode_string += 'Q'
+                    else: raise ValueError("TDS22x decoder: Unknown bytes per sample %s" % byt_nr)
+                elif bn_fmt == 'RI':
+                    if byt_nr == 1: decode_string += 'b'
+                    elif byt_nr == 2: decode_string += 'h'
+                    elif byt_nr == 4: decode_string += 'i'
+                    elif byt_nr == 8: decode_string += 'q'
+                    else: raise ValueError("TDS22x decoder: Unknown bytes per sample %s" % byt_nr)
                 else:
-                    val=np.nan # No value was received.                    
-                return [val]
-
-            # ----------------------------------------------------------------------------------------
-            elif self.subdriver=='pt200m':
-                vals = [np.nan]*len(rawData)
-                for n in range(len(vals)):
-                    if b':' in rawData[n]:
-                        rr=rawData[n].split(b':')[1]
-                        if n<3:  # numeric values
-                            vals[n] = float(rr[:8])
-                            self.params['raw_units'][n]=rr[8:].strip().decode('ascii')
-                        else:  # string values
-                            vals[n] = rr.strip().decode('ascii')
+                    raise ValueError("TDS22x decoder: Unknown binary format")
                 
-                for n in range(4): # update eng_units if they are empty.
-                    if (self.config['eng_units'][n] == '?') | (self.config['eng_units'][n] == ''):
-                            self.params['eng_units']=self.params['raw_units'][n]
-                return vals
+                buf = struct.unpack(decode_string, l[16])
+            
+            elif encoding == 'ASC': # Ascii decode. Always a signed integer.
+                x_ = int(l[16][1])
+                buf_len = int(l[16][2:2+x_])
+                buf = [int(v) for v in l[16][2+x_:]]
+        
+            if i==1: # Add time axis
+                processed_curves.append(np.linspace(xzero, xzero+xincr*nr_pt, nr_pt))
+                self.params['raw_units'][0]=xunit
+                if self.config['eng_units'][0] == '': self.config['eng_units'][0] = xunit
                 
+            # Add voltage trace
+            processed_curves.append((np.array(buf).astype(np.float) - yoff)*ymult)
+            
+            # Add units & scaling factors.
+            self.config['raw_units'][i]=yunit
+            if self.config['eng_units'][i] == '': self.config['eng_units'][i] = yunit
 
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='center310':
-                '''
-                    Software transmits 0x41 / A to request a normal report. or 0x4b / K for the model number.
-                    The meter responds with 0x02 ModeChar and then a sequence of strings containing
-                    hex data in ASCII format seperated by \n each.
-                    There are 4 to 9 bytes returned depending on the meter's operating mode.                    
-                    ModeChar represents the mode of the meter, as follows:
-                    Mode 'P' is a normal report of humidity, temperature in C, and time in free run mode.
-                    Mode 'H' is normal free run in Farenheit.
-                    Mode 'Q' is MAX
-                    Mode 'R' is MIN
-                    Mode 'S' is MAX MIN
-                    Mode 'T' is HOLD
-                    Mode '\x10' happens after some period of continuous running, and I'm not sure what this means exactly. 
-                    It might be related to the auto-off feature or when the auto-off is disabled. Otherwise the device behaves as in 'P' mode.
-                '''
-                hold=0; minmax=0; prefix_data=b''
-                while (rawData[0][0:1] != '\x02'.encode('ascii')) and (rawData[0][1:2] < '\x41'.encode('ascii')):
-                    # Advance forwards in the string until we find 0x02 followed by an ASCII capital letter.
-                    # Put everything before this into 'prefix_data' for later processing.
-                    prefix_data += rawData[0][0]
-                    rawData[0] = rawData[0][1:]
-                # Get the mode string
-                mode = rawData[0][1:2].decode('ascii').strip()
-                # Determine the units, hold and minmax values from the mode string
-                if 'P' in mode: self.params['raw_units'][1]='C'
-                elif 'T' in mode: hold=1
-                elif 'R' in mode: minmax=1
-                elif 'Q' in mode: minmax=2
-                elif 'S' in mode: minmax=3
-                elif 'H' in mode: self.params['raw_units'][1]='F'
-                elif '\x10' in mode: pass
-                else: 
-                    cprint( "\t!! Unknown device mode string in serial response", 'red', attrs=['bold'])
-                    raise ValueError
-                if len(rawData[0])<6: raise ValueError # Short/corrupted responses.
-                decoded=rawData[0][2:] # Everything after the mode string is T&H data
-                humidity = np.nan; temperature = np.nan # Default to NaN
-                time_min = np.nan; time_sec = np.nan
-                flags = None
-                
-                if mode == 'H': # Farenheit mode puts the timer data before the mode string
-                    humidity = np.array(struct.unpack('>H', decoded[1:3]))[0]/10.
-                    temperature = np.array(struct.unpack('>H', decoded[3:]+'\x00'))[0]/10.
-                    if len(prefix_data) > 2:
-                        time_min, time_sec = np.array(struct.unpack('>bb', prefix_data[-3:-1]))
-                else: # Celsius mode
-                    if len(decoded)>4:
-                        humidity, temperature = np.array(struct.unpack('>2H', decoded[1:5]))/10.
-                    if len(decoded)>=7:
-                        time_min, time_sec = np.array(struct.unpack('>bb', decoded[5:7]))
-                    if len(decoded)>=8:
-                        flags = decoded[7:] # Flag tells us if a mode change is going to happen
-                self.params['mode']=mode.strip()
-                if flags is None: self.params['flags']=''
-                else: self.params['flags']=flags.strip()
-                return [humidity, temperature, time_min*60 + time_sec, hold, minmax]
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='omega-iseries':
-                """ Omega iSeries returns binary that doesn't always conform to ASCII standard.
-                    The number of bits returned can also vary. Values from RAM are converted to
-                    quasi-ascii format while values in EEPROM tend to be in a custom binary floating
-                    point format."""
-                vals=[]
-                for n in range(len(rawData)):
-                    data = rawData[n]
-                    request = requests[n]
-                    
-                    
-                    if 'R' in request:
-                        # 'R' indicates reading a set point from flash memory, this must be decoded from binary.
-                        #print repr(request), repr(data.strip()[5:])
-                        decoded = data.strip()[6:].replace('\xae','\x2e').replace('\xb0','0').replace(r'\xb','')
-                        
-                        value = float(int(decoded[3:],16))
-                        #print "{0:x}".format(int(decoded[:3],16))
-                        decimal_bits = (int(decoded[:3],16) >> 8) & 0x7
-                        if decimal_bits == 0x2: value /= 10.
-                        if decimal_bits == 0x3: value /= 100.
-                        if decimal_bits == 0x4: value /= 1000.
-                        sign_bit = int(decoded[:3],16) >> 11
-                        if sign_bit == 0x1: value = -value
-                        #print value
-                        vals.append(value)
-                        #print value
-                    elif 'X' in request or 'U' in request:
-                        # 'X' indicates reading a value from RAM already formatted in ASCII.
-                        # 'U' is a status code.
-                        # Simple float conversion should work.
-                        try:
-                            if 'X\xb02' in request: start_byte = 6
-                            else:
-                                start_byte = 5
-                                if data[start_byte]=='1': start_byte+=1
-                            #print repr(request), repr(data.strip()[start_byte:])
-                            decoded = data.strip()[start_byte:].replace('\xae','\x2e').replace('\xb0','0').replace('\xb1','1').replace('\xb2','2')
-                            decoded = decoded.replace('\xb3','3').replace('\xb4','4').replace('\xb5','5').replace('\xb6','6').replace('\xb7','7')
-                            decoded = decoded.replace('\xb8','8').replace('\xb9','9').replace('\xb0','0')
-                            #print repr(decoded), decoded
-                            vals.append(float(decoded))
-                        except ValueError as e:
-                            cprint( e, 'red', attrs=['bold'])
-                            vals.append(np.nan)
-                            continue
-                    else:
-                        
-                        raise KeyError("I don't know how to decode this serial command")
+            # Add wfid string to params
+            self.params['info'].append(wfid)
 
-                return vals
+        return processed_curves
 
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='sd700':
-                vals = []
-                for i in range(len(rawData)):
+    ########################################################################################################################
+    # Parse responses from HP Agilent 53131A Universal Counter via GPIB-USB adapter
+    def parse_hp53131agpib(self, rawData, requests=None):
+        # :FORM:ASCII mode
+        return [ float(s) for s in rawData]
 
-                    if len(rawData[i])==15: # \x00\x00 starting
-                        strdata = struct.unpack('15c',rawData[i])
-                    elif len(rawData[i])==13:
-                        strdata = struct.unpack('13c',rawData[i])
-                        strdata = ['','']+strdata
-                    else:
-                        strdata = struct.unpack('%ic' % len(rawData[i]),rawData[i])
-                        if len(strdata)>15: strdata = strdata[-15:]
-                    vals.append(float((b''.join(strdata[-8:])).decode('utf-8'))*0.1)
-                    #debugging:
-                    #print repr(''.join(strdata[:9])) # this bit probably indicates -ve sign, units, etc.
-                return vals
-
-            # ----------------------------------------------------------------------------------------
-            elif 'alicat' in subdriver:
-                valStrings= [ s for s in rawData[0].decode('utf-8').split(' ') if s!='' ]
-                
-                # Convert empty '-' into zero to make it a float later, but avoid 'replace' command as it could catch negative sign
-                for i in range(len(valStrings)):
-                    if valStrings[i]=='-': valStrings[i]='0'
-                
-                if subdriver=='alicat-legacy':
-                    if valStrings[0].upper() != self.params['ID'].upper():
-                        raise pyLabDataLoggerIOError("Alicat Device ID mismatch - wrong serial port?")
-                
-                return [ float(valStrings[1]), float(valStrings[2]), float(valStrings[3]), float(valStrings[4]), valStrings[5].strip() ]
+    ########################################################################################################################
+    # Parse responses from HP 4263 LCR Meter via GPIB-USB adapter
+    def parse_hp4263agpib(self, rawData, requests=None):
+        # :FORM:ASCII mode
+        fetch = [ float(v) for v in rawData[0].decode('ascii').split(',') ]
+        if fetch[0] == 0: status='Normal'
+        elif fetch[0] == 0: status='Overload'
+        elif fetch[0] == 2: status='Non-contact'
+        else: status='?'
+        mode = rawData[1].decode('ascii').strip().strip('"')
+        res = [ np.array(fetch[1:]) ]
+        res.extend( [ status, mode ] )
+        res.extend( [ float(s) for s in rawData[2:] ] )
+        return res
 
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='esd508':
-                # Data was already processed, just need to split it apart & add to previous encoder value.
-                
-                if np.isnan(self.lastValue[1]) or (self.lastValue[1] is None):
-                    starting_position = 0
-                else:
-                    starting_position = self.lastValue[1]
-                    
-                return [ starting_position + rawData[0], starting_position + rawData[0][-1] ]
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='mx5060':
-                if rawData[0] is None:
-                    pri_val = np.nan
-                else:
-                    s = rawData[0].decode('ascii').split(' ',2)
-                    pri_val = s[0]; pri_unit = s[-1]
-                    self.params['raw_units'][0] = pri_unit.strip()
-                    if self.config['eng_units'][0] == '': self.config['eng_units'][0] = pri_unit.strip()
-                
-                if rawData[1] is None: 
-                    sec_val = np.nan
-                else:
-                    s = rawData[1].decode('ascii').split(' ',2)
-                    sec_val = s[0]; sec_unit = s[-1]
-                    self.params['raw_units'][1] = sec_unit.strip()
-                    if self.config['eng_units'][1] == '': self.config['eng_units'][1] = sec_unit.strip()
-                
-                try:
-                    pri_val = float(pri_val)
-                except ValueError:
-                    pri_val = np.nan
-                    
-                try:
-                    sec_val = float(sec_val)
-                except ValueError:
-                    sec_val = np.nan
-                
-                return [ float(pri_val), float(sec_val) ]
-            
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='r5000':
-                s=rawData[0].strip()
-                start=s.index(b'\x02')+1
-                end=s.index(b'\x03')-1
-                unit=chr(s[end])
-                # print(repr(s),repr(s[start:end]),repr(unit));exit()
-                if unit=='G': self.params['raw_units'][0]='kg gross'
-                elif unit=='N': self.params['raw_units'][0]='kg net'
-                else: self.params['raw_units'][0]=unit
-                if self.config['eng_units'][0] == '': self.config['eng_units'][0] = unit
-                return [ float(s[start:end].replace(b' ',b'')) ]
-           
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='radwag-r':
-                values=[]
-                for n in range(2):
-                    if self.serialQuery[n].encode('ascii') in rawData[n]:
-                        s=rawData[n].decode('ascii').split() # split on whitespace
-                        try: values.append(float(s[1]))
-                        except ValueError: values.append(np.nan)
-                        unit=s[2].strip()
-                        if self.params['raw_units'][n] != unit:
-                            if self.config['eng_units'][n] == self.params['raw_units'][n]:
-                                self.config['eng_units'][n] = unit
-                            self.params['raw_units'][n] = unit
-                return values 
-
-            # ----------------------------------------------------------------------------------------
-            elif (self.driver==['k3hb','vlc']) or (self.driver==['k3hb','x']): 
-                vals = []
-                    
-                for r in rawData:
-                    a=r.index(b'\x02')
-                    b=r.index(b'\x03')
-                    dataframe=r[a+11+4:b]
-                    if (dataframe[0] == 'F') or (dataframe[0] == 70):  # negative value
-                        dataframe = int(dataframe,16) ^ 0xffffffff
-                        vals.append(-float(dataframe)*10**(-self.config['decimal_places']))
-                    else: # positive value
-                        vals.append(float(int(dataframe,16))*10**(-self.config['decimal_places']))
-                
-                return vals
-                
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='bkp168': 
-                if len(rawData)<4: return [np.nan, np.nan, np.nan, np.nan]
+    ########################################################################################################################
+    # Parse responses from Pico TC08 RS-232 thermocouple datalogger (USB version has a seperate driver 'picotc08')
+    def parse_tc08rs232(self, rawData, requests=None):
+        # This algorithm follows the TC-08 user manual.
+        # Each call returns 3 bytes, the first is the sign and the second two are the MSB and LSB
+        microvolts = np.array([ -c if neg else c for neg, c in map(TC08_READING.unpack, rawData) ], dtype=float)
+        microvolts *= 0.9082780194 # 65535 counts == 59524uV
+        # Calculate cold junction temperature
+        divisor = (microvolts[9] + 65535)/65536.
+        r = (65536 * (microvolts[9]/divisor)) / (microvolts[8]/divisor)
+        cold_junction = -3.63620e-25*r**5 + 2.81708e-19*r**4 - 8.70805e-14*r**3 + 1.39391e-8*r**2 - 1.31981e-3*r + 71.3437
+        # Convert to temperature
+        temp = np.zeros_like(microvolts)
+        from thermocouples_reference import thermocouples
+        for n in range(8):
+            tc=thermocouples[self.config['tc_config'][n].upper()]
+            if self.params['raw_units'][n] == 'C': fconversion = tc.inverse_CmV
+            elif self.params['raw_units'][n] == 'F': fconversion = tc.inverse_FmV
+            elif self.params['raw_units'][n] == 'R': conversion = tc.inverse_RmV
+            elif self.params['raw_units'][n] == 'K': fconversion = tc.inverse_KmV
+            else: raise KeyError("Unknown units of measurement")
+            temp[n] = fconversion(microvolts[n]/1000., Tref=cold_junction)
+        temp[-1] = cold_junction
+        return temp
 
-                if (len(rawData[0])<9) or (not b'OK' in rawData[1]): return [np.nan, np.nan, np.nan, np.nan]
-                mode = rawData[0][8:]
-                vals = [float(rawData[0][:4])/100., float(rawData[0][4:8])/100.]
-                
-                if (len(rawData[2])<6) or (not b'OK' in rawData[3]): return [np.nan, np.nan, np.nan, np.nan]
-                vals.extend([ float(rawData[2][:3])/10., float(rawData[2][3:6])/10.])
-                      
-                if mode == b'0': vals.append('CV')                              
-                elif mode == b'1': vals.append('CC')
-                else: vals.append('?')
-                
-                return vals
-            
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='cc8870':
-                s=rawData[0].strip()
-                if b'z>\x00' in s: s=s[s.index(b'z>\x00')+3:]
-                if b'A' in s: s=s.strip(b'A') # remove unit of amp, it never changes anyway 
-                return [float(s.decode('ascii'))]
-
-
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='andg':
-                if not b',' in rawData[0]: return [np.nan,np.nan]
-                state,reading=rawData[0].decode('ascii').strip().split(',')
-                units='?'
-                if ' ' in reading:
-                    value,units=reading.split()
-                else:
-                    value=reading.strip()
+    ########################################################################################################################
+    # Parse responses from Honeywell HPMA115S0 Air Quality sensor
+    def parse_hpma(self, rawData, requests=None):
+        header=rawData[0][:2]
+        data=rawData[0][2:]
+
+        if header==b'\x96\x96':
+            if not self.quiet: cprint("\tHPMA: Negative ACK",'red')
+            return [None]*self.params['n_channels']
+
+        elif header==b'\x40\x05':
+                #print("Positive ACK")
+                #print("\tData: (received %i bytes)" % len(data))
+                pm25, pm10 = HPMA_READING.unpack_from(data, 1)
+                cs1 = data[5]
+                cs2 = (65536-(int(header[0])+int(header[1])+int(data[0])+sum([int(v) for v in data[1:5]])))%256
+                #print("\tPM2.5 = %s\n\tPM10 = %s\n\tChecksum match=%s\n" % (pm25,pm10,cs1==cs2))
+                return [pm25, pm10, cs1-cs2]
+        else:
+                if not self.quiet: cprint("\tHMPA: Comm Error. Got %s" % repr(rawData[0]),'red')
+                return [None]*self.params['n_channels']
 
-                # update units?
-                if (self.params['raw_units'][0] == '?') or (self.params['raw_units'][0] == ''):
-                    self.params['raw_units'] = [units.strip(),'']
-                if (self.config['eng_units'][0] == '?') or (self.config['eng_units'][0] == ''):
-                    self.config['eng_units']=self.params['raw_units']
-            
-                return [ np.float(value), state ]
+    ########################################################################################################################
+    # Parse responses from COZIR CO2 sensor
+    def parse_cozir(self, rawData, requests=None):
+        #Typical response looks like: Q\r\n'    b'H 00510 T 01244 Z 00698 z 00737
+        try:
+            zconst=self.config['zconst']
+            l=rawData[0].decode('ascii').strip().replace("\\r\\n","").strip('\'').split(' ')
+            h=float(l[1]) * 0.1
+            t=float(l[3][2:]) * 0.1
+            z1=float(l[5][2:])  * zconst
+            z2=float(l[7][2:])  * zconst
+            return [h,t,z1,z2]
+        except:
+            raise
+            return [None]*self.params['n_channels']
 
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='fy3200s':
-                return [ float(r.strip()) for r in rawData ]
-            
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='a5000':
-                print(rawData)
-                return [ None ]
-                #return [ float(s.decode('ascii')) for s in rawData]
+    ########################################################################################################################
+    # Parse responses from Omega IR-USB temperature probe with built in USB to Serial converter
+    def parse_omega_ir_usb(self, rawData, requests=None):
+        if len(rawData)<2: return [None]*self.params['n_channels']
+        vals= [float(rawData[0].strip('>')), float(rawData[1].strip('>'))]
+        if len(rawData)<3: vals.extend([np.nan, np.nan])
+        else: vals.extend([float(v) for v in rawData[2].split('=')[1].split(',')])
+        if len(rawData)<4: vals.append(np.nan)
+        else: vals.append(float(rawData[3].split('=')[1]))
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Omega Platinum series process meter / controller via USB interface w/Omega protocol
+    def parse_omega_pt(self, rawData, requests=None):
+        vals = []
+        for d in rawData:
+            try:
+                vals.append(float(d.strip()[4:]))
+            except ValueError:
+                vals.append(None)
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Omega USB-H pressure transducers
+    def parse_omega_usbh(self, rawData, requests=None):
+        vals = []
+        for i in range(len(rawData)):
             
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='lc-adc-f103c8':
-                vals=[np.nan]*self.params['n_channels']
-                for r in rawData:
-                    try:
-                        chStr,valStr = r.decode('ascii').strip().split('\t')
-                        chNum=int(chStr[2])
-                        vals[chNum] = float(valStr.strip('V'))
-                    except:
-                        continue
-                return vals
-                
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='chemyx':
-                vals=[np.nan]*self.params['n_channels']
-                for j in range(2):
-                    if b'=' in rawData[j]:
-                        try:
-                            vals[j] = float(rawData[j].decode('ascii').split('=')[-1].strip('>').strip('\r').strip())
-                        except ValueError:
-                            vals[j] = np.nan
-                if b'status' in rawData[2]:
-                    match rawData[2].decode('ascii').split('\n')[-2].strip():
-                        case '0': vals[2]='stopped'
-                        case '1': vals[2]='running'
-                        case '2': vals[2]='paused'
-                        case '3': vals[2]='delayed'
-                        case '4': vals[2]='stalled'
-                        case _: vals[2]='?'
-                if b'press' in rawData[3]:
-                    s=rawData[3].decode('ascii').strip('>').strip('\r').strip().split(' ')
-                    vals[3]=float(s[4].replace('NC','nan'))
-                    vals[4]=float(s[6].replace('NC','nan'))
-                return vals
+            # first frame beginning point
+            offset = rawData[i].index(b'\xaa')
+            # Remove 0xAAAA and replace with 0xAA (delete the bit stuff)
+            rawData[i] = rawData[i].replace(b'\xaa\xaa',b'\xaa')
+            # number of frames to process
+            n_frames = int(np.floor(len(rawData[i][offset:])/6))                   
+            vals.append( np.frombuffer(rawData[i], dtype=OMEGA_USBH_FRAME, count=n_frames, offset=offset)['value'].astype(float) )
             
-            # ----------------------------------------------------------------------------------------
-            elif subdriver=='ca100':
-                
-                vals=[]
-                vals.append(float(rawData[0].strip().strip(b' ').decode('ascii'))) # measure value
-                vals.append(int(rawData[1].strip()[2:].decode('ascii'))) # meas range indicator
-                vals.append(int(rawData[2].strip()[2:].decode('ascii'))) # meas fun indicator
-                vals.append(float(rawData[3].strip()[2:].decode('ascii'))) # source value
-                vals.append(int(rawData[4].strip()[2:].decode('ascii'))) # source range indicator
-                vals.append(int(rawData[5].strip()[2:].decode('ascii'))) # source fun indicator
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from OHAUS 7000 series scientific scales via RS232
+    def parse_ohaus7k(self, rawData, requests=None):
+        vals=rawData[0].split(b' ')
+        self.params['raw_units']=[vals[-1].strip()]
+        return [float(vals[0])]
+
+    ########################################################################################################################
+    # Parse responses from Radwag WTB precision balance/scale
+    def parse_wtb(self, rawData, requests=None):
+        vals=rawData[0].strip().split(' ')
+        self.params['raw_units']=[vals[-1]]
+        if self.config['eng_units'][0] == '?': self.config['eng_units']=[vals[-1]]
+        return [float(vals[-2])]
+
+    ########################################################################################################################
+    # Parse responses from Newport P6000A Frequency meter/counter/timer
+    def parse_p6000a(self, rawData, requests=None):
+        rawString = rawData[0].decode('ascii')#.strip()
+        if len(rawString)>=9:
+            # Valid response received, should be 10 to 12 characters ASCII.
+            val=float(rawString[:9])
+            if (len(rawString)>=11): # There is a mode bit that can turn off unit transmission.
+                self.params['raw_units'][0]=rawString[9:].strip()
+                if (self.config['eng_units'][0] == '?') | (self.config['eng_units'][0] == ''):
+                    self.params['eng_units']=self.params['raw_units'][0]
+        else:
+            val=np.nan # No value was received.                    
+        return [val]
+
+    ########################################################################################################################
+    # Parse responses from PT Ltd. PT200M load cell amplifier (ptglobal.com)
+    def parse_pt200m(self, rawData, requests=None):
+        vals = [np.nan]*len(rawData)
+        for n in range(len(vals)):
+            if b':' in rawData[n]:
+                rr=rawData[n].split(b':')[1]
+                if n<3:  # numeric values
+                    vals[n] = float(rr[:8])
+                    self.params['raw_units'][n]=rr[8:].strip().decode('ascii')
+                else:  # string values
+                    vals[n] = rr.strip().decode('ascii')
+        
+        for n in range(4): # update eng_units if they are empty.
+            if (self.config['eng_units'][n] == '?') | (self.config['eng_units'][n] == ''):
+                    self.params['eng_units']=self.params['raw_units'][n]
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from CENTER 310 Temperature and Humidity meter
+    def parse_center310(self, rawData, requests=None):
+        '''
+            Software transmits 0x41 / A to request a normal report. or 0x4b / K for the model number.
+            The meter responds with 0x02 ModeChar and then a sequence of strings containing
+            hex data in ASCII format seperated by \n each.
+            There are 4 to 9 bytes returned depending on the meter's operating mode.                    
+            ModeChar represents the mode of the meter, as follows:
+            Mode 'P' is a normal report of humidity, temperature in C, and time in free run mode.
+            Mode 'H' is normal free run in Farenheit.
+            Mode 'Q' is MAX
+            Mode 'R' is MIN
+            Mode 'S' is MAX MIN
+            Mode 'T' is HOLD
+            Mode '\x10' happens after some period of continuous running, and I'm not sure what this means exactly. 
+            It might be related to the auto-off feature or when the auto-off is disabled. Otherwise the device behaves as in 'P' mode.
+        '''
+        hold=0; minmax=0; prefix_data=b''
+        while (rawData[0][0:1] != '\x02'.encode('ascii')) and (rawData[0][1:2] < '\x41'.encode('ascii')):
+            # Advance forwards in the string until we find 0x02 followed by an ASCII capital letter.
+            # Put everything before this into 'prefix_data' for later processing.
+            prefix_data += rawData[0][0]
+            rawData[0] = rawData[0][1:]
+        # Get the mode string
+        mode = rawData[0][1:2].decode('ascii').strip()
+        # Determine the units, hold and minmax values from the mode string
+        if 'P' in mode: self.params['raw_units'][1]='C'
+        elif 'T' in mode: hold=1
+        elif 'R' in mode: minmax=1
+        elif 'Q' in mode: minmax=2
+        elif 'S' in mode: minmax=3
+        elif 'H' in mode: self.params['raw_units'][1]='F'
+        elif '\x10' in mode: pass
+        else: 
+            cprint( "\t!! Unknown device mode string in serial response", 'red', attrs=['bold'])
+            raise ValueError
+        if len(rawData[0])<6: raise ValueError # Short/corrupted responses.
+        decoded=rawData[0][2:] # Everything after the mode string is T&H data
+        humidity = np.nan; temperature = np.nan # Default to NaN
+        time_min = np.nan; time_sec = np.nan
+        flags = None
+        
+        if mode == 'H': # Farenheit mode puts the timer data before the mode string
+            humidity = np.array(struct.unpack('>H', decoded[1:3]))[0]/10.
+            temperature = np.array(struct.unpack('>H', decoded[3:]+'\x00'))[0]/10.
+            if len(prefix_data) > 2:
+                time_min, time_sec = np.array(struct.unpack('>bb', prefix_data[-3:-1]))
+        else: # Celsius mode
+            if len(decoded)>4:
+                humidity, temperature = np.array(struct.unpack('>2H', decoded[1:5]))/10.
+            if len(decoded)>=7:
+                time_min, time_sec = np.array(struct.unpack('>bb', decoded[5:7]))
+            if len(decoded)>=8:
+                flags = decoded[7:] # Flag tells us if a mode change is going to happen
+        self.params['mode']=mode.strip()
+        if flags is None: self.params['flags']=''
+        else: self.params['flags']=flags.strip()
+        return [humidity, temperature, time_min*60 + time_sec, hold, minmax]
+
+    ########################################################################################################################
+    # Parse responses from Omega iSeries Process Controller
+    def parse_omega_iseries(self, rawData, requests=None):
+        """ Omega iSeries returns binary that doesn't always conform to ASCII standard.
+            The number of bits returned can also vary. Values from RAM are converted to
+            quasi-ascii format while values in EEPROM tend to be in a custom binary floating
+            point format."""
+        vals=[]
+        for n in range(len(rawData)):
+            data = rawData[n]
+            request = requests[n]
+            
+            
+            if 'R' in request:
+                # 'R' indicates reading a set point from flash memory, this must be decoded from binary.
+                #print repr(request), repr(data.strip()[5:])
+                decoded = data.strip()[6:].replace('\xae','\x2e').replace('\xb0','0').replace(r'\xb','')
                 
-                # Update engineering units and function strings
-                if vals[2]==0:
-                    self.config['eng_units'][0] = 'V DC'
-                    self.params['raw_units'][0] = 'V DC'
-                    vals[2]='V DC'
-                    if vals[1]==0: vals[1]='500 mV'
-                    elif vals[1]==1: vals[1]='5 V'
-                    elif vals[1]==2: vals[1]='35 V'
-                elif vals[2]==1:
-                    self.config['eng_units'][0] = 'mA'
-                    self.params['raw_units'][0] = 'mA'
-                    vals[2]='mA'
-                    if vals[1]==0: vals[1]='20 mA'
-                    elif vals[1]==1: vals[1]='100 mA'
-                    elif vals[1]==2: vals[1]='-'
-                elif vals[2]==2:
-                    self.config['eng_units'][0] = u'\u03a9'
-                    self.params['raw_units'][0] = u'\u03a9'
-                    vals[2]=u'\u03a9'
-                    if vals[1]==0: vals[1]=u'500 \u03a9'
-                    elif vals[1]==1: vals[1]=u'5 k\u03a9'
-                    elif vals[1]==2: vals[1]=u'50 k\u03a9'
-                        
-                if vals[5]==0:
-                    self.config['eng_units'][3] = 'V DC'
-                    self.params['raw_units'][3] = 'V DC'
-                    vals[5]='V DC'
-                    if vals[4]==0: vals[4]='100 mV'
-                    elif vals[4]==1: vals[4]='1 V'
-                    elif vals[4]==2: vals[4]='10 V'
-                elif vals[5]==1:
-                    self.config['eng_units'][3] = 'mA'
-                    self.params['raw_units'][3] = 'mA'
-                    vals[5]='mA'
-                    vals[4]='-'
-                elif vals[5]==2:
-                    self.config['eng_units'][3] = u'\u03a9'
-                    self.params['raw_units'][3] = u'\u03a9'
-                    vals[5] = u'\u03a9'
-                    if vals[4]==0: vals[1]=u'500\u03a9'
-                    elif vals[4]==1: vals[1]=u'5k\u03a9'
-                    elif vals[4]==2: vals[1]=u'50k\u03a9'
-                elif (vals[5]==3) or (vals[5]==4):
-                    self.config['eng_units'][3] = u'\u00b0C'
-                    self.params['raw_units'][3] = u'\u00b0C'
-                    vals[5]=u'\u00b0C'
-                    if vals[4]==0: vals[4]='PT100'
-                    else: vals[4]='-'
-                elif vals[5]>=5:
-                    self.config['eng_units'][3] = 'Hz'
-                    self.params['raw_units'][3] = 'Hz'
-                    vals[5]='Hz'
-                    if vals[4]==0: vals[4]='1 kHz'
-                    elif vals[4]==1: vals[4]='10 kHz'
-                    elif vals[4]==2: vals[4]='50 kHz'
-                    else: vals[4]='-'
-                    
-                return vals
-            
+                value = float(int(decoded[3:],16))
+                #print "{0:x}".format(int(decoded[:3],16))
+                decimal_bits = (int(decoded[:3],16) >> 8) & 0x7
+                if decimal_bits == 0x2: value /= 10.
+                if decimal_bits == 0x3: value /= 100.
+                if decimal_bits == 0x4: value /= 1000.
+                sign_bit = int(decoded[:3],16) >> 11
+                if sign_bit == 0x1: value = -value
+                #print value
+                vals.append(value)
+                #print value
+            elif 'X' in request or 'U' in request:
+                # 'X' indicates reading a value from RAM already formatted in ASCII.
+                # 'U' is a status code.
+                # Simple float conversion should work.
+                try:
+                    if 'X\xb02' in request: start_byte = 6
+                    else:
+                        start_byte = 5
+                        if data[start_byte]=='1': start_byte+=1
+                    #print repr(request), repr(data.strip()[start_byte:])
+                    decoded = data.strip()[start_byte:].replace('\xae','\x2e').replace('\xb0','0').replace('\xb1','1').replace('\xb2','2')
+                    decoded = decoded.replace('\xb3','3').replace('\xb4','4').replace('\xb5','5').replace('\xb6','6').replace('\xb7','7')
+                    decoded = decoded.replace('\xb8','8').replace('\xb9','9').replace('\xb0','0')
+                    #print repr(decoded), decoded
+                    vals.append(float(decoded))
+                except ValueError as e:
+                    cprint( e, 'red', attrs=['bold'])
+                    vals.append(np.nan)
+                    continue
             else:
-                # Default behaviour, assuming rawData has a string holding a scalar float for each variable
-                return [ float(s.strip().decode('ascii')) for s in rawData]
-                
                 
+                raise KeyError("I don't know how to decode this serial command")
+
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Extech SD700 barometric PTH datalogger
+    def parse_sd700(self, rawData, requests=None):
+        vals = []
+        for i in range(len(rawData)):
+
+            if len(rawData[i])==15: # \x00\x00 starting
+                strdata = struct.unpack('15c',rawData[i])
+            elif len(rawData[i])==13:
+                strdata = struct.unpack('13c',rawData[i])
+                strdata = ['','']+strdata
+            else:
+                strdata = struct.unpack('%ic' % len(rawData[i]),rawData[i])
+                if len(strdata)>15: strdata = strdata[-15:]
+            vals.append(float((b''.join(strdata[-8:])).decode('utf-8'))*0.1)
+            #debugging:
+            #print repr(''.join(strdata[:9])) # this bit probably indicates -ve sign, units, etc.
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Alicat Scientific M-series mass flow meter
+    def parse_alicat(self, rawData, requests=None):
+        subdriver = self.subdriver
+        valStrings= [ s for s in rawData[0].decode('utf-8').split(' ') if s!='' ]
+        
+        # Convert empty '-' into zero to make it a float later, but avoid 'replace' command as it could catch negative sign
+        for i in range(len(valStrings)):
+            if valStrings[i]=='-': valStrings[i]='0'
+        
+        if subdriver=='alicat-legacy':
+            if valStrings[0].upper() != self.params['ID'].upper():
+                raise pyLabDataLoggerIOError("Alicat Device ID mismatch - wrong serial port?")
+        
+        return [ float(valStrings[1]), float(valStrings[2]), float(valStrings[3]), float(valStrings[4]), valStrings[5].strip() ]
+
+    ########################################################################################################################
+    # Parse responses from Leadshine ES-D508 Easy Servomotor Driver
+    def parse_esd508(self, rawData, requests=None):
+        # Data was already processed, just need to split it apart & add to previous encoder value.
+        
+        if np.isnan(self.lastValue[1]) or (self.lastValue[1] is None):
+            starting_position = 0
+        else:
+            starting_position = self.lastValue[1]
+            
+        return [ starting_position + rawData[0], starting_position + rawData[0][-1] ]
+
+    ########################################################################################################################
+    # Parse responses from Metrix MX5060 Bench Multimeter
+    def parse_mx5060(self, rawData, requests=None):
+        if rawData[0] is None:
+            pri_val = np.nan
+        else:
+            s = rawData[0].decode('ascii').split(' ',2)
+            pri_val = s[0]; pri_unit = s[-1]
+            self.params['raw_units'][0] = pri_unit.strip()
+            if self.config['eng_units'][0] == '': self.config['eng_units'][0] = pri_unit.strip()
+        
+        if rawData[1] is None: 
+            sec_val = np.nan
+        else:
+            s = rawData[1].decode('ascii').split(' ',2)
+            sec_val = s[0]; sec_unit = s[-1]
+            self.params['raw_units'][1] = sec_unit.strip()
+            if self.config['eng_units'][1] == '': self.config['eng_units'][1] = sec_unit.strip()
+        
+        try:
+            pri_val = float(pri_val)
         except ValueError:
-            cprint( "\t!! Failure to unpack raw string from device: "+str( rawData ), 'red', attrs=['bold'])
-            raise
-        except IndexError: # Nothing in rawData!
-            cprint( "\tDevice %s returned no data." % self.name , 'red', attrs=['bold'])
+            pri_val = np.nan
+            
+        try:
+            sec_val = float(sec_val)
+        except ValueError:
+            sec_val = np.nan
         
-        return [np.nan]*self.params['n_channels']
-    
-    
+        return [ float(pri_val), float(sec_val) ]
+
+    ########################################################################################################################
+    # Parse responses from Ranger 5000 series load cell amplifier via RS232
+    def parse_r5000(self, rawData, requests=None):
+        s=rawData[0].strip()
+        start=s.index(b'\x02')+1
+        end=s.index(b'\x03')-1
+        unit=chr(s[end])
+        # print(repr(s),repr(s[start:end]),repr(unit));exit()
+        if unit=='G': self.params['raw_units'][0]='kg gross'
+        elif unit=='N': self.params['raw_units'][0]='kg net'
+        else: self.params['raw_units'][0]=unit
+        if self.config['eng_units'][0] == '': self.config['eng_units'][0] = unit
+        return [ float(s[start:end].replace(b' ',b'')) ]
+
+    ########################################################################################################################
+    # Parse responses from RADWAG R-series balance
+    def parse_radwag_r(self, rawData, requests=None):
+        values=[]
+        for n in range(2):
+            if self.serialQuery[n].encode('ascii') in rawData[n]:
+                s=rawData[n].decode('ascii').split() # split on whitespace
+                try: values.append(float(s[1]))
+                except ValueError: values.append(np.nan)
+                unit=s[2].strip()
+                if self.params['raw_units'][n] != unit:
+                    if self.config['eng_units'][n] == self.params['raw_units'][n]:
+                        self.config['eng_units'][n] = unit
+                    self.params['raw_units'][n] = unit
+        return values 
+
+    ########################################################################################################################
+    # Parse responses from Omron K3HB-VLC load cell amplifier or K3HB-X ammeter
+    def parse_k3hb(self, rawData, requests=None):
+        vals = []
+        scale = 10**(-self.config['decimal_places'])
+        for r in rawData:
+            dataframe=self.k3hb_data(r)
+            if dataframe[:1] == b'F':  # negative value
+                vals.append(-float(int(dataframe,16) ^ 0xffffffff)*scale)
+            else: # positive value
+                vals.append(float(int(dataframe,16))*scale)
+        
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from BK Precision 168xx series power supply
+    def parse_bkp168(self, rawData, requests=None):
+        if len(rawData)<4: return [np.nan, np.nan, np.nan, np.nan]
+
+        if (len(rawData[0])<9) or (not b'OK' in rawData[1]): return [np.nan, np.nan, np.nan, np.nan]
+        mode = rawData[0][8:]
+        vals = [float(rawData[0][:4])/100., float(rawData[0][4:8])/100.]
+        
+        if (len(rawData[2])<6) or (not b'OK' in rawData[3]): return [np.nan, np.nan, np.nan, np.nan]
+        vals.extend([ float(rawData[2][:3])/10., float(rawData[2][3:6])/10.])
+              
+        if mode == b'0': vals.append('CV')                              
+        elif mode == b'1': vals.append('CC')
+        else: vals.append('?')
+        
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from USB Current Clamp (E-Meter 8870 marking)
+    def parse_cc8870(self, rawData, requests=None):
+        s=rawData[0].strip()
+        if b'z>\x00' in s: s=s[s.index(b'z>\x00')+3:]
+        if b'A' in s: s=s.strip(b'A') # remove unit of amp, it never changes anyway 
+        return [float(s.decode('ascii'))]
+
+    ########################################################################################################################
+    # Parse responses from AND GX-K and GF-K series precision balances
+    def parse_andg(self, rawData, requests=None):
+        if not b',' in rawData[0]: return [np.nan,np.nan]
+        state,reading=rawData[0].decode('ascii').strip().split(',')
+        units='?'
+        if ' ' in reading:
+            value,units=reading.split()
+        else:
+            value=reading.strip()
+
+        # update units?
+        if (self.params['raw_units'][0] == '?') or (self.params['raw_units'][0] == ''):
+            self.params['raw_units'] = [units.strip(),'']
+        if (self.config['eng_units'][0] == '?') or (self.config['eng_units'][0] == ''):
+            self.config['eng_units']=self.params['raw_units']
     
+        return [ np.float(value), state ]
+
+    ########################################################################################################################
+    # Parse responses from FeelTech FY3200S Dual Channel Function Generator
+    def parse_fy3200s(self, rawData, requests=None):
+        return [ float(r.strip()) for r in rawData ]
+
+    ########################################################################################################################
+    # Parse responses from Asahi Heiki A5000 Load Cell Amplifier
+    def parse_a5000(self, rawData, requests=None):
+        print(rawData)
+        return [ None ]
+        #return [ float(s.decode('ascii')) for s in rawData]
+
+    ########################################################################################################################
+    # Parse responses from LC STM32 10 channel ADC
+    def parse_lc_adc_f103c8(self, rawData, requests=None):
+        vals=[np.nan]*self.params['n_channels']
+        for r in rawData:
+            try:
+                chStr,valStr = r.decode('ascii').strip().split('\t')
+                chNum=int(chStr[2])
+                vals[chNum] = float(valStr.strip('V'))
+            except:
+                continue
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Chemyx syringe pump
+    def parse_chemyx(self, rawData, requests=None):
+        vals=[np.nan]*self.params['n_channels']
+        for j in range(2):
+            if b'=' in rawData[j]:
+                try:
+                    vals[j] = float(rawData[j].decode('ascii').split('=')[-1].strip('>').strip('\r').strip())
+                except ValueError:
+                    vals[j] = np.nan
+        if b'status' in rawData[2]:
+            match rawData[2].decode('ascii').split('\n')[-2].strip():
+                case '0': vals[2]='stopped'
+                case '1': vals[2]='running'
+                case '2': vals[2]='paused'
+                case '3': vals[2]='delayed'
+                case '4': vals[2]='stalled'
+                case _: vals[2]='?'
+        if b'press' in rawData[3]:
+            s=rawData[3].decode('ascii').strip('>').strip('\r').strip().split(' ')
+            vals[3]=float(s[4].replace('NC','nan'))
+            vals[4]=float(s[6].replace('NC','nan'))
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Yokogawa CA100 Calibrator
+    def parse_ca100(self, rawData, requests=None):
+        vals=[]
+        vals.append(float(rawData[0].strip().strip(b' ').decode('ascii'))) # measure value
+        vals.append(int(rawData[1].strip()[2:].decode('ascii'))) # meas range indicator
+        vals.append(int(rawData[2].strip()[2:].decode('ascii'))) # meas fun indicator
+        vals.append(float(rawData[3].strip()[2:].decode('ascii'))) # source value
+        vals.append(int(rawData[4].strip()[2:].decode('ascii'))) # source range indicator
+        vals.append(int(rawData[5].strip()[2:].decode('ascii'))) # source fun indicator
+        
+        # Update engineering units and function strings
+        if vals[2]==0:
+            self.config['eng_units'][0] = 'V DC'
+            self.params['raw_units'][0] = 'V DC'
+            vals[2]='V DC'
+            if vals[1]==0: vals[1]='500 mV'
+            elif vals[1]==1: vals[1]='5 V'
+            elif vals[1]==2: vals[1]='35 V'
+        elif vals[2]==1:
+            self.config['eng_units'][0] = 'mA'
+            self.params['raw_units'][0] = 'mA'
+            vals[2]='mA'
+            if vals[1]==0: vals[1]='20 mA'
+            elif vals[1]==1: vals[1]='100 mA'
+            elif vals[1]==2: vals[1]='-'
+        elif vals[2]==2:
+            self.config['eng_units'][0] = u'\u03a9'
+            self.params['raw_units'][0] = u'\u03a9'
+            vals[2]=u'\u03a9'
+            if vals[1]==0: vals[1]=u'500 \u03a9'
+            elif vals[1]==1: vals[1]=u'5 k\u03a9'
+            elif vals[1]==2: vals[1]=u'50 k\u03a9'
+                
+        if vals[5]==0:
+            self.config['eng_units'][3] = 'V DC'
+            self.params['raw_units'][3] = 'V DC'
+            vals[5]='V DC'
+            if vals[4]==0: vals[4]='100 mV'
+            elif vals[4]==1: vals[4]='1 V'
+            elif vals[4]==2: vals[4]='10 V'
+        elif vals[5]==1:
+            self.config['eng_units'][3] = 'mA'
+            self.params['raw_units'][3] = 'mA'
+            vals[5]='mA'
+            vals[4]='-'
+        elif vals[5]==2:
+            self.config['eng_units'][3] = u'\u03a9'
+            self.params['raw_units'][3] = u'\u03a9'
+            vals[5] = u'\u03a9'
+            if vals[4]==0: vals[1]=u'500\u03a9'
+            elif vals[4]==1: vals[1]=u'5k\u03a9'
+            elif vals[4]==2: vals[1]=u'50k\u03a9'
+        elif (vals[5]==3) or (vals[5]==4):
+            self.config['eng_units'][3] = u'\u00b0C'
+            self.params['raw_units'][3] = u'\u00b0C'
+            vals[5]=u'\u00b0C'
+            if vals[4]==0: vals[4]='PT100'
+            else: vals[4]='-'
+        elif vals[5]>=5:
+            self.config['eng_units'][3] = 'Hz'
+            self.params['raw_units'][3] = 'Hz'
+            vals[5]='Hz'
+            if vals[4]==0: vals[4]='1 kHz'
+            elif vals[4]==1: vals[4]='10 kHz'
+            elif vals[4]==2: vals[4]='50 kHz'
+            else: vals[4]='-'
+            
+        return vals
+
+    ########################################################################################################################
+    # Parse responses from Modbus RTU devices
+    def parse_modbus(self, rawData, requests=None):
+        return [ modbusRTU.decode(words, r[4]) for words, r in zip(rawData[0], self.params['modbus_registers']) ]
+
+    ########################################################################################################################
+    # Default parser, for responses that each hold a scalar float
+    def parse_default(self, rawData, requests=None):
+        # Default behaviour, assuming rawData has a string holding a scalar float for each variable
+        return [ float(s) for s in rawData]
+
     ########################################################################################################################
     # Read latest values
     def get_values(self):
         rawData=[]
-        for n in range(len(self.serialQuery)):
-            if self.serialQuery[n] is not None:
-                if ',' in self.serialQuery[n]:
-                    # Multiple commands must be sent. They are seperated by commas.
-
-                    # A double comma denotes a long pause dictated by params['sample_period']
-                    # The responses will be concatenated.
-                    if ',,' in self.serialQuery[n] and not 'sample_period' in self.params:
-                        self.params['sample_period']=1.
-                        cprint( "sample_period not set for %s, default to 1 second" % self.name, 'yellow')
-
-                    # Split commands,set default values.
-                    cmds=self.serialQuery[n].split(',')
-                    resp=b'' 
-                    maxlen = self.maxlen
-                    sleeptime = self.sleeptime
-                    # Loop commands
-                    for i in range(len(cmds)):
-                        if i<len(cmds)-1: 
-                            if cmds[i+1]=='': # ',,' pause will come next
-                                sleeptime = self.params['sample_period'] # set the pause period longer
-
-                        if cmds[i]=='': # ',,' was detected
-                            maxlen=0 # following command is a 'stop' command and no response expected.
-                            sleeptime=self.sleeptime # reset sleeptime
-                        else: # send a command
-                            r=self.serialCommsFunction(cmds[i]+self.queryTerminator,self.responseTerminator,maxlen,self.params['min_response_length'],sleeptime)
-                            if r is not None: resp+=r # append response
-                    rawData.append(resp)
-                else: 
-                    # Only one command sent per value
-                    rawData.append(self.serialCommsFunction(self.serialQuery[n]+self.queryTerminator,\
-                                   self.responseTerminator,self.maxlen,self.params['min_response_length'],self.sleeptime))
+        self.acquisitionStart() # bracket the serial transactions for the timestamp
+        if (self.pipelineDepth > 1) and self.params.get('pipeline', False) and\
+           all([(q is not None) and not (',' in q) for q in self.serialQuery]):
+            # Send all the queries at once
+            rawData = self.pipelinedSerialRequests([q+self.queryTerminator for q in self.serialQuery])
+        else:
+            for n in range(len(self.serialQuery)):
+                if self.serialQuery[n] is not None:
+                    if ',' in self.serialQuery[n]:
+                        # Multiple commands must be sent. They are seperated by commas.
+
+                        # A double comma denotes a long pause dictated by params['sample_period']
+                        # The responses will be concatenated.
+                        if ',,' in self.serialQuery[n] and not 'sample_period' in self.params:
+                            self.params['sample_period']=1.
+                            cprint( "sample_period not set for %s, default to 1 second" % self.name, 'yellow')
+
+                        # Split commands,set default values.
+                        cmds=self.serialQuery[n].split(',')
+                        resp=b'' 
+                        maxlen = self.maxlen
+                        sleeptime = self.sleeptime
+                        # Loop commands
+                        for i in range(len(cmds)):
+                            if i<len(cmds)-1: 
+                                if cmds[i+1]=='': # ',,' pause will come next
+                                    sleeptime = self.params['sample_period'] # set the pause period longer
+
+                            if cmds[i]=='': # ',,' was detected
+                                maxlen=0 # following command is a 'stop' command and no response expected.
+                                sleeptime=self.sleeptime # reset sleeptime
+                            else: # send a command
+                                r=self.serialCommsFunction(cmds[i]+self.queryTerminator,self.responseTerminator,maxlen,self.params['min_response_length'],sleeptime)
+                                if r is not None: resp+=r # append response
+                        rawData.append(resp)
+                    else: 
+                        # Only one command sent per value
+                        rawData.append(self.serialCommsFunction(self.serialQuery[n]+self.queryTerminator,\
+                                       self.responseTerminator,self.maxlen,self.params['min_response_length'],self.sleeptime))
+        self.acquisitionEnd()
 
         # Convert and store in lastValue
         self.lastValue = self.convert_raw_string_to_values(rawData,self.serialQuery)
@@ -2354,12 +2623,23 @@ class serialDevice(device):
         except:
             cprint( "Serial connection to the device is not open.", 'red', attrs=['bold'])
 
-        # If first time or reset, get configuration
-        if not 'raw_units' in self.params.keys() or reset:
-            self.configure_device()
-        
-        # Read values        
-        self.get_values()
+        # On a shared RS-485 bus, wait for our turn. Bytes buffered before then aren't ours.
+        if self.bus is not None:
+            self.bus.acquire(self.busNode, timeout=self.params['timeout'],\
+                             wait_timeout=self.params.get('rs485_wait_timeout', rs485Bus.WAIT_TIMEOUT))
+            self.rxBuffer = bytearray()
+            if self.framer is not None: self.framer.reset()
+
+        try:
+            # If first time or reset, get configuration
+            if not 'raw_units' in self.params.keys() or reset:
+                self.configure_device()
+                if self.params.get('auto_latency', False): self.calibrate_latency()
+
+            # Read values
+            self.get_values()
+        finally:
+            if self.bus is not None: self.bus.release(self.busNode)
         if self.lastValue is None: self.lastValue=[np.nan]*self.params['n_channels']
 	
         # Generate scaled values. Convert non-numerics to NaN
@@ -2373,3 +2653,43 @@ class serialDevice(device):
         self.lastScaled = np.array(lastValueSanitized) * self.config['scale'] + self.config['offset']
         self.updateTimestamp()
         return self.lastValue
+
+########################################################################################################################
+# Registry of subdrivers, by the part of the driver name after 'serial/'.
+SUBDRIVERS = {
+    'a5000'        : serialSubdriver(serialDevice.configure_a5000, serialDevice.parse_a5000),
+    'alicat'       : serialSubdriver(serialDevice.configure_alicat, serialDevice.parse_alicat),
+    'alicat-legacy': serialSubdriver(serialDevice.configure_alicat, serialDevice.parse_alicat),
+    'andg'         : serialSubdriver(serialDevice.configure_andg, serialDevice.parse_andg),
+    'bkp168'       : serialSubdriver(serialDevice.configure_bkp168, serialDevice.parse_bkp168),
+    'ca100'        : serialSubdriver(serialDevice.configure_ca100, serialDevice.parse_ca100),
+    'cc8870'       : serialSubdriver(serialDevice.configure_cc8870, serialDevice.parse_cc8870),
+    'center310'    : serialSubdriver(serialDevice.configure_center310, serialDevice.parse_center310),
+    'chemyx'       : serialSubdriver(serialDevice.configure_chemyx, serialDevice.parse_chemyx),
+    'cozir'        : serialSubdriver(serialDevice.configure_cozir, serialDevice.parse_cozir),
+    'di148'        : serialSubdriver(serialDevice.configure_di148, serialDevice.parse_default),
+    'esd508'       : serialSubdriver(serialDevice.configure_esd508, serialDevice.parse_esd508, cumulative=True),
+    'fy3200s'      : serialSubdriver(serialDevice.configure_fy3200s, serialDevice.parse_fy3200s),
+    'hm8122'       : serialSubdriver(serialDevice.configure_hm8122, serialDevice.parse_default),
+    'hm8131'       : serialSubdriver(serialDevice.configure_hm8131, serialDevice.parse_default),
+    'hp4263agpib'  : serialSubdriver(serialDevice.configure_hp4263agpib, serialDevice.parse_hp4263agpib),
+    'hp53131agpib' : serialSubdriver(serialDevice.configure_hp53131agpib, serialDevice.parse_hp53131agpib),
+    'hpma'         : serialSubdriver(serialDevice.configure_hpma, serialDevice.parse_hpma),
+    'k3hb'         : serialSubdriver(serialDevice.configure_k3hb, serialDevice.parse_k3hb),
+    'lc-adc-f103c8': serialSubdriver(serialDevice.configure_lc_adc_f103c8, serialDevice.parse_lc_adc_f103c8),
+    'modbus'       : serialSubdriver(serialDevice.configure_modbus, serialDevice.parse_modbus),
+    'mx5060'       : serialSubdriver(serialDevice.configure_mx5060, serialDevice.parse_mx5060),
+    'ohaus7k'      : serialSubdriver(serialDevice.configure_ohaus7k, serialDevice.parse_ohaus7k),
+    'omega-ir-usb' : serialSubdriver(serialDevice.configure_omega_ir_usb, serialDevice.parse_omega_ir_usb),
+    'omega-iseries': serialSubdriver(serialDevice.configure_omega_iseries, serialDevice.parse_omega_iseries),
+    'omega-pt'     : serialSubdriver(serialDevice.configure_omega_pt, serialDevice.parse_omega_pt),
+    'omega-usbh'   : serialSubdriver(serialDevice.configure_omega_usbh, serialDevice.parse_omega_usbh),
+    'p6000a'       : serialSubdriver(serialDevice.configure_p6000a, serialDevice.parse_p6000a),
+    'pt200m'       : serialSubdriver(serialDevice.configure_pt200m, serialDevice.parse_pt200m),
+    'r5000'        : serialSubdriver(serialDevice.configure_r5000, serialDevice.parse_r5000),
+    'radwag-r'     : serialSubdriver(serialDevice.configure_radwag_r, serialDevice.parse_radwag_r),
+    'sd700'        : serialSubdriver(serialDevice.configure_sd700, serialDevice.parse_sd700),
+    'tc08rs232'    : serialSubdriver(serialDevice.configure_tc08rs232, serialDevice.parse_tc08rs232),
+    'tds220gpib'   : serialSubdriver(serialDevice.configure_tds220gpib, serialDevice.parse_tds220gpib),
+    'wtb'          : serialSubdriver(serialDevice.configure_wtb, serialDevice.parse_wtb)
+}
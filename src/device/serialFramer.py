@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Response framing for serial devices.
+
+    A framer assembles complete response frames from a stream of bytes as they are
+    read from a serial port, so a driver doesn't need fixed sleeps or byte counts to
+    know when a response is complete. Several frames can be extracted from one read.
+    Each serialDevice subdriver describes its frames with a framer spec:
+
+        framer(terminator=b'\r')                               # ASCII line
+        framer(start=b'\x02', terminator=b'\x03', trailer_length=1, checksum=bcc_xor)  # CompoWay/F
+        framer(length_field=(2,1,5), checksum=modbus_crc_ok)   # Modbus RTU register read
+        framer(length=8, start=b'\x40', checksum=sum8_ok)      # fixed length packets
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from . import modbusRTU
+import collections
+
+# Convert a delimiter given as str, bytes or int (ie ord('\r')) to bytes. None gives b''.
+def to_bytes(d):
+    if d is None: return b''
+    if isinstance(d, int): return bytes([d])
+    if isinstance(d, str): return d.encode('latin-1')
+    return bytes(d)
+
+# Checksum tests. Each takes a complete frame and returns True if its checksum is correct.
+
+# Omron CompoWay/F BCC: XOR of every byte after STX up to and including ETX, in the last byte.
+def bcc_xor(frame):
+    bcc = 0
+    for c in frame[1:-1]: bcc ^= c
+    return bcc == frame[-1]
+
+# Modbus RTU: CRC-16 of the frame, low byte first, in the last two bytes.
+modbus_crc_ok = modbusRTU.check_crc
+
+# 8-bit sum: all bytes of the frame, including the checksum, add up to zero (mod 256).
+def sum8_ok(frame):
+    return sum(frame) % 256 == 0
+
+
+class framer:
+    """ Assemble frames from a byte stream.
+
+        start          - bytes that begin a frame. Anything before them is discarded.
+        terminator     - bytes that end a frame, found after more than min_length bytes.
+        trailer_length - bytes after the terminator that belong to the frame (ie a checksum).
+        length         - fixed frame length, instead of a terminator.
+        length_field   - (offset, size, adjust): frame length is the big-endian unsigned integer
+                         of size bytes at offset, plus adjust.
+        checksum       - function(frame) returning True if the frame is valid.
+                         Invalid frames are dropped and counted in bad_frames.
+        max_length     - longest allowed frame. An unterminated buffer longer than this is discarded.
+
+        feed() bytes as they are read, and get() complete frames.
+    """
+
+    def __init__(self, terminator=None, start=None, length=None, length_field=None, trailer_length=0,\
+                 checksum=None, min_length=0, max_length=1024):
+        self.terminator = to_bytes(terminator)
+        self.start = to_bytes(start)
+        self.length = length
+        self.length_field = length_field
+        self.trailer_length = trailer_length
+        self.checksum = checksum
+        self.min_length = min_length
+        self.max_length = max_length
+        self.buffer = bytearray()
+        self.frames = collections.deque()
+        self.search_from = 0 # where to resume the terminator search
+        self.bad_frames = 0  # frames dropped for a bad checksum
+        self.discarded = 0   # bytes dropped outside any frame
+        return
+
+    # Add bytes from the port. Returns the number of complete frames waiting.
+    def feed(self, data):
+        self.buffer += data
+        while True:
+            frame = self.next_frame()
+            if frame is None: break
+            if (self.checksum is not None) and not self.checksum(frame):
+                self.bad_frames += 1
+                continue
+            self.frames.append(frame)
+        return len(self.frames)
+
+    # Return the oldest complete frame, or None.
+    def get(self):
+        if len(self.frames) == 0: return None
+        return self.frames.popleft()
+
+    # Drop complete frames that were never collected (ie late responses to an earlier request).
+    # Returns the number dropped.
+    def discard(self):
+        n = len(self.frames)
+        self.frames.clear()
+        return n
+
+    # Return and clear whatever is in the buffer that isn't a complete frame yet.
+    def flush(self):
+        partial = bytes(self.buffer)
+        self.buffer = bytearray()
+        self.search_from = 0
+        return partial
+
+    def reset(self):
+        self.flush()
+        self.frames.clear()
+        return
+
+    # Remove the first n bytes of the buffer as a frame.
+    def pop(self, n):
+        frame = bytes(self.buffer[:n])
+        del self.buffer[:n]
+        self.search_from = 0
+        return frame
+
+    # Cut the next complete frame from the buffer, or return None if there isn't one yet.
+    def next_frame(self):
+        buf = self.buffer
+
+        # Resynchronise on the start marker. A corrupt length field skips a byte and resynchronises
+        # again, looping (not recursing) so a long burst of line noise can't exhaust the stack.
+        while True:
+            if len(self.start) > 0:
+                i = buf.find(self.start)
+                if i < 0:
+                    n = max(0, len(buf)-len(self.start)+1) # keep what could be a partial start marker
+                    self.discarded += n
+                    del buf[:n]
+                    return None
+                if i > 0:
+                    self.discarded += i
+                    del buf[:i]
+                    self.search_from = 0
+
+            # Frames of known length
+            n = self.length
+            if (n is None) and (self.length_field is not None):
+                offset, size, adjust = self.length_field
+                if len(buf) < offset+size: return None
+                n = int.from_bytes(buf[offset:offset+size], 'big') + adjust
+            if n is None: break
+            if n > self.max_length:
+                # Corrupt length, skip a byte and resynchronise
+                if len(buf) == 0: return None
+                self.discarded += 1
+                del buf[:1]
+                continue
+            if len(buf) < n: return None
+            return self.pop(n)
+
+        # Terminated frames
+        if len(self.terminator) == 0: return None
+        i = buf.find(self.terminator, self.search_from)
+        while (i >= 0) and (i+len(self.terminator) <= self.min_length): i = buf.find(self.terminator, i+1)
+        if i < 0:
+            if len(buf) > self.max_length:
+                self.discarded += len(buf)
+                self.flush()
+            else: self.search_from = max(0, len(buf)-len(self.terminator)+1)
+            return None
+        n = i + len(self.terminator) + self.trailer_length
+        if len(buf) < n:
+            self.search_from = i # wait for the trailer
+            return None
+        return self.pop(n)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Process-wide inventory of serial ports.
+
+    Enumerating serial ports with pySerial's list_ports.comports() reads sysfs (or the
+    registry) for every port, which is slow with many USB-serial adapters. The inventory
+    is built on first use, indexed by USB VID:PID and location, and shared by every
+    driver that looks up its tty. It is only rebuilt when ports are added or removed:
+    on Linux and MacOS each lookup checks /dev and its tty nodes against what they were
+    when the inventory was built (one stat and one directory listing). Elsewhere, call
+    invalidate() after a hotplug.
+
+        port = serialPorts.find_port(params)   # params with 'vid', 'pid' and optionally 'bus', 'port_numbers'
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os, threading
+from termcolor import cprint
+
+try:
+    import serial
+    from serial.tools import list_ports
+except ImportError:
+    cprint( "Please install pySerial", 'red', attrs=['bold'])
+    raise
+
+DEV_DIR = '/dev'
+TTY_PREFIXES = ('tty', 'cu.', 'rfcomm')  # device nodes in DEV_DIR that can be serial ports
+
+
+class portRecord:
+    """ One serial port: its device name, USB VID and PID (None if not USB or unknown),
+        USB location string (ie '1-2.3:1.0', None if unknown) and hwid string.
+        full_path is False if the device name may need the tty prefix (ie 'ttyUSB0').
+    """
+
+    def __init__(self, device, vid=None, pid=None, location=None, hwid='', full_path=False):
+        self.device = device
+        self.vid = vid
+        self.pid = pid
+        self.location = location
+        self.hwid = hwid
+        self.full_path = full_path
+        return
+
+    def __repr__(self):
+        return '%s %s' % (self.device, self.hwid)
+
+    # Device name with tty_prefix prepended if it isn't there already.
+    def tty(self, tty_prefix='/dev/'):
+        if self.full_path or (tty_prefix in self.device): return self.device
+        return tty_prefix + self.device
+
+
+# Convert an entry from list_ports.comports() to a portRecord. Depending on the pySerial version
+# this is a ListPortInfo object, a tuple (name, description, hwid) with the VID:PID in the hwid string,
+# or an object with vid/pid attributes.
+def make_record(serialport):
+
+    # Not all versions of pyserial have the list_ports_common module!
+    if 'list_ports_common' in dir(serial.tools):
+        objtype=serial.tools.list_ports_common.ListPortInfo
+    else:
+        objtype=None
+
+    # if serialport returns a ListPortInfo object
+    if objtype is not None and isinstance(serialport,objtype):
+        return portRecord(serialport.device, serialport.vid, serialport.pid, serialport.location, serialport.hwid, full_path=True)
+
+    # if the returned device is a list, tuple or dictionary
+    elif len(serialport)>1:
+
+        # Some versions return a dictionary, some return a tuple with the VID:PID in the last string.
+        if 'VID:PID' in serialport[-1]: # tuple or list
+            # Sometimes serialport[-1] will contain "USB VID:PID=0x0000:0x0000" and
+            # sometimes extra data will follow after, i.e. "USB VID:PID=1234:5678 SERIAL=90ab".
+            vididx = serialport[-1].upper().index('PID')
+            if vididx <= 0: raise IndexError("Can't interpret USB VID:PID information!")
+            vidpid = serialport[-1][vididx+4:vididx+13] # take fixed set of chars after 'PID='
+            thevid,thepid = [ int(val,16) for val in vidpid.split(':')]
+            thename = serialport[0]
+            if thename is None: thename = serialport.device # MacOS
+            return portRecord(thename, thevid, thepid, getattr(serialport,'location',None), serialport[-1])
+
+        elif 'vid' in dir(serialport): # dictionary
+            thename = serialport.name
+            if thename is None: thename = serialport.device # MacOS
+            return portRecord(thename, serialport.vid, serialport.pid, getattr(serialport,'location',None),\
+                              str(getattr(serialport,'hwid','')))
+
+    # List or dict with only one entry, no VID:PID information.
+    return portRecord(serialport[0])
+
+# USB location string ('bus-port.port...') of the device that usbDevice found, or None.
+def usb_location(params):
+    if ('port_numbers' in params) and ('bus' in params):
+        return '%i-%s' % (params['bus'],'.'.join(['%i'% nn for nn in params['port_numbers']]))
+    return None
+
+# True if a port's USB location matches the bus and port_numbers that usbDevice found the device at.
+# If either location isn't known, we can't check, so assume the port is the right one.
+def location_match(record, params, quiet=True):
+    search_location = usb_location(params)
+    if (search_location is not None) and (record.location is not None):
+        if search_location == record.location:
+            if not quiet: cprint( '\tVID:PID match- location %s == %s' % (search_location, record.location) , 'green')
+            return True
+        elif ((':' not in search_location) and (':' in record.location)): # if '2-1' doesn't match '2-1:1.0' for example.
+            if search_location in record.location:
+                if not quiet: cprint( '\tVID:PID match- location %s == %s' % (search_location, record.location) , 'green')
+                return True
+        if not quiet: cprint( '\tVID:PID match but location %s does not match %s' % (search_location, record.location), 'yellow' )
+        return False
+    return True
+
+
+class portInventory:
+    """ The serial ports the OS can see, enumerated once and indexed by (vid, pid) and by USB location.
+        The index is rebuilt when signature() changes (a tty node was added or removed), or after invalidate().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = None
+        self.by_vidpid = {}
+        self.by_location = {}
+        self.built_signature = None
+        self.builds = 0 # times list_ports.comports() has been called
+        return
+
+    # Modification time of DEV_DIR and the tty nodes in it, which change when a port is plugged in or removed.
+    # None where there is no such directory (Windows), so only invalidate() rebuilds the inventory.
+    @staticmethod
+    def signature():
+        try:
+            return (os.stat(DEV_DIR).st_mtime_ns,) + tuple(sorted([ f for f in os.listdir(DEV_DIR) if f.startswith(TTY_PREFIXES) ]))
+        except OSError:
+            return None
+
+    def invalidate(self):
+        with self.lock: self.records = None
+        return
+
+    def build(self):
+        self.records = [ make_record(serialport) for serialport in list_ports.comports() ]
+        self.builds += 1
+        self.by_vidpid = {}
+        self.by_location = {}
+        for r in self.records:
+            if r.vid is not None: self.by_vidpid.setdefault((r.vid, r.pid), []).append(r)
+            if r.location is not None:
+                self.by_location[r.location] = r
+                # also by the USB path alone, without the interface (ie '1-2' for '1-2:1.0')
+                self.by_location.setdefault(r.location.split(':')[0], r)
+        return
+
+    # All the ports, rebuilding the inventory first if it is out of date.
+    def ports(self):
+        sig = self.signature()
+        with self.lock:
+            if (self.records is None) or (sig != self.built_signature):
+                self.build()
+                self.built_signature = sig
+            return list(self.records)
+
+    # Ports with the given USB VID and PID.
+    def find(self, vid, pid):
+        self.ports()
+        with self.lock: return list(self.by_vidpid.get((vid, pid), []))
+
+    # Port at a USB location, or None.
+    def at_location(self, location):
+        self.ports()
+        with self.lock: return self.by_location.get(location)
+
+
+INVENTORY = portInventory()
+
+def ports():
+    return INVENTORY.ports()
+
+def invalidate():
+    INVENTORY.invalidate()
+    return
+
+# Find the tty of the USB-serial device described by params (with 'vid' and 'pid', and 'bus' and
+# 'port_numbers' to tell apart several generic adapters with the same VID:PID).
+# If the OS only has one port and can't report VID:PID, that port is assumed to be the one.
+# Returns the device name with tty_prefix, or None if there is no match.
+def find_port(params, tty_prefix='/dev/', quiet=True):
+    candidates = INVENTORY.find(params['vid'], params['pid'])
+    location = usb_location(params)
+    if location is not None:
+        r = INVENTORY.at_location(location)
+        if (r is not None) and (r.vid == params['vid']) and (r.pid == params['pid']): candidates = [r]
+    matches = [ r for r in candidates if location_match(r, params, quiet) ]
+    if len(matches) == 0:
+        allports = ports()
+        if (len(allports) == 1) and (allports[0].vid is None): matches = allports
+    port = None
+    for r in matches:
+        if not quiet: print( '\t'+repr(r) )
+        port = r.tty(tty_prefix)
+        if os.path.exists(port): break
+    return port
+
+# Print the ports the OS can see, when a device couldn't be found.
+def report_ports(colour='red'):
+    allports = ports()
+    if len(allports) == 0: cprint( "\tno serial ports found", colour)
+    for r in allports: cprint( "\t%s" % repr(r), colour)
+    return
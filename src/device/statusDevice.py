@@ -39,6 +39,9 @@ except ImportError:
     cprint( "Please install pyUSB library", 'red', attrs=['bold'])
     raise
 
+# SEM1600B data packet: 2 byte header, then Raw, Input, Filtered Input, Process, PercentOutput, OutputSignal
+SEM1600B_VALUES = struct.Struct('<6f')
+
 ########################################################################################################################
 class statusDevice(device):
     """ Class providing support for STATUS Instruments DIN rail USB signal amplifiers.  (https://status.co.uk)
@@ -209,9 +212,7 @@ class statusDevice(device):
             if not self.quiet: print('\t',len(s),'bytes received')#:\n\t', repr(s))
  
             if (len(s)>=26):
-                nn=int((len(s)-2)/4)
-                data=struct.unpack('<%if' % nn,s[2:2+4*nn])            
-                self.lastValue = data[:6]
+                self.lastValue = SEM1600B_VALUES.unpack_from(s, 2)
                 #if not self.quiet: print('\t',data)
                 return
 
@@ -28,6 +28,7 @@
 
 from .device import device
 from .device import pyLabDataLoggerIOError
+from ..logger import hdf5Writer
 import numpy as np
 import datetime, time, subprocess, sys
 from termcolor import cprint
@@ -262,89 +263,92 @@ class thorcamDevice(device):
                 self.lastValue.append(color_image_16bit[...].reshape(self.params['height'], self.params['width'], 3))
                 
         # Set up live preview mode if requested
-        if self.live_preview:
-            cprint("\tlive_preview: displaying frame_%08i %s" % (self.frame_counter,livePreviewImg.shape), 'green')
-            try:
-                assert self.imshow
-                self.imshow.set_data(livePreviewImg)
-            except:
-                self.imshow = self.ax.imshow(livePreviewImg)
-
-            try:
-                self.ax.set_title("Frame %06i : %s" % (self.frame_counter,self.lastValueTimestamp))
-                self.fig.canvas.draw()
-                #plt.show(block=False)
-                plt.pause(0.01) # 10 ms for window to refresh itself.
-            except:
-                cprint( "\tError updating Thorlabs preview window", 'red', attrs=['bold'])
+        self.lastPreview = livePreviewImg # 8 bit copy of the first frame
+        if self.live_preview: self.preview()
 
         # Generate scaled values. Convert non-numerics to NaN
+        # Frames are only scaled on access, and not copied at all if scale=1 and offset=0.
         lastValueSanitized = []
         for v in self.lastValue: 
             if v is None: lastValueSanitized.append(np.nan)
             else: lastValueSanitized.append(v)
-        self.lastScaled = np.array(lastValueSanitized) * self.config['scale'] + self.config['offset']
+        self.lastScaled = self.scaledFrames(lastValueSanitized)
         self.updateTimestamp()
         return self.lastValue
 
+    # Show the first frame of sample (default: the last query) in the live preview window.
+    # sample can be a snapshot taken by multiThreadedLogger, drawn from the main thread.
+    def preview(self, sample=None):
+        if sample is None: sample = self
+        if (getattr(self,'fig',None) is None) or (getattr(sample,'lastPreview',None) is None): return
+        cprint("\tlive_preview: displaying frame_%08i %s" % (sample.frame_counter,sample.lastPreview.shape), 'green')
+        try:
+            assert self.imshow
+            self.imshow.set_data(sample.lastPreview)
+        except:
+            self.imshow = self.ax.imshow(sample.lastPreview)
+
+        try:
+            self.ax.set_title("Frame %06i : %s" % (sample.frame_counter,sample.lastValueTimestamp))
+            self.fig.canvas.draw()
+            #plt.show(block=False)
+            plt.pause(0.01) # 10 ms for window to refresh itself.
+        except:
+            cprint( "\tError updating Thorlabs preview window", 'red', attrs=['bold'])
+        return
+
 
     # log to HDF5 file - overload function
+    # filename can be a path or an open hdf5Writer session.
     def log_hdf5(self, filename, max_records=None):
-        try:
-            import h5py
-        except ImportError:
-            cprint( "Please install h5py", 'red', attrs=['bold'])
+        if not isinstance(filename, hdf5Writer.hdf5Writer):
+            with hdf5Writer.hdf5Writer(filename, max_records=max_records) as writer:
+                self.log_hdf5(writer)
             return
+        writer = filename
         
-        # Open file
-        with h5py.File(filename, 'a') as fh:
-
-            # Load group for this device.
-            if 'name' in self.config: devname = self.config['name']
-            elif 'name' in self.params: devname = self.params['name']
-            else: devname = self.name
-            if devname in fh: dg = fh[devname]
-            else:
-                dg = fh.create_group(devname)
-                # On creation, add attributes from config and params
-                for attr in self.params.keys():
-                    dg.attrs[attr] = repr(self.params[attr])
-                for attr in self.config.keys():
-                    dg.attrs[attr] = repr(self.config[attr])
-
-            # Create/update timestamp dataset
-            # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
-            if 'timestamp' in dg:
-                td = dg['timestamp']
-                td.resize([td.shape[0]+1,])
-                td[-1] = str(self.lastValueTimestamp)
-            else:
-                dg.create_dataset('timestamp',data=[str(self.lastValueTimestamp)],maxshape=(max_records,))
-
-
-            # Write images into dg...
-            for j in range(len(self.lastValue)):
-                dsname = 'frame_%08i' % (self.frame_counter-len(self.lastValue)+j+1)
-                if dsname in dg:
-                    cprint( "\tOverwriting image %s in HDF5 log file!" % dsname, 'yellow')
-                    del dg[dsname]
-                
-                # Flip colours in dataset - 21/5/20
-                # Swap to uint16, this might not work in HDFView but keep all the bits anyway! 17/9/20
-                dset=dg.create_dataset(dsname, data=np.flip(self.lastValue[j],axis=2), dtype='uint16', chunks=True,\
-                                        compression='gzip', compression_opts=1) # apply fast compression
-                
-                #Set the image attributes
-                dset.attrs.create('CLASS', 'IMAGE')
-                dset.attrs.create('IMAGE_VERSION', '1.2')
-                dset.attrs.create('IMAGE_SUBCLASS', 'IMAGE_TRUECOLOR')
-                dset.attrs.create('INTERLACE_MODE', 'INTERLACE_PIXEL')
-                #dset.attrs['IMAGE_COLORMODEL'] = 'RGB'
+        # Load group for this device.
+        dg = writer.device_group(self)
+
+        # Create/update timestamp dataset
+        # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
+        writer.append_timestamp(dg, self.lastValueTimestamp)
+
+        # Write images into dg...
+        for j in range(len(self.lastValue)):
+            frame_number = self.frame_counter-len(self.lastValue)+j+1
+
+            # Stacked mode: append to one (N, H, W, C) dataset
+            if writer.stack_frames:
+                if isinstance(self.lastValue[j], np.ndarray):
+                    writer.append_frame(dg, self.lastValue[j], self.lastValueTimestamp, frame_number, dtype='uint16',\
+                                        transform=lambda I: np.flip(I,axis=2))
+                else:
+                    cprint( "\tFrame %i of %s is not an image, not logged" % (frame_number, self.name), 'yellow')
+                continue
+
+            dsname = 'frame_%08i' % frame_number
+            if dsname in dg:
+                cprint( "\tOverwriting image %s in HDF5 log file!" % dsname, 'yellow')
+                del dg[dsname]
             
-            fh.close()
+            # Flip colours in dataset - 21/5/20
+            # Swap to uint16, this might not work in HDFView but keep all the bits anyway! 17/9/20
+            dset=dg.create_dataset(dsname, data=np.flip(self.lastValue[j],axis=2), dtype='uint16', chunks=True,\
+                                    compression='gzip', compression_opts=1) # apply fast compression
+            
+            #Set the image attributes
+            dset.attrs.create('CLASS', 'IMAGE')
+            dset.attrs.create('IMAGE_VERSION', '1.2')
+            dset.attrs.create('IMAGE_SUBCLASS', 'IMAGE_TRUECOLOR')
+            dset.attrs.create('INTERLACE_MODE', 'INTERLACE_PIXEL')
+            #dset.attrs['IMAGE_COLORMODEL'] = 'RGB'
+
+        writer.end_sample()
+        return
 
     # log to text file - overload function
-    def log_text(self, filename):
+    def log_text(self, filename, raw_only=False):
         # In "text" mode, perhaps just save a JPEG file?
         raise RuntimeError("Not implemented")
 
@@ -182,9 +182,6 @@ class usbtmcDevice(device):
         self.apply_config()
         return
 
-    def updateTimestamp(self):
-        self.lastValueTimestamp = datetime.datetime.now()
-
     # Re-establish connection to device.
     def reset(self):
         self.deactivate()
@@ -455,8 +452,10 @@ class usbtmcDevice(device):
         if not 'raw_units' in self.params.keys() or reset:
             self.configure_device()
 
-        # Read values        
+        # Read values, bracketing the transaction for the timestamp
+        self.acquisitionStart()
         self.get_values()
+        self.acquisitionEnd()
         
         # Generate scaled values. Convert non-numerics to NaN
         lastValueSanitized = []
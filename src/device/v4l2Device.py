@@ -33,6 +33,7 @@
 
 from .device import device
 from .device import pyLabDataLoggerIOError
+from ..logger import hdf5Writer
 import numpy as np
 import datetime, time
 
@@ -233,80 +234,86 @@ class v4l2Device(device):
         # currently only support 1 frame here. Need to update to split up multiple frames into list
         self.lastValue = [np.frombuffer(self.image_data, dtype=np.uint8).reshape(self.config['height'],\
                             self.config['width'],3)] # 8 bit colour
+        self.lastScaled = self.scaledFrames(self.lastValue)
         
         self.updateTimestamp()
         
-        if self.live_preview: # show one frame of set
-            try:
-                assert self.imshow
-                self.imshow.set_data(self.lastValue[-1])
-            except:
-                self.imshow = self.ax.imshow(self.lastValue[-1])
-
-            try:
-                self.ax.set_title("Frame %06i : %s" % (self.frame_counter,self.lastValueTimestamp))
-                self.fig.canvas.draw()
-                #plt.show(block=False)
-                plt.pause(0.01) # 10 ms for window to refresh itself.
-            except:
-                cprint( "\tError updating v4l2 device window", 'red', attrs=['bold'])
+        if self.live_preview: self.preview() # show one frame of set
         
         
         if reset: self.frame_counter=0
         else: self.frame_counter += self.config['n_frames']
         
         return self.lastValue
+
+    # Show the last frame of sample (default: the last query) in the live preview window.
+    # sample can be a snapshot taken by multiThreadedLogger, drawn from the main thread.
+    def preview(self, sample=None):
+        if sample is None: sample = self
+        if getattr(self,'fig',None) is None: return
+        try:
+            assert self.imshow
+            self.imshow.set_data(sample.lastValue[-1])
+        except:
+            self.imshow = self.ax.imshow(sample.lastValue[-1])
+
+        try:
+            self.ax.set_title("Frame %06i : %s" % (sample.frame_counter,sample.lastValueTimestamp))
+            self.fig.canvas.draw()
+            #plt.show(block=False)
+            plt.pause(0.01) # 10 ms for window to refresh itself.
+        except:
+            cprint( "\tError updating v4l2 device window", 'red', attrs=['bold'])
+        return
     
     
     # log to HDF5 file - overload function
+    # filename can be a path or an open hdf5Writer session.
     def log_hdf5(self, filename, max_records=None):
-        assert(h5py)
+        if not isinstance(filename, hdf5Writer.hdf5Writer):
+            with hdf5Writer.hdf5Writer(filename, max_records=max_records) as writer:
+                self.log_hdf5(writer)
+            return
+        writer = filename
         
-        # Open file
-        with h5py.File(filename, 'a') as fh:
+        # Load group for this device.
+        dg = writer.device_group(self)
 
-            # Load group for this device.
-            if 'name' in self.config: devname = self.config['name']
-            elif 'name' in self.params: devname = self.params['name']
-            else: devname = self.name
-            if devname in fh: dg = fh[devname]
-            else:
-                dg = fh.create_group(devname)
-                # On creation, add attributes from config and params
-                for attr in self.params.keys():
-                    dg.attrs[attr] = repr(self.params[attr])
-                for attr in self.config.keys():
-                    dg.attrs[attr] = repr(self.config[attr])
+        # Create/update timestamp dataset
+        # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
+        writer.append_timestamp(dg, self.lastValueTimestamp)
 
-            # Create/update timestamp dataset
-            # Each device has a lastValueTimestamp which can vary a bit between devices due to latency issues.
-            if 'timestamp' in dg:
-                td = dg['timestamp']
-                td.resize([td.shape[0]+1,])
-                td[-1] = str(self.lastValueTimestamp)
-            else:
-                dg.create_dataset('timestamp',data=[str(self.lastValueTimestamp)],maxshape=(max_records,))
+        # Write frames
+        for j in range(len(self.lastValue)):
+            frame_number = self.frame_counter-len(self.lastValue)+j+1
 
-            # Write frames
-            for j in range(len(self.lastValue)):
-                dsname = 'frame_%08i' % (self.frame_counter-len(self.lastValue)+j+1)
-                if dsname in dg:             
-                    if not self.quiet: cprint( "\tOverwriting image %s in HDF5 log file!" % dsname, 'yellow' )
-                    del dg[dsname]
-                dset=dg.create_dataset(dsname, data=np.fliplr(np.flipud(self.lastValue[j])), dtype='uint8', chunks=True,\
-                                        compression='gzip', compression_opts=1) # apply fast compression
-                
-                #Set the image attributes
-                dset.attrs.create('CLASS', 'IMAGE')
-                dset.attrs.create('IMAGE_VERSION', '1.2')
-                dset.attrs.create('IMAGE_SUBCLASS', 'IMAGE_TRUECOLOR')
-                dset.attrs.create('INTERLACE_MODE', 'INTERLACE_PIXEL')
-                #dset.attrs['IMAGE_COLORMODEL'] = 'RGB'
+            # Stacked mode: append to one (N, H, W, C) dataset
+            if writer.stack_frames:
+                if isinstance(self.lastValue[j], np.ndarray):
+                    writer.append_frame(dg, self.lastValue[j], self.lastValueTimestamp, frame_number, dtype='uint8',\
+                                        transform=lambda I: np.fliplr(np.flipud(I)))
+                else:
+                    cprint( "\tFrame %i of %s is not an image, not logged" % (frame_number, self.name), 'yellow')
+                continue
 
+            dsname = 'frame_%08i' % frame_number
+            if dsname in dg:             
+                if not self.quiet: cprint( "\tOverwriting image %s in HDF5 log file!" % dsname, 'yellow' )
+                del dg[dsname]
+            dset=dg.create_dataset(dsname, data=np.fliplr(np.flipud(self.lastValue[j])), dtype='uint8', chunks=True,\
+                                    compression='gzip', compression_opts=1) # apply fast compression
             
-            fh.close()
+            #Set the image attributes
+            dset.attrs.create('CLASS', 'IMAGE')
+            dset.attrs.create('IMAGE_VERSION', '1.2')
+            dset.attrs.create('IMAGE_SUBCLASS', 'IMAGE_TRUECOLOR')
+            dset.attrs.create('INTERLACE_MODE', 'INTERLACE_PIXEL')
+            #dset.attrs['IMAGE_COLORMODEL'] = 'RGB'
+
+        writer.end_sample()
+        return
 
     # log to text file - overload function
-    def log_text(self, filename):
+    def log_text(self, filename, raw_only=False):
         # In "text" mode, perhaps just save a JPEG file?
         raise RuntimeError("Not implemented")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Helper functions for reading pyLabDataLogger HDF5 log files.
+
+    Usage:
+        H = h5py.File('logfile.hdf5','r')
+        dg = H['device name']
+        sl = hdf5Reader.find_time_window(dg, t_start, t_end)
+        t = hdf5Reader.read_timestamps(dg, sl)
+        v = dg['channel name/Raw values'][..., sl]
+        s = hdf5Reader.read_scaled(dg['channel name'], sl)
+
+    To follow a file while it is being logged with hdf5Writer(swmr=True),
+    use hdf5Follower.
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import datetime, time, ast
+from .hdf5Writer import epoch_ns, TIMESTAMP_FORMAT
+
+try:
+    import h5py
+except ImportError:
+    pass # hdf5Writer has already warned about this
+
+# Parse a string timestamp from an older file. Most devices used TIMESTAMP_FORMAT,
+# video devices used str(datetime).
+def parse_timestamp(s):
+    if isinstance(s,bytes): s = s.decode('ascii')
+    try:
+        return datetime.datetime.strptime(s, TIMESTAMP_FORMAT)
+    except ValueError:
+        return datetime.datetime.fromisoformat(s)
+
+# Read timestamps of a device group as numpy datetime64[ns] (UTC).
+# Handles both numeric timestamps and the string timestamps of older files.
+def read_timestamps(dg, sl=slice(None)):
+    ts = dg['timestamp'][sl]
+    if ts.dtype.kind in 'SOU':
+        ts = [ epoch_ns(parse_timestamp(s)) for s in ts ]
+    return np.asarray(ts, dtype=np.int64).astype('datetime64[ns]')
+
+# Index of the sample axis of a dataset: the first axis for stacked video frames (hdf5Writer
+# gives them a 'layout' attribute starting with 'frame'), otherwise the last axis.
+def sample_axis(dset):
+    layout = dset.attrs.get('layout', '')
+    if isinstance(layout, bytes): layout = layout.decode('ascii')
+    if str(layout).startswith('frame'): return 0
+    return -1
+
+# Return a slice along the sample axis covering times t_start <= t <= t_end.
+# Times can be datetimes or ns since the epoch. If the group has a timestamp_index,
+# only the blocks overlapping the window are read from the timestamp dataset.
+# Assumes timestamps increase monotonically.
+def find_time_window(dg, t_start, t_end):
+    t0 = epoch_ns(t_start)
+    t1 = epoch_ns(t_end)
+    td = dg['timestamp']
+    n = td.shape[sample_axis(td)]
+    if td.dtype.kind in 'SOU':
+        raise TypeError("%s has string timestamps, use read_timestamps() instead" % dg.name)
+
+    if 'timestamp_index' in dg:
+        idx = dg['timestamp_index'][...]
+        b0 = np.searchsorted(idx[2], t0, side='left')  # first block ending at or after t0
+        b1 = np.searchsorted(idx[1], t1, side='right') # blocks starting at or before t1
+        if b0 >= b1: return slice(0,0)
+        i0 = int(idx[0][b0])
+        if b1 < idx.shape[1]: i1 = int(idx[0][b1])
+        else: i1 = n
+    else:
+        i0 = 0
+        i1 = n
+
+    ts = td[i0:i1]
+    return slice(i0 + int(np.searchsorted(ts, t0, side='left')), i0 + int(np.searchsorted(ts, t1, side='right')))
+
+# Read a device group attribute stored with repr() and turn it into a python object.
+def read_attr_array(b):
+    if isinstance(b, bytes): b = b.decode('utf-8')
+    return ast.literal_eval(b.replace('array(','(').replace('nan','None'))
+
+# Return (scale, offset) for channel group cg. Taken from the channel group's attributes,
+# or from the device group's scale, offset and channel_names attributes in older files.
+def channel_calibration(cg):
+    if ('scale' in cg.attrs) and ('offset' in cg.attrs):
+        return np.asarray(cg.attrs['scale']), np.asarray(cg.attrs['offset'])
+    dg = cg.parent
+    names = read_attr_array(dg.attrs['channel_names'])
+    chname = cg.name.split('/')[-1]
+    if (chname == 'time_stamp') and not (chname in names): chname = 'timestamp'
+    i = names.index(chname)
+    scale = read_attr_array(dg.attrs['scale'])[i]
+    offset = read_attr_array(dg.attrs['offset'])[i]
+    return np.asarray(scale, dtype=float), np.asarray(offset, dtype=float)
+
+# Read the scaled values of channel group cg along slice sl of the sample axis.
+# Files logged with hdf5Writer(raw_only=True) have no 'Scaled values' dataset,
+# so scaled values are computed from the raw values and the channel calibration.
+def read_scaled(cg, sl=slice(None)):
+    if 'Scaled values' in cg: return cg['Scaled values'][..., sl]
+    raw = cg['Raw values'][..., sl]
+    if not raw.dtype.kind in 'biuf': return raw # non-numeric channels have nothing to scale
+    scale, offset = channel_calibration(cg)
+    # Per-element calibrations of vector channels apply along the first axis
+    if scale.ndim > 0: scale = scale.reshape(scale.shape + (1,))
+    if offset.ndim > 0: offset = offset.reshape(offset.shape + (1,))
+    return raw*scale + offset
+
+
+class hdf5Follower:
+    """ Follow a log file that is being written in SWMR mode (hdf5Writer(swmr=True))
+        and return only the samples added since the last poll, without copying the file.
+
+        Usage:
+            paths = ['/device name/timestamp', '/device name/channel name/Raw values']
+            f = hdf5Reader.hdf5Follower('logfile.hdf5', paths)
+            for new in f.follow():
+                for path, data in new.items(): ...   # data has the new samples on its last axis,
+                                                     # or first axis for stacked frames (see sample_axis)
+    """
+
+    def __init__(self, filename, paths=None, poll_interval=1.0):
+        self.filename = filename
+        self.poll_interval = poll_interval
+        self.fh = h5py.File(filename, 'r', libver='latest', swmr=True)
+
+        # Default to every dataset in the file
+        if paths is None:
+            paths = []
+            def visitor(name, obj):
+                if isinstance(obj, h5py.Dataset): paths.append('/'+name)
+            self.fh.visititems(visitor)
+        self.paths = list(paths)
+        self.position = dict([ (p,0) for p in self.paths ]) # samples already returned, by path
+        return
+
+    # Return a dict of {path: new samples} for datasets that grew since the last poll.
+    def poll(self):
+        new = {}
+        for p in self.paths:
+            if not p in self.fh: continue
+            dset = self.fh[p]
+            dset.refresh()
+            axis = sample_axis(dset)
+            n = dset.shape[axis]
+            if n > self.position[p]:
+                if axis == 0: new[p] = dset[self.position[p]:n]
+                else: new[p] = dset[..., self.position[p]:n]
+                self.position[p] = n
+        return new
+
+    # Generator that polls every poll_interval seconds and yields new samples as they arrive.
+    def follow(self):
+        while self.fh is not None:
+            new = self.poll()
+            if len(new) > 0: yield new
+            else: time.sleep(self.poll_interval)
+        return
+
+    def close(self):
+        if self.fh is not None: self.fh.close()
+        self.fh = None
+        return
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Persistent HDF5 log file writer shared by all devices.
+
+    Keeps the HDF5 file, device groups and dataset handles open for the
+    whole run instead of reopening the file for every device on every
+    sample. Data is flushed to disk every flush_interval seconds or
+    every flush_samples samples, whichever comes first.
+
+    Samples are staged in memory per dataset and written buffer_samples
+    at a time, so each dataset is resized and written once per block.
+    The periodic flushes only push written blocks to disk; partly filled
+    blocks are written every drain_interval seconds, when SWMR mode
+    starts, and when the file is closed.
+    Datasets have no size limit unless max_records is set. Chunk sizes are
+    worked out from the dtype and length of each sample and the expected
+    logging rate, aiming for about CHUNK_SECONDS of data per chunk within
+    MIN_CHUNK_BYTES and MAX_CHUNK_BYTES, in whole staging blocks.
+
+    Timestamps are stored as int64 nanoseconds since the Unix epoch in
+    each device's 'timestamp' dataset. The old string form can be added
+    as 'timestamp_string' with string_timestamps=True. Every written block
+    of timestamps adds a column to 'timestamp_index' holding the first
+    sample index, first time and last time of the block, so readers can
+    find a time window without loading the whole timestamp column
+    (see pyLabDataLogger.logger.hdf5Reader).
+
+    With raw_only=True devices write only their raw values. Each channel
+    group carries its scale, offset and eng_units as attributes, and
+    hdf5Reader.read_scaled() computes scaled values when they are read.
+    The calibration of a raw_only channel can't change once it has been
+    logged, since the earlier samples would then be read with it too.
+
+    With stack_frames=True video devices append frames to one 'frames'
+    dataset shaped (N, H, W, C), chunked one frame per chunk, with matching
+    'frame_timestamp' and 'frame_number' datasets, instead of creating a
+    new 'frame_%08i' dataset for every frame. With compression_workers > 0,
+    frames are flipped and compressed by a pool of threads and written with
+    HDF5 direct chunk writes, so the capture loop doesn't wait for gzip.
+
+    With swmr=True the file is written in HDF5 single-writer/multiple-reader
+    mode so other processes can read it during the run (see
+    hdf5Reader.hdf5Follower). The devices that will be logged are registered
+    with swmr_devices=[...] or expect_devices(), and SWMR mode starts at the
+    first flush after every one of them has been logged at least once.
+    Without them, SWMR mode starts only when start_swmr() is called.
+    No new datasets can be added after that, so video devices must use
+    stacked frames and every device must log before SWMR starts.
+
+    Usage:
+        writer = hdf5Writer.hdf5Writer('logfile.hdf5')
+        while True:
+            for d in devices:
+                d.query()
+                d.log(writer)
+        writer.close()
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import datetime, time, zlib, collections
+from concurrent.futures import ThreadPoolExecutor
+from termcolor import cprint
+
+# Chunk sizing. Aim for chunks holding CHUNK_SECONDS of logging, within these sizes in bytes.
+CHUNK_SECONDS = 60.
+MIN_CHUNK_BYTES = 16*1024
+MAX_CHUNK_BYTES = 1024*1024
+
+# gzip level for video frames
+FRAME_COMPRESSION_LEVEL = 1
+
+# Timestamp formats
+TIMESTAMP_FORMAT = "%d-%b-%Y (%H:%M:%S.%f)"
+TIMESTAMP_UNITS = "ns since 1970-01-01 00:00:00 UTC"
+
+try:
+    import h5py
+except ImportError:
+    cprint( "Install h5py library to enable HDF5 logging support.", 'red', attrs=['bold'])
+
+
+# Convert a datetime (or a number already in ns) to integer nanoseconds since the Unix epoch.
+# Naive datetimes are taken to be local time, as returned by datetime.datetime.now().
+def epoch_ns(t):
+    if isinstance(t, datetime.datetime):
+        return int(t.replace(microsecond=0).timestamp())*1000000000 + t.microsecond*1000
+    return int(t)
+
+# Prepare one video frame for a direct chunk write: apply transform, convert to dtype and
+# deflate it the same way as the HDF5 gzip filter. Runs in the compression thread pool
+# (zlib releases the GIL, so several frames are compressed at once).
+def compress_frame(frame, dtype, transform=None):
+    if transform is not None: frame = transform(frame)
+    frame = np.ascontiguousarray(frame, dtype=dtype)
+    return zlib.compress(frame.tobytes(), FRAME_COMPRESSION_LEVEL)
+
+
+class hdf5Writer:
+    """ Long-lived HDF5 writer session.
+        One instance is shared by all devices logging to the same file.
+        Devices call device_group() to get their group and append() to
+        add one sample to a dataset, then end_sample() once per sample.
+        Appended samples are held in a staging buffer until buffer_samples
+        have accumulated, drain_interval has passed, or the writer is flushed.
+    """
+
+    def __init__(self, filename, flush_interval=5.0, flush_samples=100, max_records=None, buffer_samples=64,\
+                 sample_rate=1.0, string_timestamps=False, raw_only=False, stack_frames=False, compression_workers=0,\
+                 swmr=False, swmr_devices=None, drain_interval=60.0, quiet=True):
+        try:
+            assert(h5py)
+        except (AssertionError, NameError):
+            raise ImportError("Install h5py library to enable HDF5 logging support.")
+
+        self.filename = filename
+        self.flush_interval = flush_interval # seconds between flushes (None to disable)
+        self.flush_samples = flush_samples   # samples between flushes (None to disable)
+        self.drain_interval = drain_interval # seconds between writing partly filled staging buffers (None to disable)
+        self.max_records = max_records       # largest size a dataset can grow to (None for unlimited)
+        self.buffer_samples = max(1,int(buffer_samples)) # samples staged per dataset before writing
+        self.sample_rate = sample_rate # expected logging rate in Hz, for devices that don't give one
+        self.string_timestamps = string_timestamps # also write 'timestamp_string' datasets
+        self.raw_only = raw_only # devices skip scaled values, they are derived from the calibration on reading
+        self.stack_frames = stack_frames # video frames go in one (N, H, W, C) dataset per device
+        self.compression_workers = compression_workers # threads compressing stacked frames (0 to compress inline)
+        self.frame_pool = None # thread pool, started with the first frame
+        self.pending_frames = collections.deque() # frames being compressed, in the order they were captured
+        self.swmr = swmr    # switch to single-writer/multiple-reader mode once all devices are set up
+        self.swmr_devices = None # names of the devices that must log before SWMR mode starts by itself
+        self.quiet = quiet
+        self.groups = {}    # device group handles, by device name
+        self.datasets = {}  # dataset handles, by full HDF5 path
+        self.buffers = {}   # staged samples not yet written, by full HDF5 path
+        self.targets = {}   # (group, dataset name, units, sample rate) for each staged dataset, by full HDF5 path
+        self.time_indexed = set()  # paths of timestamp datasets that get a time index
+        self.legacy_timestamps = {} # True for device groups that already hold string timestamps
+        self.samples_logged = {} # number of samples logged for each device, by device name
+        self.calibrations = {} # calibration attributes of each channel group, by full HDF5 path
+        self.samples_since_flush = 0
+        self.last_flush = time.time()
+        self.last_drain = time.time()
+        if swmr: self.fh = h5py.File(filename, 'a', libver='latest')
+        else: self.fh = h5py.File(filename, 'a')
+        if swmr_devices is not None: self.expect_devices(swmr_devices)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    # Check if the file is still open
+    def isOpen(self):
+        return self.fh is not None
+
+    # Name of a device's group in the file.
+    @staticmethod
+    def device_name(dev):
+        if 'name' in dev.config: return dev.config['name']
+        elif 'name' in dev.params: return dev.params['name']
+        return dev.name
+
+    # Register the devices (device objects or group names) that will be logged. With swmr=True,
+    # SWMR mode starts at the first flush after each of them has logged a sample.
+    def expect_devices(self, devices):
+        if self.swmr_devices is None: self.swmr_devices = set()
+        for dev in devices:
+            if isinstance(dev, str): self.swmr_devices.add(dev)
+            else: self.swmr_devices.add(self.device_name(dev))
+        return
+
+    # True when every device registered with expect_devices() has logged at least once.
+    def all_devices_logged(self):
+        if self.swmr_devices is None: return False
+        return all([ self.samples_logged.get(n,0) > 0 for n in self.swmr_devices ])
+
+    # Get the HDF5 group for a device, creating it if required.
+    # On creation, add attributes from config and params.
+    # count_sample=False looks up the group without counting a logged sample.
+    def device_group(self, dev, count_sample=True):
+        devname = self.device_name(dev)
+
+        if count_sample: self.samples_logged[devname] = self.samples_logged.get(devname,0) + 1
+        if devname in self.groups: return self.groups[devname]
+
+        if devname in self.fh: dg = self.fh[devname]
+        else:
+            self.check_can_create(devname)
+            dg = self.fh.create_group(devname)
+            for attr in dev.params.keys():
+                dg.attrs[attr] = repr(dev.params[attr])
+            for attr in dev.config.keys():
+                dg.attrs[attr] = repr(dev.config[attr])
+
+        self.groups[devname] = dg
+        return dg
+
+    # Get a subgroup (ie channel group) inside a device group, creating it if required.
+    # attrs are set the first time the subgroup is used in this session, if not already present.
+    def subgroup(self, dg, name, attrs={}):
+        path = dg.name + '/' + name
+        if path in self.groups: return self.groups[path]
+        if name in dg: g = dg[name]
+        else:
+            self.check_can_create(path)
+            g = dg.create_group(name)
+        for attr in attrs.keys():
+            if (attrs[attr] is not None) and not (attr in g.attrs): g.attrs[attr] = attrs[attr]
+        self.groups[path] = g
+        return g
+
+    # Get a channel group inside a device group, with its calibration (ie scale, offset and eng_units)
+    # as attributes. If the calibration changes during the session (ie after apply_config) the attributes
+    # are rewritten. In a raw_only file that is refused with ValueError once the channel has raw values,
+    # because read_scaled() would apply the new calibration to the samples already logged.
+    def channel_group(self, dg, name, calibration={}):
+        g = self.subgroup(dg, name, attrs=calibration)
+        path = g.name
+        if not path in self.calibrations:
+            self.calibrations[path] = dict([ (k, g.attrs[k]) for k in calibration.keys() if k in g.attrs ])
+        current = self.calibrations[path]
+        changed = [ k for k in calibration.keys() if (calibration[k] is not None) and\
+                    ((not k in current) or not np.array_equal(current[k], calibration[k])) ]
+        if len(changed) == 0: return g
+
+        if self.raw_only and ((path + '/Raw values' in self.targets) or ('Raw values' in g)) and\
+           any([ k in current for k in changed ]):
+            raise ValueError("Calibration of %s changed (%s) after raw values were logged with raw_only=True" %\
+                             (path, ', '.join(changed)))
+        if self.fh.swmr_mode:
+            # Attributes can't be written in SWMR mode. The scaled values are still logged with the new calibration.
+            cprint("Calibration of %s changed (%s) in SWMR mode, attributes not updated" % (path, ', '.join(changed)), 'yellow')
+        else:
+            for k in changed: g.attrs[k] = calibration[k]
+        for k in changed: current[k] = calibration[k]
+        return g
+
+    # Write small fixed-size diagnostics (ie counters and histograms) to a subgroup of g,
+    # replacing their previous values. Datasets are created on the first call, so with
+    # swmr=True this has to happen before SWMR mode starts; later calls only overwrite.
+    def write_diagnostics(self, g, name, values, attrs={}):
+        sg = self.subgroup(g, name, attrs=attrs)
+        for key in values.keys():
+            value = np.asarray(values[key])
+            if (key in sg) and (sg[key].shape == value.shape):
+                sg[key][...] = value
+            else:
+                self.check_can_create(sg.name + '/' + key)
+                if key in sg: del sg[key]
+                sg.create_dataset(key, data=value)
+        return
+
+    # Append one sample to a dataset in group g. The last axis of the dataset is the sample
+    # index, so vector values are stored as (len, n_samples).
+    # The sample is staged and written to the file with the rest of its block.
+    # sample_rate is the expected logging rate in Hz, used to size chunks.
+    def append(self, g, name, value, units=None, sample_rate=None):
+
+        # h5py doesn't like unicode strings and nonetypes
+        if isinstance(value, str): value = value.encode('ascii')
+        if value is None: value = "None".encode('ascii')
+
+        path = g.name + '/' + name
+        if not path in self.buffers:
+            self.buffers[path] = []
+            self.targets[path] = (g, name, units, sample_rate)
+        buf = self.buffers[path]
+        buf.append(value)
+        if len(buf) >= self.buffer_samples: self.write_buffer(path)
+        return
+
+    # Append a sample time to the timestamp dataset of device group g.
+    # Files started with string timestamps by older versions keep getting strings.
+    def append_timestamp(self, g, timestamp, sample_rate=None):
+        if not g.name in self.legacy_timestamps:
+            self.legacy_timestamps[g.name] = ('timestamp' in g) and (g['timestamp'].dtype.kind in 'SOU')
+        if self.legacy_timestamps[g.name]:
+            self.append(g, 'timestamp', timestamp.strftime(TIMESTAMP_FORMAT), sample_rate=sample_rate)
+            return
+
+        self.append(g, 'timestamp', np.int64(epoch_ns(timestamp)), units=TIMESTAMP_UNITS, sample_rate=sample_rate)
+        self.time_indexed.add(g.name + '/timestamp')
+        if self.string_timestamps:
+            self.append(g, 'timestamp_string', timestamp.strftime(TIMESTAMP_FORMAT), sample_rate=sample_rate)
+        return
+
+    # Append one video frame to the stacked 'frames' dataset of device group g,
+    # with its time and frame number. transform (ie a colour flip) is applied before
+    # the frame is stored. Without compression workers the frame is transformed and
+    # written straight away as one gzip-compressed chunk. Otherwise it is queued for
+    # the thread pool and written, in order, once it has been compressed.
+    # Greyscale (2-D) frames are stored with a single colour channel.
+    def append_frame(self, g, frame, timestamp, frame_number, dtype='uint8', transform=None):
+        frame = np.asarray(frame)
+        if frame.ndim == 2: frame = frame[:,:,np.newaxis]
+        elif frame.ndim != 3:
+            raise ValueError("Can't stack a %i-D frame in %s/frames" % (frame.ndim, g.name))
+        path = g.name + '/frames'
+        if path in self.datasets: dset = self.datasets[path]
+        elif 'frames' in g: dset = self.datasets[path] = g['frames']
+        else:
+            self.check_can_create(path)
+            dset = g.create_dataset('frames', shape=(0,)+frame.shape, maxshape=(None,)+frame.shape, dtype=dtype,\
+                                    chunks=(1,)+frame.shape, compression='gzip', compression_opts=FRAME_COMPRESSION_LEVEL)
+            dset.attrs['layout'] = 'frame, row, column, colour'
+            self.datasets[path] = dset
+
+        if frame.shape != dset.shape[1:]:
+            raise ValueError("Frame size %s doesn't match %s %s" % (str(frame.shape), path, str(dset.shape[1:])))
+
+        if self.compression_workers > 0:
+            if self.frame_pool is None: self.frame_pool = ThreadPoolExecutor(max_workers=self.compression_workers)
+            job = self.frame_pool.submit(compress_frame, frame, dset.dtype, transform)
+            self.pending_frames.append((g, dset, job, timestamp, frame_number))
+            # Write whatever is finished. If too many frames are waiting, wait for the oldest.
+            self.write_frames(block = len(self.pending_frames) > 4*self.compression_workers)
+            return
+
+        if transform is not None: frame = transform(frame)
+        n = dset.shape[0]
+        dset.resize((n+1,)+dset.shape[1:])
+        dset[n] = np.asarray(frame, dtype=dset.dtype)
+        self.append_frame_time(g, timestamp, frame_number)
+        return
+
+    # Write compressed frames from the thread pool to their datasets, oldest first,
+    # stopping at the first one still being compressed. If block, wait for the oldest
+    # frame; if wait_all, wait for every queued frame.
+    def write_frames(self, block=False, wait_all=False):
+        while len(self.pending_frames) > 0:
+            g, dset, job, timestamp, frame_number = self.pending_frames[0]
+            if not (job.done() or block or wait_all): break
+            data = job.result()
+            self.pending_frames.popleft()
+            n = dset.shape[0]
+            dset.resize((n+1,)+dset.shape[1:])
+            dset.id.write_direct_chunk((n,)+(0,)*(len(dset.shape)-1), data)
+            self.append_frame_time(g, timestamp, frame_number)
+            block = False
+        return
+
+    # Stage the time and number of a stored frame.
+    def append_frame_time(self, g, timestamp, frame_number):
+        self.append(g, 'frame_timestamp', np.int64(epoch_ns(timestamp)), units=TIMESTAMP_UNITS)
+        self.append(g, 'frame_number', np.int64(frame_number))
+        return
+
+    # Pick a chunk shape for samples shaped like value, logged at sample_rate Hz.
+    # The whole sample goes in each chunk, and the length along the sample axis
+    # covers about CHUNK_SECONDS, kept between MIN_CHUNK_BYTES and MAX_CHUNK_BYTES
+    # and rounded down to whole staging blocks where possible.
+    def chunk_shape(self, value, sample_rate=None):
+        value = np.asarray(value)
+        if sample_rate is None: sample_rate = self.sample_rate
+        sample_shape = [ max(1,n) for n in value.shape ]
+        sample_bytes = max(1, int(np.prod(sample_shape))*value.dtype.itemsize)
+        n = sample_rate*CHUNK_SECONDS
+        n = max(n, MIN_CHUNK_BYTES/sample_bytes)
+        n = min(n, MAX_CHUNK_BYTES/sample_bytes)
+        if n >= self.buffer_samples: n = (n//self.buffer_samples)*self.buffer_samples
+        n = max(1, int(n))
+        if self.max_records is not None: n = min(n, self.max_records)
+        return tuple(sample_shape + [n])
+
+    # Write all staged samples for one dataset in a single resize and write.
+    def write_buffer(self, path):
+        buf = self.buffers.get(path)
+        if not buf: return
+        block = np.stack([ np.asarray(v) for v in buf ], axis=-1)
+        g, name, units, sample_rate = self.targets[path]
+
+        if path in self.datasets: dset = self.datasets[path]
+        elif name in g: dset = self.datasets[path] = g[name]
+        else: dset = None
+
+        if dset is None: # Make new array
+            self.check_can_create(path)
+            n0 = 0
+            ms = list(block.shape[:-1])
+            ms.append(self.max_records)
+            dset = g.create_dataset(name, data=block, maxshape=ms, chunks=self.chunk_shape(buf[0], sample_rate))
+            if units is not None: dset.attrs['units'] = units
+            self.datasets[path] = dset
+        else: # Add more
+            ds = list(dset.shape)
+            n0 = ds[-1]
+            ds[-1] += block.shape[-1]
+            dset.resize(ds)
+            dset[..., n0:ds[-1]] = block
+        self.buffers[path] = []
+
+        if path in self.time_indexed: self.write_time_index(g, n0, block)
+        return
+
+    # Add one column (first sample index, first time, last time) to the time index
+    # of group g for a block of timestamps that starts at sample n0.
+    def write_time_index(self, g, n0, block):
+        row = np.array([n0, block[0], block[-1]], dtype=np.int64).reshape((3,1))
+        path = g.name + '/timestamp_index'
+        if path in self.datasets: dset = self.datasets[path]
+        elif 'timestamp_index' in g: dset = self.datasets[path] = g['timestamp_index']
+        else:
+            self.check_can_create(path)
+            dset = g.create_dataset('timestamp_index', data=row, maxshape=(3,None), chunks=(3,256))
+            dset.attrs['rows'] = 'first sample index, first timestamp, last timestamp'
+            dset.attrs['units'] = TIMESTAMP_UNITS
+            self.datasets[path] = dset
+            return
+        n = dset.shape[1]
+        dset.resize((3,n+1))
+        dset[:,n] = row[:,0]
+        return
+
+    # Call once per logged device sample; flushes when interval or sample count is reached.
+    # Partly filled staging buffers are only written once drain_interval has passed, so
+    # datasets are still written in whole blocks when many devices share the file.
+    def end_sample(self):
+        self.samples_since_flush += 1
+        drain = (self.drain_interval is not None) and (time.time()-self.last_drain >= self.drain_interval)
+        if (self.flush_samples is not None) and (self.samples_since_flush >= self.flush_samples):
+            self.flush(drain=drain)
+        elif (self.flush_interval is not None) and (time.time()-self.last_flush >= self.flush_interval):
+            self.flush(drain=drain)
+        return
+
+    # Switch the file to single-writer/multiple-reader mode now.
+    # Staged samples are written first so that all their datasets exist.
+    def start_swmr(self):
+        if self.fh.swmr_mode: return
+        self.write_frames(wait_all=True)
+        for path in list(self.buffers.keys()): self.write_buffer(path)
+        self.fh.swmr_mode = True
+        if not self.quiet: cprint( "\tSWMR mode started for %s" % self.filename, 'green')
+        return
+
+    # Objects can't be added to the file once SWMR mode has started.
+    def check_can_create(self, path):
+        if self.fh.swmr_mode:
+            raise RuntimeError("Can't create %s in %s after SWMR mode has started. Log every device once before SWMR starts." % (path, self.filename))
+        return
+
+    # Push written data to disk. With drain=True all staged samples and frames are written first,
+    # otherwise only whole blocks and frames that have finished compressing.
+    # In SWMR mode this is when readers see new data.
+    def flush(self, drain=True):
+        if self.fh is None: return
+        self.write_frames(wait_all=drain)
+        for path in list(self.buffers.keys()):
+            if drain or (len(self.buffers[path]) >= self.buffer_samples): self.write_buffer(path)
+        if self.swmr and not self.fh.swmr_mode and self.all_devices_logged():
+            self.start_swmr()
+        self.fh.flush()
+        self.samples_since_flush = 0
+        self.last_flush = time.time()
+        if drain: self.last_drain = self.last_flush
+        return
+
+    # Flush and close the file. All cached handles are invalidated.
+    def close(self):
+        if self.fh is None: return
+        self.flush()
+        if self.frame_pool is not None:
+            self.frame_pool.shutdown()
+            self.frame_pool = None
+        self.groups = {}
+        self.datasets = {}
+        self.buffers = {}
+        self.targets = {}
+        self.time_indexed = set()
+        self.legacy_timestamps = {}
+        self.samples_logged = {}
+        self.calibrations = {}
+        self.fh.close()
+        self.fh = None
+        if not self.quiet: cprint( "Closed %s" % self.filename, 'green')
+        return
@@ -2,16 +2,25 @@
 # -*- coding: UTF-8 -*-
 """
     Main module for spawning device threads and logging to file.
-    
+
+    Each device is queried in its own acquisition thread, so a device that blocks
+    in a serial read or time.sleep does not hold up the others. Samples are passed
+    through a bounded queue to a single writer thread that owns the log file.
+    Each device runs at its own period, config['sample_period'], if it has one.
+
+    Usage:
+        devices = usbDevice.load_usb_devices(usbDevice.search_for_usb_devices())
+        multiThreadedLogger.start('logfile.hdf5', sample_period=1., devices=devices)
+
     @author Daniel Duke <daniel.duke@monash.edu>
     @copyright (c) 2018-2026 Monash University
     @license GPL-3.0+
     @version 1.5.0
-    @date 13/06/25
+    @date 17/10/26
 
     Multiphase Flow Laboratory
     Monash University, Australia
-    
+
     This program is free software: you can redistribute it and/or modify
     it under the terms of the GNU General Public License as published by
     the Free Software Foundation, either version 3 of the License, or
@@ -27,11 +36,452 @@
 """
 
 from pyLabDataLogger.device import usbDevice
+from . import hdf5Writer, timing
+import os, time, datetime, copy, threading, collections
+import numpy as np
+from termcolor import cprint
+
+QUEUE_SIZE = 256  # samples from each device waiting to be written
+QUEUE_POLICIES = ['block', 'drop', 'decimate']
+QUEUE_POLL = 0.25 # seconds between checks of the stop flag while waiting on the queue
+RECONNECT_DELAY = 1.      # seconds before the first attempt to reconnect a failed device
+RECONNECT_MAX_DELAY = 60. # longest wait between reconnection attempts
+PREVIEW_INTERVAL = 0.2    # shortest time between live preview updates of a device (s)
+
+# Take a copy of a device's state after a query that the writer thread can log
+# while the acquisition thread goes on to the next query. Drivers assign new objects
+# to lastValue and lastScaled on every query, so a shallow copy is enough; the lists
+# themselves are copied too in case a driver modifies them in place.
+def snapshot(d):
+    s = copy.copy(d)
+    if isinstance(d.lastValue, list): s.lastValue = list(d.lastValue)
+    if isinstance(getattr(d,'lastScaled',None), list): s.lastScaled = list(d.lastScaled)
+    return s
+
+class sampleQueue:
+    """ Bounded queue of samples from one device. When it is full, policy decides what happens:
+            'block'    - put() waits for space, so acquisition slows down to the writer's pace
+            'drop'     - the oldest sample is dropped to make room
+            'decimate' - every other queued sample is dropped, halving the time resolution
+                         of the backlog instead of losing its oldest part
+        Dropped samples are counted. Queues of one scheduler share a threading.Condition,
+        so the consumer can wait on all of them at once.
+    """
+
+    def __init__(self, maxlen=QUEUE_SIZE, policy='block', ready=None):
+        if not policy in QUEUE_POLICIES:
+            raise ValueError("Unknown queue policy %s, should be one of %s" % (policy, QUEUE_POLICIES))
+        self.maxlen = max(1, int(maxlen))
+        self.policy = policy
+        if ready is None: ready = threading.Condition()
+        self.ready = ready
+        self.items = collections.deque()
+        self.dropped = 0
+        self.high_water = 0 # longest the queue has been
+        return
+
+    def __len__(self):
+        return len(self.items)
+
+    # Add a sample, applying the overflow policy. Returns False if the queue was blocked
+    # until stop was set, in which case the sample is not queued.
+    def put(self, item, stop):
+        with self.ready:
+            while len(self.items) >= self.maxlen:
+                if self.policy == 'drop':
+                    self.items.popleft()
+                    self.dropped += 1
+                elif self.policy == 'decimate':
+                    n = len(self.items)
+                    self.items = collections.deque(list(self.items)[1::2])
+                    self.dropped += n - len(self.items)
+                else:
+                    if stop.is_set(): return False
+                    self.ready.wait(QUEUE_POLL)
+            self.items.append(item)
+            self.high_water = max(self.high_water, len(self.items))
+            self.ready.notify_all()
+        return True
+
+    # Remove and return the oldest sample, or None. Call with self.ready held.
+    def pop(self):
+        if len(self.items) == 0: return None
+        item = self.items.popleft()
+        self.ready.notify_all() # wake up a blocked put()
+        return item
+
+    # Queue statistics for the log file.
+    def stats(self):
+        return {'dropped':self.dropped, 'high_water':self.high_water, 'length':self.maxlen}
+
+
+# A value shaped like v but filled with NaN, or None if v isn't numeric.
+def nan_like(v):
+    a = np.asarray(v)
+    if a.dtype.kind in 'biufc': return np.full(a.shape, np.nan)
+    return None
+
+
+class deviceSupervisor:
+    """ Reconnect failed devices in the background with exponential backoff.
+        A device that raised an IOError (ie pyLabDataLoggerIOError or a serial port error)
+        is handed over with fail(). It is then out of the polling set (available() is False)
+        while a reconnection thread calls its reset() method after RECONNECT_DELAY seconds,
+        doubling the delay after every failed attempt up to RECONNECT_MAX_DELAY. Meanwhile
+        nan_sample() gives samples with NaN values, so the log shows the gap.
+    """
+
+    def __init__(self, delay=RECONNECT_DELAY, max_delay=RECONNECT_MAX_DELAY, quiet=False):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.quiet = quiet
+        self.lock = threading.Lock()
+        self.stopEvent = threading.Event()
+        self.failed = {}     # reconnection thread, by device
+        self.templates = {}  # copy of the device at the time it failed, by device
+        self.outages = {}    # number of times each device failed, by device name
+        return
+
+    # True if device d is not being reconnected.
+    def available(self, d):
+        with self.lock: return not (d in self.failed)
+
+    # Take device d out of the polling set and start reconnecting it.
+    def fail(self, d, error=None):
+        with self.lock:
+            if d in self.failed: return
+            self.templates[d] = snapshot(d)
+            self.outages[d.name] = self.outages.get(d.name,0) + 1
+            t = threading.Thread(target=self.reconnect, args=(d,), name='reconnect-%s' % d.name)
+            t.daemon = True
+            self.failed[d] = t
+        cprint("%s failed (%s), reconnecting in the background" % (d.name, error), 'red', attrs=['bold'])
+        t.start()
+        return
+
+    # Reconnection thread: reset the device until a query succeeds.
+    def reconnect(self, d):
+        delay = self.delay
+        while not self.stopEvent.wait(delay):
+            try:
+                d.reset()
+                d.query()
+            except Exception as e:
+                delay = min(delay*2, self.max_delay)
+                if not self.quiet: cprint("\t%s: reconnection failed (%s), next try in %.0f s" % (d.name, e, delay), 'yellow')
+                continue
+            with self.lock:
+                del self.failed[d]
+                del self.templates[d]
+            cprint("%s reconnected" % d.name, 'green', attrs=['bold'])
+            return
+        return
+
+    # A sample for failed device d with every value set to NaN (None if not numeric),
+    # timestamped now. Returns None if the device never returned a value to copy the shape of.
+    def nan_sample(self, d):
+        with self.lock: template = self.templates.get(d)
+        if (template is None) or (template.lastValue is None): return None
+        s = copy.copy(template)
+        s.lastValue = [ nan_like(v) for v in template.lastValue ]
+        s.lastScaled = [ nan_like(v) for v in template.lastValue ]
+        s.lastValueTimestamp = datetime.datetime.now()
+        if getattr(template,'lastTimestampUncertainty',None) is not None: s.lastTimestampUncertainty = np.nan
+        return s
+
+    def stop(self):
+        self.stopEvent.set()
+        return
+
+    # Print the number of outages of each device that failed.
+    def report(self):
+        for name in self.outages.keys():
+            cprint("\t%s: failed %i times" % (name, self.outages[name]), 'cyan')
+        return
+
+
+# Sample period for device d: config['sample_period'] if the device has one, otherwise the default.
+def device_period(d, default):
+    if ('sample_period' in d.config) and (d.config['sample_period'] is not None):
+        return float(d.config['sample_period'])
+    return float(default)
+
+
+class acquisitionThread(threading.Thread):
+    """ Query one device every period seconds and queue a snapshot of each sample.
+        Queries are scheduled by a timing.periodicTimer against absolute deadlines,
+        so the period does not drift. Overruns are counted as late ticks and missed
+        deadlines. A period of zero queries the device as fast as it can go.
+    """
+
+    def __init__(self, device, period, q, stop, quiet=True, supervisor=None):
+        super(acquisitionThread, self).__init__(name='acquire-%s' % device.name)
+        self.daemon = True
+        self.device = device
+        self.period = period
+        self.q = q
+        self.stop = stop
+        self.quiet = quiet
+        self.supervisor = supervisor
+        self.samples = 0
+        self.errors = 0
+        self.timer = timing.periodicTimer(period)
+        return
+
+    def run(self):
+        self.timer.start()
+        while not self.stop.is_set():
+            s = None
+            if (self.supervisor is not None) and not self.supervisor.available(self.device):
+                # Device is being reconnected, log NaN until it is back
+                s = self.supervisor.nan_sample(self.device)
+            else:
+                try:
+                    self.device.query()
+                    if not self.quiet: self.device.pprint()
+                    s = snapshot(self.device)
+                except IOError as e:
+                    self.errors += 1
+                    if self.supervisor is not None: self.supervisor.fail(self.device, e)
+                    else: cprint("%s: %s" % (self.device.name, e), 'red', attrs=['bold'])
+                except Exception as e:
+                    # Keep the other devices running if one fails
+                    self.errors += 1
+                    cprint("%s: %s" % (self.device.name, e), 'red', attrs=['bold'])
+
+            if s is not None:
+                s.acquisition = self # so the sample can be traced back to this thread's timing
+                if self.q.put(s, self.stop): self.samples += 1
+
+            missed = self.timer.wait(self.stop)
+            if missed > 0:
+                cprint("%s: query overran, missed %i deadline(s)" % (self.device.name, missed), 'yellow')
+        return
+
+
+class scheduler:
+    """ Run each device at its own cadence in its own acquisition thread, so blocking I/O
+        in one device does not delay the others. The period of each device is taken from
+        its config['sample_period'], or sample_period if it does not have one.
+        Snapshots of the devices after each query are taken off the queues with get().
+        Each device has its own bounded sampleQueue, of config['queue_size'] samples
+        (default queue_size) with overflow policy config['queue_policy'] (default policy).
+        Devices that fail with an IOError are reconnected in the background by a
+        deviceSupervisor, and give NaN samples until they are back (reconnect=False
+        just reports the errors).
+
+        Usage:
+            s = multiThreadedLogger.scheduler(devices, sample_period=1.)
+            s.start()
+            while True:
+                d = s.get()
+                if d is not None: d.log(logfile)
+            s.stop()
+    """
+
+    def __init__(self, devices, sample_period=1., queue_size=QUEUE_SIZE, policy='block', quiet=True, reconnect=True):
+        self.devices = devices
+        self.ready = threading.Condition()
+        self.stopEvent = threading.Event()
+        if reconnect: self.supervisor = deviceSupervisor(quiet=quiet)
+        else: self.supervisor = None
+        self.threads = []
+        for d in devices:
+            q = sampleQueue(d.config.get('queue_size', queue_size), d.config.get('queue_policy', policy), self.ready)
+            self.threads.append(acquisitionThread(d, device_period(d, sample_period), q, self.stopEvent, quiet=quiet,\
+                                                  supervisor=self.supervisor))
+        self.next_queue = 0 # queues are served in turn
+        self.diagnosticsWritten = {} # time statistics were last logged, by thread
+        return
+
+    def start(self):
+        for t in self.threads: t.start()
+        return
+
+    # Return the next sample (a device snapshot), or None if there was none within timeout seconds.
+    # The device queues are served in turn, so a fast device can't starve a slow one.
+    def get(self, timeout=QUEUE_POLL):
+        t_end = time.monotonic() + timeout
+        with self.ready:
+            while True:
+                for j in range(len(self.threads)):
+                    k = (self.next_queue + j) % len(self.threads)
+                    s = self.threads[k].q.pop()
+                    if s is not None:
+                        self.next_queue = k+1
+                        return s
+                remaining = t_end - time.monotonic()
+                if remaining <= 0: return None
+                self.ready.wait(remaining)
+
+    # Stop the acquisition threads. Samples already queued can still be taken with get().
+    def stop(self, timeout=10.):
+        self.stopEvent.set()
+        if self.supervisor is not None: self.supervisor.stop()
+        for t in self.threads: t.join(timeout=max(timeout, 2*t.period))
+        return
+
+    def empty(self):
+        with self.ready: return all([ len(t.q) == 0 for t in self.threads ])
+
+    # Write the timing and queue statistics (ie dropped samples) of the thread that acquired
+    # sample d (from get()) into its device group, with bus statistics for nodes on a shared RS-485 bus,
+    # on the device's first sample and then every writer.flush_interval seconds. With d=None, write them for every device.
+    # Only HDF5 logs get these statistics.
+    def log_diagnostics(self, writer, d=None):
+        if not isinstance(writer, hdf5Writer.hdf5Writer): return
+        interval = writer.flush_interval
+        if interval is None: interval = 5.
+        if d is None: threads = [ (t, t.device) for t in self.threads ]
+        else: threads = [ (d.acquisition, d) ]
+        for t, dev in threads:
+            if (d is not None) and (t in self.diagnosticsWritten) and\
+               (time.time() - self.diagnosticsWritten[t] < interval): continue
+            try:
+                dg = writer.device_group(dev, count_sample=False)
+                t.timer.log_hdf5(writer, dg)
+                with self.ready: stats = t.q.stats()
+                writer.write_diagnostics(dg, 'queue', stats, attrs={'policy':t.q.policy})
+                bus = getattr(dev, 'bus', None) # shared RS-485 bus (serialDevice)
+                if bus is not None:
+                    writer.write_diagnostics(dg, 'rs485', bus.stats(dev.busNode), attrs={'port':bus.port, 'address':dev.busNode})
+            except RuntimeError as e: # ie device first seen after SWMR started
+                cprint("Could not log statistics for %s: %s" % (dev.name, e), 'yellow')
+            self.diagnosticsWritten[t] = time.time()
+        return
+
+    # Sample and error counts and queue statistics (dropped samples, high-water mark, policy)
+    # as a list of (device name, statistics), one per device.
+    def queue_stats(self):
+        with self.ready:
+            return [ (t.device.name, dict(t.q.stats(), samples=t.samples, errors=t.errors, policy=t.q.policy)) for t in self.threads ]
+
+    # Print sample and error counts and timing statistics for each device.
+    def report(self):
+        for t in self.threads:
+            cprint("\t%s: %i samples, %i errors, %i dropped (%s)" % (t.device.name, t.samples, t.errors, t.q.dropped, t.q.policy), 'cyan')
+            t.timer.report()
+        buses = []
+        for t in self.threads:
+            bus = getattr(t.device, 'bus', None)
+            if (bus is not None) and not (bus in buses): buses.append(bus)
+        for bus in buses: bus.report()
+        if self.supervisor is not None: self.supervisor.report()
+        return
+
+
+class previewer:
+    """ Draw the live previews of devices loaded with live_preview=True from the thread that calls show(),
+        usually the main loop. OpenCV and matplotlib windows can't be drawn from the acquisition threads,
+        so the devices' own previews are turned off and show() draws each sample taken off the scheduler,
+        at most once every interval seconds per device.
+
+        Usage:
+            p = multiThreadedLogger.previewer(devices)
+            sched.start()
+            while True:
+                d = sched.get()
+                if d is not None: p.show(d)
+    """
+
+    def __init__(self, devices, interval=PREVIEW_INTERVAL):
+        self.devices = [ d for d in devices if getattr(d,'live_preview',False) ]
+        for d in self.devices: d.live_preview = False
+        self.interval = interval
+        self.last_shown = {} # time each device was last drawn, by id
+        return
+
+    # Draw sample s (from scheduler.get()) if its device has a live preview.
+    def show(self, s):
+        acquisition = getattr(s, 'acquisition', None)
+        if acquisition is None: return
+        d = acquisition.device
+        if not any([ d is p for p in self.devices ]): return
+        if time.monotonic() - self.last_shown.get(id(d), 0.) < self.interval: return
+        self.last_shown[id(d)] = time.monotonic()
+        try:
+            d.preview(s)
+        except Exception as e:
+            cprint("%s: live preview failed: %s" % (d.name, e), 'yellow')
+        return
+
+
+class writerThread(threading.Thread):
+    """ Take samples from a scheduler and log them. Only this thread touches the log file.
+        dest_file can be a filename or an open hdf5Writer.
+    """
+
+    def __init__(self, dest_file, sched, stop):
+        super(writerThread, self).__init__(name='writer')
+        self.daemon = True
+        self.dest_file = dest_file
+        self.sched = sched
+        self.stop = stop
+        self.samples = 0
+        self.errors = 0
+        return
+
+    def run(self):
+        # Keep HDF5 files open for the whole run
+        writer = self.dest_file
+        if isinstance(writer, str):
+            e = os.path.splitext(writer)[-1]
+            if ('hdf5' in e) or ('h5' in e): writer = hdf5Writer.hdf5Writer(writer)
+        # In SWMR mode, wait for every device's first sample before starting SWMR
+        if isinstance(writer, hdf5Writer.hdf5Writer) and writer.swmr:
+            writer.expect_devices([ t.device for t in self.sched.threads ])
+
+        try:
+            # Drain the queue completely before stopping
+            while not (self.stop.is_set() and self.sched.empty()):
+                s = self.sched.get()
+                if s is None: continue
+                try:
+                    s.log(writer)
+                    self.sched.log_diagnostics(writer, s)
+                    self.samples += 1
+                except Exception as e:
+                    self.errors += 1
+                    cprint("Error logging %s: %s" % (s.name, e), 'red', attrs=['bold'])
+        finally:
+            if isinstance(writer, hdf5Writer.hdf5Writer) and writer.isOpen(): self.sched.log_diagnostics(writer)
+            if writer is not self.dest_file: writer.close()
+        return
+
+
+# Log devices to dest_file until interrupted with Ctrl-C, or for duration seconds if given.
+# Each device is sampled every config['sample_period'] seconds if set, otherwise every
+# sample_period seconds. policy is the default overflow policy of the sample queues.
+# If no devices are given, USB devices are searched for and loaded with **kwargs.
+# The log file is closed when logging stops, unless an open hdf5Writer was passed in.
+# Returns the number of samples written.
+def start(dest_file, sample_period=1., devices=[], duration=None, policy='block', quiet=True, **kwargs):
+    if len(devices) == 0:
+        devices = usbDevice.load_usb_devices(usbDevice.search_for_usb_devices(), **kwargs)
+    if len(devices) == 0:
+        cprint("No devices to log.", 'red', attrs=['bold'])
+        return 0
+
+    sched = scheduler(devices, sample_period, policy=policy, quiet=quiet)
+    stop = threading.Event()
+    writer = writerThread(dest_file, sched, stop)
+    writer.start()
+    sched.start()
+    cprint("Logging %i devices to %s in %i threads" % (len(devices), dest_file, len(devices)), 'green', attrs=['bold'])
 
+    t0 = time.time()
+    try:
+        while (duration is None) or (time.time()-t0 < duration):
+            time.sleep(QUEUE_POLL)
+            if not writer.is_alive(): raise RuntimeError("Writer thread stopped unexpectedly")
+    except KeyboardInterrupt:
+        cprint("Stopped.", 'red', attrs=['bold'])
+    finally:
+        # Stop acquiring, then let the writer empty the queue and close the file
+        sched.stop()
+        stop.set()
+        writer.join()
 
-def start(dest_file, sample_period=1., devices=[], **kwargs):
-    # usbDevice.load_usb_devices(usbDevicesFound, **kwargs)
-    
-    # Not done yet!!
-    
-    return 
+    sched.report()
+    if writer.errors > 0: cprint("\t%i samples could not be written" % writer.errors, 'red')
+    return writer.samples
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""
+    Drift-free periodic timing for logging loops.
+
+    periodicTimer schedules against absolute deadlines on time.monotonic_ns(), so
+    the period does not drift with the time spent in each loop and is not affected
+    by changes to the wall clock. The lateness of each tick (time woken after its
+    deadline) and the jitter of each interval (difference from the period) are
+    recorded in histograms that can be written to the log file as diagnostics.
+
+    Usage:
+        timer = timing.periodicTimer(1.0)
+        while True:
+            ...query and log devices...
+            timer.wait()
+        timer.log_hdf5(writer, writer.fh)
+        timer.report()
+
+    @author Daniel Duke <daniel.duke@monash.edu>
+    @copyright (c) 2018-2026 Monash University
+    @license GPL-3.0+
+    @version 1.5.0
+    @date 17/10/26
+
+    Multiphase Flow Laboratory
+    Monash University, Australia
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import time
+from termcolor import cprint
+
+# Lower edges of the lateness and jitter histogram bins in ns, from 0 to 5 s.
+# The last bin is open-ended.
+HISTOGRAM_EDGES_NS = np.array([0, 10e3, 20e3, 50e3, 100e3, 200e3, 500e3, 1e6, 2e6, 5e6, 10e6, 20e6, 50e6,\
+                               100e6, 200e6, 500e6, 1e9, 2e9, 5e9], dtype=np.int64)
+
+class periodicTimer:
+    """ Wait for absolute deadlines every period seconds, counting late ticks and missed
+        deadlines. A tick is late if the work before it overran its deadline; whole periods
+        overrun are skipped and counted as missed rather than run back-to-back.
+        A period of zero never waits.
+    """
+
+    def __init__(self, period):
+        self.period_ns = int(round(period*1e9))
+        self.lateness_histogram = np.zeros(len(HISTOGRAM_EDGES_NS), dtype=np.int64)
+        self.jitter_histogram = np.zeros(len(HISTOGRAM_EDGES_NS), dtype=np.int64)
+        self.ticks = 0
+        self.late = 0
+        self.missed = 0
+        self.max_lateness_ns = 0
+        self.total_lateness_ns = 0
+        self.start()
+        return
+
+    # (Re)start the schedule from now. The first call to wait() returns one period from now.
+    def start(self):
+        self.t_next = time.monotonic_ns()
+        self.t_last = None
+        return
+
+    # Wait until the next deadline. stop can be a threading.Event to wake up early, in which
+    # case the tick is not recorded. Returns the number of deadlines missed since the last tick.
+    def wait(self, stop=None):
+        if self.period_ns <= 0: return 0
+        self.t_next += self.period_ns
+        now = time.monotonic_ns()
+        missed = 0
+        if now > self.t_next:
+            missed = (now - self.t_next)//self.period_ns
+            self.t_next += missed*self.period_ns
+            self.late += 1
+            self.missed += missed
+        else:
+            if stop is None: time.sleep((self.t_next-now)/1e9)
+            elif stop.wait((self.t_next-now)/1e9): return missed
+            now = time.monotonic_ns()
+        self.record(now, missed)
+        return missed
+
+    # Record a tick at monotonic time now (ns).
+    def record(self, now, missed=0):
+        lateness = max(0, now - self.t_next)
+        self.lateness_histogram[self.bin(lateness)] += 1
+        self.max_lateness_ns = max(self.max_lateness_ns, lateness)
+        self.total_lateness_ns += lateness
+        if self.t_last is not None:
+            jitter = abs(now - self.t_last - (missed+1)*self.period_ns)
+            self.jitter_histogram[self.bin(jitter)] += 1
+        self.t_last = now
+        self.ticks += 1
+        return
+
+    def bin(self, t_ns):
+        return min(int(np.searchsorted(HISTOGRAM_EDGES_NS, t_ns, side='right'))-1, len(HISTOGRAM_EDGES_NS)-1)
+
+    # Timing statistics as a dict of numbers and arrays, times in ns.
+    def stats(self):
+        return {'period':self.period_ns, 'ticks':self.ticks, 'late':self.late, 'missed':self.missed,\
+                'max_lateness':self.max_lateness_ns, 'total_lateness':self.total_lateness_ns,\
+                'lateness_histogram':self.lateness_histogram.copy(), 'jitter_histogram':self.jitter_histogram.copy(),\
+                'histogram_edges':HISTOGRAM_EDGES_NS}
+
+    # Write the statistics to a 'timing' group inside group g of an open hdf5Writer.
+    def log_hdf5(self, writer, g):
+        writer.write_diagnostics(g, 'timing', self.stats(), attrs={'units':'ns', 'clock':'time.monotonic_ns'})
+        return
+
+    # Print a one-line summary.
+    def report(self, name=''):
+        mean = self.total_lateness_ns/max(self.ticks,1)
+        cprint("\t%speriod %.3f s, %i ticks, %i late, %i missed, lateness mean %.3f ms max %.3f ms" %\
+               (name, self.period_ns/1e9, self.ticks, self.late, self.missed, mean/1e6, self.max_lateness_ns/1e6), 'cyan')
+        return